@@ -3,30 +3,65 @@
 from __future__ import annotations
 
 import logging
+from pathlib import Path
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PORT, Platform
 from homeassistant.core import HomeAssistant
 
 from .const import (
+    CONF_ADAPTIVE_SCAN,
+    CONF_CASCADE,
+    CONF_CYCLE_BUDGET,
     CONF_ENABLE_BMS_TEMP,
+    CONF_ENABLE_DERIVED_METRICS,
     CONF_ENABLE_EMS,
     CONF_ENABLE_EXTERNAL_LOCK,
+    CONF_ENABLE_METRICS,
+    CONF_ENABLE_SAMPLE_LOG,
     CONF_ENABLE_WRITE_ENTITIES,
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_MAX_IN_FLIGHT,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
     CONF_REGISTER_STRATEGY,
+    CONF_SAMPLE_LOG_MAX_SIZE,
     CONF_SCAN_INTERVAL,
+    CONF_SLOW_SCAN_INTERVAL,
     CONF_SOFTWARE_VERSION,
     CONF_TIMEOUT,
     CONF_UNIT_ID,
+    CONF_WRITE_DEBOUNCE,
+    CONF_WRITE_MIN_INTERVAL,
+    DATA_CASCADES,
+    DATA_CONNECTIONS,
+    DEFAULT_ADAPTIVE_SCAN,
+    DEFAULT_CASCADE,
+    DEFAULT_CYCLE_BUDGET,
+    DEFAULT_ENABLE_DERIVED_METRICS,
+    DEFAULT_ENABLE_METRICS,
+    DEFAULT_ENABLE_SAMPLE_LOG,
     DEFAULT_ENABLE_WRITE,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_SAMPLE_LOG_MAX_SIZE,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SLOW_SCAN_INTERVAL,
     DEFAULT_SOFTWARE_VERSION,
     DEFAULT_TIMEOUT,
     DEFAULT_UNIT_ID,
+    DEFAULT_WRITE_DEBOUNCE,
+    DEFAULT_WRITE_MIN_INTERVAL,
     DOMAIN,
+    SAMPLE_LOG_DIR,
 )
+from .cascade import DimplexCascadeCoordinator
 from .coordinator import DimplexDataUpdateCoordinator
-from .modbus_client import DimplexModbusClient
+from .discovery import async_get_register_map
+from .modbus_client import DimplexConnectionManager, DimplexModbusClient
+from .sample_log import SampleLogger
+from .services import async_setup_services
 
 LOGGER = logging.getLogger(__name__)
 
@@ -35,38 +70,121 @@ PLATFORMS = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.SELECT]
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up via configuration.yaml is not supported."""
+    hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Dimplex WPM from a config entry."""
     hass.data.setdefault(DOMAIN, {})
+    manager: DimplexConnectionManager = hass.data[DOMAIN].setdefault(
+        DATA_CONNECTIONS, DimplexConnectionManager()
+    )
 
     host = entry.data[CONF_HOST]
     port = entry.data.get(CONF_PORT, 502)
     unit_id = entry.data.get(CONF_UNIT_ID, DEFAULT_UNIT_ID)
     timeout = entry.data.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
-    scan_interval = entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    scan_interval = entry.options.get(
+        CONF_SCAN_INTERVAL, entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+    )
     register_strategy = entry.data.get(CONF_REGISTER_STRATEGY, "auto")
     software_version = entry.data.get(CONF_SOFTWARE_VERSION, DEFAULT_SOFTWARE_VERSION)
+    fast_scan_interval = entry.options.get(CONF_FAST_SCAN_INTERVAL)
+    slow_scan_interval = entry.options.get(
+        CONF_SLOW_SCAN_INTERVAL, DEFAULT_SLOW_SCAN_INTERVAL
+    )
+    max_in_flight = entry.options.get(
+        CONF_MAX_IN_FLIGHT, entry.data.get(CONF_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT)
+    )
 
-    client = DimplexModbusClient(host, port, unit_id, timeout)
+    enable_metrics = entry.options.get(CONF_ENABLE_METRICS, DEFAULT_ENABLE_METRICS)
+    enable_derived_metrics = entry.options.get(
+        CONF_ENABLE_DERIVED_METRICS, DEFAULT_ENABLE_DERIVED_METRICS
+    )
+
+    connection = manager.acquire(host, port, timeout, max_in_flight=max_in_flight)
+    if enable_metrics:
+        connection.enable_metrics()
+    client = DimplexModbusClient(
+        host,
+        port,
+        unit_id,
+        timeout,
+        connection=connection,
+        write_debounce=entry.options.get(CONF_WRITE_DEBOUNCE, DEFAULT_WRITE_DEBOUNCE),
+        write_min_interval=entry.options.get(
+            CONF_WRITE_MIN_INTERVAL, DEFAULT_WRITE_MIN_INTERVAL
+        ),
+    )
+    sample_log = None
+    if entry.options.get(CONF_ENABLE_SAMPLE_LOG, DEFAULT_ENABLE_SAMPLE_LOG):
+        sample_log = SampleLogger(
+            hass,
+            Path(hass.config.path(SAMPLE_LOG_DIR, f"samples_{entry.entry_id}.bin")),
+            max_bytes=entry.options.get(
+                CONF_SAMPLE_LOG_MAX_SIZE, DEFAULT_SAMPLE_LOG_MAX_SIZE
+            )
+            * 1024
+            * 1024,
+        )
     coordinator = DimplexDataUpdateCoordinator(
         hass,
         client,
         scan_interval=scan_interval,
+        fast_scan_interval=fast_scan_interval,
+        slow_scan_interval=slow_scan_interval,
         register_strategy=register_strategy,
         host=host,
         port=port,
         unit_id=unit_id,
         software_version=software_version,
+        entry_id=entry.entry_id,
+        adaptive_scan=entry.options.get(CONF_ADAPTIVE_SCAN, DEFAULT_ADAPTIVE_SCAN),
+        min_scan_interval=entry.options.get(
+            CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+        ),
+        max_scan_interval=entry.options.get(
+            CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+        ),
+        derived_metrics=enable_derived_metrics,
+        sample_log=sample_log,
+        cycle_budget=entry.options.get(CONF_CYCLE_BUDGET, DEFAULT_CYCLE_BUDGET),
     )
 
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        if sample_log is not None:
+            await sample_log.async_start()
+        await coordinator.async_load_register_layout()
+        register_map = await async_get_register_map(hass)
+        coordinator.apply_register_map(register_map.banks(software_version))
+        restored = await coordinator.async_restore_snapshot()
+        if not restored:
+            await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        if sample_log is not None:
+            await sample_log.async_close()
+        await manager.release(connection)
+        raise
+
+    cascade = None
+    cascade_name = entry.options.get(CONF_CASCADE, DEFAULT_CASCADE)
+    if cascade_name:
+        cascades: dict[str, DimplexCascadeCoordinator] = hass.data[DOMAIN].setdefault(
+            DATA_CASCADES, {}
+        )
+        cascade = cascades.get(cascade_name)
+        if cascade is None:
+            cascade = cascades[cascade_name] = DimplexCascadeCoordinator(hass, cascade_name)
+            await cascade.async_register_shutdown()
+        cascade.add_member(entry.entry_id, coordinator)
 
     hass.data[DOMAIN][entry.entry_id] = {
         "coordinator": coordinator,
         "client": client,
+        "sample_log": sample_log,
+        "cascade": cascade,
         "host": host,
         "port": port,
         "unit_id": unit_id,
@@ -79,11 +197,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         CONF_ENABLE_EXTERNAL_LOCK: entry.options.get(
             CONF_ENABLE_EXTERNAL_LOCK, False
         ),
+        CONF_ENABLE_METRICS: enable_metrics,
+        CONF_ENABLE_DERIVED_METRICS: enable_derived_metrics,
     }
 
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if restored:
+        # Entities start from the stale snapshot; the first poll replaces it.
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
     return True
 
 
@@ -92,7 +217,14 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
         data = hass.data[DOMAIN].pop(entry.entry_id)
+        cascade: DimplexCascadeCoordinator | None = data["cascade"]
+        if cascade is not None and not await cascade.async_remove_member(entry.entry_id):
+            hass.data[DOMAIN][DATA_CASCADES].pop(cascade.cascade_name)
+            await cascade.async_shutdown()
         await data["client"].close()
+        if data["sample_log"] is not None:
+            await data["sample_log"].async_close()
+        await hass.data[DOMAIN][DATA_CONNECTIONS].release(data["client"].connection)
     return unload_ok
 
 
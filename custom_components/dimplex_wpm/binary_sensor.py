@@ -10,10 +10,10 @@ from homeassistant.components.binary_sensor import (
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, MODULE_ROOT
 from .device import build_device_info
+from .entity import DimplexEntity
 
 FAULT_DESCRIPTION = BinarySensorEntityDescription(
     key="fault_active",
@@ -45,7 +45,7 @@ async def async_setup_entry(
     async_add_entities(entities)
 
 
-class DimplexBinarySensor(CoordinatorEntity, BinarySensorEntity):
+class DimplexBinarySensor(DimplexEntity, BinarySensorEntity):
     """Representation of a Dimplex binary sensor."""
 
     entity_description: BinarySensorEntityDescription
@@ -62,6 +62,7 @@ class DimplexBinarySensor(CoordinatorEntity, BinarySensorEntity):
         self._attr_has_entity_name = True
         self._attr_translation_key = description.translation_key
         self._attr_unique_id = f"{entry.entry_id}_{MODULE_ROOT}_{description.key}"
+        self._source_keys = frozenset({description.key})
         self._attr_device_info = build_device_info(
             entry, MODULE_ROOT, software_version=software_version
         )
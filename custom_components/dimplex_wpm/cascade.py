@@ -0,0 +1,181 @@
+"""Polling of heat pump cascades.
+
+Config entries given the same cascade name in their options are polled by
+one cascade coordinator instead of each on its own timer. Every cycle polls
+the due units concurrently, bounded by a semaphore, and stamps them with the
+time of the cycle. Each unit keeps its own coordinator, entities and error
+handling; the cascade publishes the combined snapshot and its aggregates.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from collections.abc import Awaitable
+from typing import TYPE_CHECKING, Any, Callable
+
+from homeassistant import config_entries
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .const import CASCADE_MAX_CONCURRENT, DEFAULT_SCAN_INTERVAL
+
+if TYPE_CHECKING:
+    from .coordinator import DimplexDataUpdateCoordinator
+
+LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def _keep_polling() -> None:
+    """Listener standing in for a member, so the cascade polls without entities."""
+
+
+class DimplexCascadeCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Poll the units of a cascade together and aggregate their state."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        *,
+        max_concurrent: int = CASCADE_MAX_CONCURRENT,
+    ) -> None:
+        # The cascade outlives the entry whose setup creates it, so it must
+        # not be bound to that entry and shut down when it unloads.
+        token = config_entries.current_entry.set(None)
+        try:
+            super().__init__(
+                hass,
+                LOGGER,
+                name=f"Dimplex WPM cascade {name}",
+                update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+            )
+        finally:
+            config_entries.current_entry.reset(token)
+        self.cascade_name = name
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._members: dict[str, DimplexDataUpdateCoordinator] = {}
+        self._unsub_members: dict[str, CALLBACK_TYPE] = {}
+        # Aggregate entities are added through the sensor platform of one
+        # member; when that member unloads, another one takes over.
+        self._aggregate_platforms: dict[str, Callable[[], Awaitable[None]]] = {}
+        self._aggregate_owner: str | None = None
+
+    @property
+    def members(self) -> dict[str, DimplexDataUpdateCoordinator]:
+        return dict(self._members)
+
+    @callback
+    def add_member(self, entry_id: str, coordinator: DimplexDataUpdateCoordinator) -> None:
+        """Take over the poll schedule of a unit."""
+        coordinator.join_cascade()
+        self._members[entry_id] = coordinator
+        self._update_interval_from_members()
+        self._unsub_members[entry_id] = self.async_add_listener(_keep_polling)
+
+    async def async_remove_member(self, entry_id: str) -> bool:
+        """Drop an unloaded unit; return False once the cascade is empty."""
+        self._members.pop(entry_id, None)
+        unsub = self._unsub_members.pop(entry_id, None)
+        if unsub is not None:
+            unsub()
+        self._aggregate_platforms.pop(entry_id, None)
+        if self._aggregate_owner == entry_id:
+            self._aggregate_owner = None
+            await self._async_add_aggregate_entities()
+        if self._members:
+            self._update_interval_from_members()
+        return bool(self._members)
+
+    async def async_register_aggregate_platform(
+        self, entry_id: str, add_entities: Callable[[], Awaitable[None]]
+    ) -> None:
+        """Offer a member's sensor platform for the aggregate entities."""
+        self._aggregate_platforms[entry_id] = add_entities
+        await self._async_add_aggregate_entities()
+
+    async def _async_add_aggregate_entities(self) -> None:
+        """Add the aggregate entities through the first platform on offer.
+
+        Adding is awaited rather than scheduled, so an entry unloading right
+        after taking over cannot leave the entities behind.
+        """
+        if self._aggregate_owner is not None or not self._aggregate_platforms:
+            return
+        self._aggregate_owner, add_entities = next(iter(self._aggregate_platforms.items()))
+        await add_entities()
+
+    def _update_interval_from_members(self) -> None:
+        """Tick at the shortest interval any unit asks for."""
+        self.update_interval = min(member.poll_interval for member in self._members.values())
+
+    async def _async_poll_member(
+        self, member: DimplexDataUpdateCoordinator, last_update: str
+    ) -> bool:
+        """Poll a unit and publish its result at once; return False if it failed.
+
+        Publishing right away rather than after the whole cycle keeps a write
+        read-back that lands while other units are still polled from being
+        replaced by this unit's older snapshot.
+        """
+        async with self._semaphore:
+            try:
+                data = await member.async_poll(last_update)
+            except Exception as err:  # noqa: BLE001 - recorded on the unit
+                member.async_set_update_error(err)
+                return False
+        member.async_set_updated_data(data)
+        return True
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Poll the due units; each unit's result goes to its coordinator."""
+        started = time.monotonic()
+        last_update = dt_util.utcnow().isoformat()
+        due = [
+            (entry_id, member)
+            for entry_id, member in self._members.items()
+            if member.poll_due()
+        ]
+        results = await asyncio.gather(
+            *(self._async_poll_member(member, last_update) for _, member in due),
+            return_exceptions=True,
+        )
+        failed: list[str] = []
+        for (entry_id, _member), result in zip(due, results):
+            if isinstance(result, BaseException):
+                raise result
+            if not result:
+                failed.append(entry_id)
+        self._update_interval_from_members()
+        if due and len(failed) == len(due):
+            raise UpdateFailed(f"All {len(due)} units of cascade {self.cascade_name} failed")
+
+        units = {entry_id: member.data for entry_id, member in self._members.items()}
+        return {
+            "units": units,
+            "aggregate": self._aggregate(),
+            "meta": {
+                "last_update": last_update,
+                "cycle_time": round(time.monotonic() - started, 3),
+                "units_polled": [entry_id for entry_id, _ in due],
+                "units_failed": failed,
+            },
+        }
+
+    def _aggregate(self) -> dict[str, Any]:
+        """Count the units online, running and serving a heat demand."""
+        online = [
+            member.data["derived"]
+            for member in self._members.values()
+            if member.last_update_success and member.data and not member.stale
+        ]
+        return {
+            "units": len(self._members),
+            "units_online": len(online),
+            "units_running": sum(1 for derived in online if derived.get("running")),
+            "units_heat_demand": sum(1 for derived in online if derived.get("heat_demand")),
+        }
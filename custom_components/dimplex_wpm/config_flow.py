@@ -8,26 +8,65 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PORT
 from homeassistant.core import callback
 
+from .exceptions import ModbusError
 from .modbus_client import DimplexModbusClient
 from .const import (
+    CONF_ADAPTIVE_SCAN,
+    CONF_CASCADE,
+    CONF_CYCLE_BUDGET,
+    CONF_DEADBAND_PREFIX,
     CONF_ENABLE_BMS_TEMP,
+    CONF_ENABLE_DERIVED_METRICS,
     CONF_ENABLE_EMS,
     CONF_ENABLE_EXTERNAL_LOCK,
+    CONF_ENABLE_METRICS,
+    CONF_ENABLE_SAMPLE_LOG,
     CONF_ENABLE_WRITE_ENTITIES,
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_MAX_IN_FLIGHT,
+    CONF_MAX_PUBLISH_AGE,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_MIN_PUBLISH_INTERVAL,
+    CONF_MIN_SCAN_INTERVAL,
     CONF_REGISTER_STRATEGY,
+    CONF_SAMPLE_LOG_MAX_SIZE,
     CONF_SCAN_INTERVAL,
+    CONF_SLOW_SCAN_INTERVAL,
     CONF_SOFTWARE_VERSION,
     CONF_TIMEOUT,
     CONF_UNIT_ID,
+    CONF_WRITE_DEBOUNCE,
+    CONF_WRITE_MIN_INTERVAL,
+    DATA_CONNECTIONS,
+    DEADBAND_SENSORS,
+    DEFAULT_ADAPTIVE_SCAN,
+    DEFAULT_CASCADE,
+    DEFAULT_CYCLE_BUDGET,
+    DEFAULT_ENABLE_DERIVED_METRICS,
+    DEFAULT_ENABLE_METRICS,
+    DEFAULT_ENABLE_SAMPLE_LOG,
     DEFAULT_ENABLE_WRITE,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MAX_PUBLISH_AGE,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_PUBLISH_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
     DEFAULT_PORT,
+    DEFAULT_SAMPLE_LOG_MAX_SIZE,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SLOW_SCAN_INTERVAL,
     DEFAULT_SOFTWARE_VERSION,
+    DEFAULT_TEMPERATURE_DEADBAND,
     DEFAULT_TIMEOUT,
     DEFAULT_UNIT_ID,
+    DEFAULT_WRITE_DEBOUNCE,
+    DEFAULT_WRITE_MIN_INTERVAL,
     DOMAIN,
+    MAX_IN_FLIGHT_LIMIT,
     REGISTER_STRATEGY_MAP,
     REGISTER_STRATEGY_AUTO,
+    REGISTER_STRATEGY_HOLDING,
+    REGISTER_STRATEGY_INPUT,
     SOFTWARE_VERSIONS,
 )
 
@@ -38,19 +77,40 @@ class DimplexConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
     async def _async_validate_input(self, user_input: dict) -> None:
+        # A gateway already in use is validated over its shared connection,
+        # so the check joins the running requests instead of opening another.
+        # The connection keeps the settings of the entries using it.
+        manager = self.hass.data.get(DOMAIN, {}).get(DATA_CONNECTIONS)
+        connection = None
+        if manager is not None:
+            connection = manager.join(user_input[CONF_HOST], user_input[CONF_PORT])
         client = DimplexModbusClient(
             user_input[CONF_HOST],
             user_input[CONF_PORT],
             user_input[CONF_UNIT_ID],
             user_input[CONF_TIMEOUT],
+            connection=connection,
+        )
+        # Read from the bank the entry will poll; "auto" accepts either, as
+        # some controllers have no input registers at all.
+        reads = {
+            REGISTER_STRATEGY_HOLDING: (client.read_holding_registers,),
+            REGISTER_STRATEGY_INPUT: (client.read_input_registers,),
+        }.get(
+            user_input.get(CONF_REGISTER_STRATEGY, REGISTER_STRATEGY_AUTO),
+            (client.read_input_registers, client.read_holding_registers),
         )
         try:
             await client.connect()
-            registers = await client.read_input_registers(1, 1)
-            if registers is None:
+            for read in reads:
+                if await read(1, 1) is not None:
+                    break
+            else:
                 raise ConnectionError("Unable to read from Modbus device")
         finally:
             await client.close()
+            if connection is not None:
+                await manager.release(connection)
 
     async def async_step_user(self, user_input=None):
         """Handle the initial step."""
@@ -61,7 +121,12 @@ class DimplexConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 f"{user_input[CONF_HOST]}:{user_input[CONF_PORT]}_{user_input[CONF_UNIT_ID]}"
             )
             self._abort_if_unique_id_configured()
-            return self.async_create_entry(title="Dimplex WPM", data=user_input)
+            try:
+                await self._async_validate_input(user_input)
+            except (OSError, ModbusError):
+                errors["base"] = "cannot_connect"
+            else:
+                return self.async_create_entry(title="Dimplex WPM", data=user_input)
 
         data_schema = vol.Schema(
             {
@@ -110,12 +175,62 @@ class DimplexOptionsFlow(config_entries.OptionsFlow):
                         CONF_SCAN_INTERVAL, self.config_entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
                     ),
                 ): vol.All(int, vol.Range(min=5, max=300)),
+                vol.Optional(
+                    CONF_FAST_SCAN_INTERVAL,
+                    description={
+                        "suggested_value": self.config_entry.options.get(
+                            CONF_FAST_SCAN_INTERVAL
+                        )
+                    },
+                ): vol.All(int, vol.Range(min=1, max=300)),
+                vol.Optional(
+                    CONF_SLOW_SCAN_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_SLOW_SCAN_INTERVAL, DEFAULT_SLOW_SCAN_INTERVAL
+                    ),
+                ): vol.All(int, vol.Range(min=5, max=3600)),
+                vol.Optional(
+                    CONF_ADAPTIVE_SCAN,
+                    default=self.config_entry.options.get(
+                        CONF_ADAPTIVE_SCAN, DEFAULT_ADAPTIVE_SCAN
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_MIN_SCAN_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_MIN_SCAN_INTERVAL, DEFAULT_MIN_SCAN_INTERVAL
+                    ),
+                ): vol.All(int, vol.Range(min=1, max=300)),
+                vol.Optional(
+                    CONF_MAX_SCAN_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL
+                    ),
+                ): vol.All(int, vol.Range(min=5, max=3600)),
+                vol.Optional(
+                    CONF_CYCLE_BUDGET,
+                    default=self.config_entry.options.get(
+                        CONF_CYCLE_BUDGET, DEFAULT_CYCLE_BUDGET
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=3600)),
                 vol.Optional(
                     CONF_ENABLE_WRITE_ENTITIES,
                     default=self.config_entry.options.get(
                         CONF_ENABLE_WRITE_ENTITIES, DEFAULT_ENABLE_WRITE
                     ),
                 ): bool,
+                vol.Optional(
+                    CONF_WRITE_DEBOUNCE,
+                    default=self.config_entry.options.get(
+                        CONF_WRITE_DEBOUNCE, DEFAULT_WRITE_DEBOUNCE
+                    ),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+                vol.Optional(
+                    CONF_WRITE_MIN_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_WRITE_MIN_INTERVAL, DEFAULT_WRITE_MIN_INTERVAL
+                    ),
+                ): vol.All(int, vol.Range(min=0, max=3600)),
                 vol.Optional(
                     CONF_ENABLE_EMS,
                     default=self.config_entry.options.get(CONF_ENABLE_EMS, False),
@@ -128,6 +243,61 @@ class DimplexOptionsFlow(config_entries.OptionsFlow):
                     CONF_ENABLE_EXTERNAL_LOCK,
                     default=self.config_entry.options.get(CONF_ENABLE_EXTERNAL_LOCK, False),
                 ): bool,
+                vol.Optional(
+                    CONF_MAX_IN_FLIGHT,
+                    default=self.config_entry.options.get(
+                        CONF_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT
+                    ),
+                ): vol.All(int, vol.Range(min=1, max=MAX_IN_FLIGHT_LIMIT)),
+                vol.Optional(
+                    CONF_CASCADE,
+                    default=self.config_entry.options.get(CONF_CASCADE, DEFAULT_CASCADE),
+                ): vol.All(str, vol.Strip),
+                **{
+                    vol.Optional(
+                        f"{CONF_DEADBAND_PREFIX}{key}",
+                        default=self.config_entry.options.get(
+                            f"{CONF_DEADBAND_PREFIX}{key}", DEFAULT_TEMPERATURE_DEADBAND
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=5))
+                    for key in DEADBAND_SENSORS
+                },
+                vol.Optional(
+                    CONF_MIN_PUBLISH_INTERVAL,
+                    default=self.config_entry.options.get(
+                        CONF_MIN_PUBLISH_INTERVAL, DEFAULT_MIN_PUBLISH_INTERVAL
+                    ),
+                ): vol.All(int, vol.Range(min=0, max=3600)),
+                vol.Optional(
+                    CONF_MAX_PUBLISH_AGE,
+                    default=self.config_entry.options.get(
+                        CONF_MAX_PUBLISH_AGE, DEFAULT_MAX_PUBLISH_AGE
+                    ),
+                ): vol.All(int, vol.Range(min=0, max=86400)),
+                vol.Optional(
+                    CONF_ENABLE_METRICS,
+                    default=self.config_entry.options.get(
+                        CONF_ENABLE_METRICS, DEFAULT_ENABLE_METRICS
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_ENABLE_DERIVED_METRICS,
+                    default=self.config_entry.options.get(
+                        CONF_ENABLE_DERIVED_METRICS, DEFAULT_ENABLE_DERIVED_METRICS
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_ENABLE_SAMPLE_LOG,
+                    default=self.config_entry.options.get(
+                        CONF_ENABLE_SAMPLE_LOG, DEFAULT_ENABLE_SAMPLE_LOG
+                    ),
+                ): bool,
+                vol.Optional(
+                    CONF_SAMPLE_LOG_MAX_SIZE,
+                    default=self.config_entry.options.get(
+                        CONF_SAMPLE_LOG_MAX_SIZE, DEFAULT_SAMPLE_LOG_MAX_SIZE
+                    ),
+                ): vol.All(int, vol.Range(min=1, max=1000)),
             }
         )
 
@@ -6,12 +6,85 @@ from typing import Final
 
 DOMAIN: Final = "dimplex_wpm"
 
+# Key in hass.data[DOMAIN] holding the per-gateway connection manager.
+DATA_CONNECTIONS: Final = "connections"
+# Key in hass.data[DOMAIN] holding the register map shared by all entries.
+DATA_REGISTER_MAP: Final = "register_map"
+# Key in hass.data[DOMAIN] holding the cascade coordinators by cascade name.
+DATA_CASCADES: Final = "cascades"
+
 DEFAULT_PORT: Final = 502
 DEFAULT_UNIT_ID: Final = 1
 DEFAULT_SCAN_INTERVAL: Final = 30
+DEFAULT_SLOW_SCAN_INTERVAL: Final = 120
 DEFAULT_TIMEOUT: Final = 5
 DEFAULT_ENABLE_WRITE: Final = False
 DEFAULT_SOFTWARE_VERSION: Final = "H"
+DEFAULT_MAX_IN_FLIGHT: Final = 1
+MAX_IN_FLIGHT_LIMIT: Final = 8
+# Pipelining is given up after this many consecutive cycles in which a range
+# failed concurrently but read fine on its own, and tried again after the
+# retry interval (seconds).
+PIPELINE_FAILURE_THRESHOLD: Final = 3
+PIPELINE_RETRY_INTERVAL: Final = 3600
+# Temperature publish filter: 0 disables the deadband and minimum interval.
+DEFAULT_TEMPERATURE_DEADBAND: Final = 0.0
+DEFAULT_MIN_PUBLISH_INTERVAL: Final = 0
+DEFAULT_MAX_PUBLISH_AGE: Final = 900
+DEFAULT_ENABLE_METRICS: Final = False
+DEFAULT_ADAPTIVE_SCAN: Final = False
+DEFAULT_MIN_SCAN_INTERVAL: Final = 5
+DEFAULT_MAX_SCAN_INTERVAL: Final = 300
+# Seconds a poll cycle may take before unread ranges are carried forward;
+# 0 uses the shortest poll interval.
+DEFAULT_CYCLE_BUDGET: Final = 0
+# A write to an idle register is sent at once; later writes to it within the
+# debounce window (seconds) are merged into the latest value. 0 disables the
+# per-register minimum write interval.
+DEFAULT_WRITE_DEBOUNCE: Final = 0.5
+DEFAULT_WRITE_MIN_INTERVAL: Final = 0
+DEFAULT_ENABLE_DERIVED_METRICS: Final = False
+
+DEFAULT_ENABLE_SAMPLE_LOG: Final = False
+DEFAULT_SAMPLE_LOG_MAX_SIZE: Final = 10
+
+# Raw register sample log: rotated files kept next to the current one, the
+# bound on buffered bytes, and when buffered records are written out.
+SAMPLE_LOG_DIR: Final = "dimplex_wpm"
+SAMPLE_LOG_BACKUPS: Final = 5
+SAMPLE_LOG_BUFFER_BYTES: Final = 256 * 1024
+SAMPLE_LOG_FLUSH_BYTES: Final = 16 * 1024
+SAMPLE_LOG_FLUSH_INTERVAL: Final = 60
+
+# Cascade mode: entries with the same cascade name are polled together by one
+# coordinator, at most this many units at a time.
+DEFAULT_CASCADE: Final = ""
+CASCADE_MAX_CONCURRENT: Final = 3
+
+# Derived metrics: rolling statistics of these derived keys over each window
+# (minutes), each window split into a fixed number of time buckets.
+DERIVED_METRIC_SOURCES: Final = (
+    "outdoor_temperature",
+    "flow_temperature",
+    "flow_return_spread",
+)
+DERIVED_METRIC_WINDOWS: Final = (5, 15, 60)
+DERIVED_METRIC_BUCKETS: Final = 30
+# Window (minutes) of the flow temperature slope reported as heating rate.
+HEATING_RATE_WINDOW: Final = 5
+
+# Connection circuit breaker: after this many consecutive failed requests the
+# connection is left alone for an exponentially growing, jittered backoff.
+CONNECTION_STATE_CLOSED: Final = "closed"
+CONNECTION_STATE_OPEN: Final = "open"
+CONNECTION_STATE_HALF_OPEN: Final = "half_open"
+BREAKER_FAILURE_THRESHOLD: Final = 3
+BREAKER_INITIAL_BACKOFF: Final = 10
+BREAKER_MAX_BACKOFF: Final = 600
+BREAKER_JITTER: Final = 0.2
+# Reads of registers read within this many seconds are answered from the
+# previous response; concurrent reads of the same registers share a request.
+READ_CACHE_TTL: Final = 0.5
 
 # Dimplex documentation uses 1-based register numbers and the device expects 1-based addresses.
 REGISTER_OFFSET: Final = 0
@@ -20,6 +93,8 @@ CONF_HOST: Final = "host"
 CONF_PORT: Final = "port"
 CONF_UNIT_ID: Final = "unit_id"
 CONF_SCAN_INTERVAL: Final = "scan_interval"
+CONF_FAST_SCAN_INTERVAL: Final = "fast_scan_interval"
+CONF_SLOW_SCAN_INTERVAL: Final = "slow_scan_interval"
 CONF_TIMEOUT: Final = "timeout"
 CONF_SOFTWARE_VERSION: Final = "software_version"
 CONF_REGISTER_STRATEGY: Final = "register_strategy"
@@ -27,6 +102,29 @@ CONF_ENABLE_WRITE_ENTITIES: Final = "enable_write_entities"
 CONF_ENABLE_EMS: Final = "enable_ems_entities"
 CONF_ENABLE_BMS_TEMP: Final = "enable_bms_temp"
 CONF_ENABLE_EXTERNAL_LOCK: Final = "enable_external_lock"
+CONF_MAX_IN_FLIGHT: Final = "max_in_flight"
+# Deadbands are set per sensor, stored as "deadband_<sensor key>" options.
+CONF_DEADBAND_PREFIX: Final = "deadband_"
+DEADBAND_SENSORS: Final = (
+    "outdoor_temperature",
+    "return_temperature",
+    "return_setpoint_temperature",
+    "flow_temperature",
+    "dhw_temperature",
+)
+CONF_MIN_PUBLISH_INTERVAL: Final = "min_publish_interval"
+CONF_MAX_PUBLISH_AGE: Final = "max_publish_age"
+CONF_WRITE_DEBOUNCE: Final = "write_debounce"
+CONF_WRITE_MIN_INTERVAL: Final = "write_min_interval"
+CONF_ENABLE_METRICS: Final = "enable_metrics"
+CONF_ENABLE_DERIVED_METRICS: Final = "enable_derived_metrics"
+CONF_ENABLE_SAMPLE_LOG: Final = "enable_sample_log"
+CONF_SAMPLE_LOG_MAX_SIZE: Final = "sample_log_max_size"
+CONF_ADAPTIVE_SCAN: Final = "adaptive_scan"
+CONF_CASCADE: Final = "cascade"
+CONF_MIN_SCAN_INTERVAL: Final = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL: Final = "max_scan_interval"
+CONF_CYCLE_BUDGET: Final = "cycle_budget"
 
 REGISTER_STRATEGY_AUTO: Final = "auto"
 REGISTER_STRATEGY_HOLDING: Final = "holding"
@@ -40,6 +138,25 @@ REGISTER_STRATEGY_MAP: Final = {
 
 SOFTWARE_VERSIONS: Final = ["H", "J", "L", "M"]
 
+STORAGE_VERSION: Final = 1
+# Learned register bank per read range, re-probed after repeated failures or on a timer.
+REGISTER_LAYOUT_STORAGE_KEY: Final = f"{DOMAIN}.register_layout"
+REGISTER_LAYOUT_FAILURE_THRESHOLD: Final = 3
+REGISTER_LAYOUT_REPROBE_INTERVAL: Final = 86400
+# Last good register snapshot, restored as stale data at startup. It is written
+# at most once per delay (seconds), and on shutdown.
+SNAPSHOT_STORAGE_KEY: Final = f"{DOMAIN}.snapshot"
+SNAPSHOT_SAVE_DELAY: Final = 60
+# Register discovery scans, stored per software version. Blocks answered with
+# illegal data address (0x02) or value (0x03) are bisected.
+REGISTER_MAP_STORAGE_KEY: Final = f"{DOMAIN}.register_map"
+SCAN_BISECT_EXCEPTION_CODES: Final = frozenset({0x02, 0x03})
+SERVICE_SCAN_REGISTERS: Final = "scan_registers"
+DEFAULT_SCAN_START: Final = 1
+DEFAULT_SCAN_END: Final = 200
+DEFAULT_SCAN_MAX_REQUESTS: Final = 1000
+ATTR_STALE: Final = "stale"
+
 REG_OUTDOOR_TEMPERATURE: Final = 1
 REG_RETURN_TEMPERATURE: Final = 2
 REG_DHW_TEMPERATURE: Final = 3
@@ -53,6 +170,32 @@ REG_SENSOR_ERROR_CODE: Final = 106
 
 REG_SG_READY_MODE: Final = 5167
 
+# Modbus limits a single register read to 125 registers.
+MAX_REGISTERS_PER_READ: Final = 125
+# Registers of padding worth reading to save one extra request/response round-trip.
+DEFAULT_READ_GAP: Final = 8
+
+DATA_TYPE_INT16: Final = "int16"
+DATA_TYPE_UINT16: Final = "uint16"
+DATA_TYPE_INT32: Final = "int32"
+DATA_TYPE_UINT32: Final = "uint32"
+DATA_TYPE_ENUM: Final = "enum"
+
+DATA_TYPE_WIDTH: Final = {
+    DATA_TYPE_INT16: 1,
+    DATA_TYPE_UINT16: 1,
+    DATA_TYPE_INT32: 2,
+    DATA_TYPE_UINT32: 2,
+    DATA_TYPE_ENUM: 1,
+}
+
+# Fast registers poll at the fast interval, normal ones at the scan interval and slow
+# ones at the slow interval. On-demand registers are read once and on explicit refresh.
+POLL_TIER_FAST: Final = "fast"
+POLL_TIER_NORMAL: Final = "normal"
+POLL_TIER_SLOW: Final = "slow"
+POLL_TIER_ON_DEMAND: Final = "on_demand"
+
 STATUS_MAP_LM: Final = {
     0: "Off",
     1: "Off",
@@ -363,6 +506,41 @@ STATUS_MAP_BY_VERSION: Final = {
     "L": STATUS_MAP_LM,
     "M": STATUS_MAP_LM,
 }
+
+# Adaptive polling: status codes that poll at the minimum interval (DHW charging,
+# defrost, compressor start-up) and codes that let polling back off (idle).
+ACTIVE_STATUS_CODES_HJ: Final = frozenset({4, 7, 8, 9, 21})
+ACTIVE_STATUS_CODES_LM: Final = frozenset({4, 10, 24})
+ACTIVE_STATUS_CODES_BY_VERSION: Final = {
+    "H": ACTIVE_STATUS_CODES_HJ,
+    "J": ACTIVE_STATUS_CODES_HJ,
+    "L": ACTIVE_STATUS_CODES_LM,
+    "M": ACTIVE_STATUS_CODES_LM,
+}
+IDLE_STATUS_CODES_BY_VERSION: Final = {
+    "H": frozenset({0}),
+    "J": frozenset({0}),
+    "L": frozenset({0, 1}),
+    "M": frozenset({0, 1}),
+}
+
+# Cascade aggregates: status codes with the compressor running, and the subset
+# serving a heat demand (heating, swimming pool, DHW).
+HEAT_DEMAND_STATUS_CODES_HJ: Final = frozenset({1, 2, 3, 4, 5, 6, 7})
+HEAT_DEMAND_STATUS_CODES_LM: Final = frozenset({2, 3, 4})
+HEAT_DEMAND_STATUS_CODES_BY_VERSION: Final = {
+    "H": HEAT_DEMAND_STATUS_CODES_HJ,
+    "J": HEAT_DEMAND_STATUS_CODES_HJ,
+    "L": HEAT_DEMAND_STATUS_CODES_LM,
+    "M": HEAT_DEMAND_STATUS_CODES_LM,
+}
+RUNNING_STATUS_CODES_BY_VERSION: Final = {
+    "H": HEAT_DEMAND_STATUS_CODES_HJ | {21, 24},
+    "J": HEAT_DEMAND_STATUS_CODES_HJ | {21, 24},
+    "L": HEAT_DEMAND_STATUS_CODES_LM | {5, 10},
+    "M": HEAT_DEMAND_STATUS_CODES_LM | {5, 10},
+}
+
 LOCK_MAP_BY_VERSION: Final = {
     "H": LOCK_MAP_H,
     "J": LOCK_MAP_J,
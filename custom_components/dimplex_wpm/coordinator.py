@@ -2,51 +2,79 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from collections.abc import Callable
+import time
+from array import array
+from collections.abc import Iterable, Mapping
 from datetime import timedelta
 from typing import Any
 
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util import dt as dt_util
 
 from .const import (
+    DEFAULT_CYCLE_BUDGET,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_READ_GAP,
     DEFAULT_SCAN_INTERVAL,
-    FAULT_MAP_BY_VERSION,
-    REG_FAULT_CODE,
-    LOCK_MAP_BY_VERSION,
-    REG_LOCK_CODE,
-    REG_DHW_TEMPERATURE,
-    REG_FLOW_TEMPERATURE,
-    REG_OUTDOOR_TEMPERATURE,
-    REG_RETURN_SETPOINT_TEMPERATURE,
-    REG_RETURN_TEMPERATURE,
-    REG_SG_READY_MODE,
-    SENSOR_ERROR_MAP_BY_VERSION,
-    REG_SENSOR_ERROR_CODE,
+    DEFAULT_SLOW_SCAN_INTERVAL,
+    MAX_REGISTERS_PER_READ,
+    POLL_TIER_FAST,
+    POLL_TIER_NORMAL,
+    POLL_TIER_ON_DEMAND,
+    POLL_TIER_SLOW,
     REG_STATUS_CODE,
-    SG_READY_MAP,
-    STATUS_MAP_BY_VERSION,
+    REGISTER_LAYOUT_FAILURE_THRESHOLD,
+    REGISTER_LAYOUT_REPROBE_INTERVAL,
+    REGISTER_LAYOUT_STORAGE_KEY,
+    REGISTER_STRATEGY_AUTO,
+    REGISTER_STRATEGY_HOLDING,
+    REGISTER_STRATEGY_INPUT,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_STORAGE_KEY,
+    STORAGE_VERSION,
 )
+from .decoders import get_codec
+from .derived_metrics import DerivedMetrics
+from .discovery import BankMap, isolate_range
+from .exceptions import ModbusError
 from .modbus_client import DimplexModbusClient
+from .registers import (
+    POLL_TIERS,
+    REGISTER_CATALOG,
+    BlockDecoder,
+    ReadRange,
+    RegisterSnapshot,
+    build_decoders,
+    decode_blocks,
+    plan_reads,
+)
+from .sample_log import SampleLogger
 
 LOGGER = logging.getLogger(__name__)
 
 
-def _map_code(value: int, mapping: dict[int, str]) -> str:
-    """Return a mapped string or fallback."""
-    if value in mapping:
-        return mapping[value]
-    return f"Unknown ({value})"
+def _changed(previous: dict[Any, Any], current: dict[Any, Any]) -> frozenset[Any]:
+    """Return the keys whose value differs between two snapshots."""
+    return frozenset(
+        key
+        for key in previous.keys() | current.keys()
+        if previous.get(key) != current.get(key)
+    )
+
 
+def _range_key(start: int, count: int) -> str:
+    """Return the storage key for a read range."""
+    return f"{start}:{count}"
 
-def _decode_temperature(value: int) -> float:
-    """Decode a signed temperature with 0.1 precision."""
-    # Values are int16 with scale 0.1
-    if value > 32767:
-        value -= 65536
-    return round(value * 0.1, 1)
+
+def _expired(deadline: float | None) -> bool:
+    """Return True once the event loop time has reached the deadline."""
+    return deadline is not None and asyncio.get_running_loop().time() >= deadline
 
 
 class DimplexDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
@@ -58,17 +86,37 @@ class DimplexDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         client: DimplexModbusClient,
         *,
         scan_interval: int = DEFAULT_SCAN_INTERVAL,
+        fast_scan_interval: int | None = None,
+        slow_scan_interval: int = DEFAULT_SLOW_SCAN_INTERVAL,
         register_strategy: str = "holding",
         host: str | None = None,
         port: int | None = None,
         unit_id: int | None = None,
         software_version: str | None = None,
+        entry_id: str | None = None,
+        adaptive_scan: bool = False,
+        min_scan_interval: int = DEFAULT_MIN_SCAN_INTERVAL,
+        max_scan_interval: int = DEFAULT_MAX_SCAN_INTERVAL,
+        derived_metrics: bool = False,
+        sample_log: SampleLogger | None = None,
+        cycle_budget: float = DEFAULT_CYCLE_BUDGET,
     ) -> None:
+        self._base_intervals: dict[str, float] = {
+            POLL_TIER_FAST: fast_scan_interval or scan_interval,
+            POLL_TIER_NORMAL: scan_interval,
+            POLL_TIER_SLOW: max(slow_scan_interval, scan_interval),
+        }
+        self._tier_intervals = dict(self._base_intervals)
+        self._scan_interval = float(scan_interval)
+        self._adaptive_scan = adaptive_scan
+        self._min_scan_interval = float(min(min_scan_interval, scan_interval))
+        self._max_scan_interval = float(max(max_scan_interval, scan_interval))
+        self._adaptive_interval = self._scan_interval
         super().__init__(
             hass,
             LOGGER,
             name="Dimplex WPM coordinator",
-            update_interval=timedelta(seconds=scan_interval),
+            update_interval=self.poll_interval,
         )
         self._client = client
         self._register_strategy = register_strategy
@@ -79,97 +127,825 @@ class DimplexDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             "register_strategy": register_strategy,
             "software_version": software_version,
         }
-        self._software_version = software_version
+        self._codec = get_codec(software_version)
+        self._derived_metrics = DerivedMetrics() if derived_metrics else None
+        self._sample_log = sample_log
+        # Seconds a poll may take; 0 follows the shortest poll interval.
+        self._cycle_budget = cycle_budget
+        self.overrun_cycles = 0
+        # Registers whose last read missed the deadline; they keep their
+        # previous value until a later poll reads them.
+        self.stale_registers: frozenset[int] = frozenset()
+        self.stale_keys: frozenset[str] = frozenset()
         self._consecutive_failures = 0
+        self._layout_store: Store | None = None
+        self._snapshot_store: Store | None = None
+        if entry_id is not None:
+            self._layout_store = Store(
+                hass, STORAGE_VERSION, f"{REGISTER_LAYOUT_STORAGE_KEY}.{entry_id}"
+            )
+            self._snapshot_store = Store(
+                hass, STORAGE_VERSION, f"{SNAPSHOT_STORAGE_KEY}.{entry_id}"
+            )
+        self._snapshot_scheduled: float | None = None
+        self._register_layout: dict[str, str] = {}
+        self._layout_failures: dict[str, int] = {}
+        self._layout_probed_at: float | None = None
+        self._registers = list(REGISTER_CATALOG)
+        # Addresses left out of the read plan: missing per the register map,
+        # or rejected by the device during a poll (retried once a day).
+        self._missing_addresses: set[int] = set()
+        self._rejected_addresses: set[int] = set()
+        self._rejected_at: float | None = None
+        self._register_errors: dict[int, int] = {}
+        self._bad_addresses: set[int] = set()
+        self._tier_plans: dict[str, list[ReadRange]] = {}
+        self._plan_tiers()
+        self._tier_last_read: dict[str, float] = {}
+        self._raw = RegisterSnapshot()
+        self._decoders: tuple[BlockDecoder, ...] = ()
+        self._decoder_layout: tuple[tuple[int, int], ...] | None = None
+        self.changed_registers: frozenset[int] = frozenset()
+        self.changed_keys: frozenset[str] = frozenset()
+        self.entity_writes = {"written": 0, "suppressed": 0}
+        # Every write gets a generation; reads remember the one they started
+        # in, so values read before a write cannot replace its read-back.
+        self._write_generation = 0
+        self._register_generations: dict[int, int] = {}
+
+    def _plan_tiers(self) -> None:
+        """Plan the reads of each tier.
+
+        Each tier is planned on its own so the ranges, and the banks learned
+        for them, stay the same whichever tiers are due in a cycle. Ranges of
+        tiers due together are merged into shared requests when read.
+        """
+        self._tier_plans = {}
+        for tier in POLL_TIERS:
+            registers = [register for register in self._registers if register.tier == tier]
+            if registers:
+                self._tier_plans[tier] = plan_reads(
+                    registers, bad_addresses=self._bad_addresses
+                )
+
+    def _update_bad_addresses(self) -> bool:
+        """Re-plan the reads if the addresses to route around changed."""
+        bad = self._missing_addresses | self._rejected_addresses
+        if bad == self._bad_addresses:
+            return False
+        self._bad_addresses = bad
+        self._plan_tiers()
+        # Blocks of ranges that are no longer planned could shadow the new ones.
+        planned = {(read_range.start, read_range.count) for read_range in self.read_plan}
+        self._raw = RegisterSnapshot(
+            {
+                start: block
+                for start, block in self._raw.blocks.items()
+                if (start, len(block)) in planned
+            }
+        )
+        return True
+
+    def apply_register_map(self, banks: Mapping[str, BankMap]) -> None:
+        """Leave addresses a discovery scan found missing out of the read plan.
+
+        This covers the catalog registers and the gaps the planner could pad
+        across next to them. Under the ``auto`` strategy an address of the
+        ``auto`` bank only counts as missing if it is missing from both banks.
+        """
+        bad: set[int] = set()
+        for register in self._registers:
+            bank = register.bank
+            if bank == REGISTER_STRATEGY_AUTO:
+                bank = self._register_strategy
+            candidates = (
+                (REGISTER_STRATEGY_INPUT, REGISTER_STRATEGY_HOLDING)
+                if bank == REGISTER_STRATEGY_AUTO
+                else (bank,)
+            )
+            if not all(candidate in banks for candidate in candidates):
+                continue
+            for address in range(
+                max(register.address - DEFAULT_READ_GAP, 0),
+                register.address + register.width + DEFAULT_READ_GAP,
+            ):
+                if all(banks[candidate].missing(address) for candidate in candidates):
+                    bad.add(address)
+        self._missing_addresses = bad
+        if self._update_bad_addresses():
+            LOGGER.debug("Addresses missing per the register map: %s", sorted(bad))
+            self._tier_last_read.clear()
+        if self._register_strategy == REGISTER_STRATEGY_AUTO:
+            self._seed_register_layout(banks)
+
+    def _seed_register_layout(self, banks: Mapping[str, BankMap]) -> None:
+        """Learn the bank of ranges that a scan found in one bank only."""
+        for read_range in self.read_plan:
+            key = _range_key(read_range.start, read_range.count)
+            if read_range.bank != REGISTER_STRATEGY_AUTO or key in self._register_layout:
+                continue
+            found = [
+                bank
+                for bank in (REGISTER_STRATEGY_INPUT, REGISTER_STRATEGY_HOLDING)
+                if bank in banks
+                and all(
+                    banks[bank].covers(address)
+                    for address in range(read_range.start, read_range.end + 1)
+                )
+            ]
+            if len(found) == 1:
+                self._register_layout[key] = found[0]
+
+    @property
+    def bad_addresses(self) -> list[int]:
+        """Return the addresses left out of the read plan for diagnostics."""
+        return sorted(self._bad_addresses)
+
+    @property
+    def register_errors(self) -> dict[int, int]:
+        """Return how often each address was found rejecting reads."""
+        return dict(sorted(self._register_errors.items()))
+
+    @property
+    def poll_interval(self) -> timedelta:
+        """Return the interval of the shortest poll tier."""
+        return timedelta(seconds=min(self._tier_intervals.values()))
+
+    def join_cascade(self) -> None:
+        """Leave the poll schedule to a cascade coordinator.
+
+        The cascade polls this unit together with the others, through
+        ``async_poll``; manual refreshes keep working.
+        """
+        self.update_interval = None
+
+    def poll_due(self) -> bool:
+        """Return True if any poll tier is due."""
+        return bool(self._due_tiers(time.monotonic()))
+
+    @property
+    def read_plan(self) -> list[ReadRange]:
+        """Return the planned read requests for diagnostics."""
+        return [read_range for plan in self._tier_plans.values() for read_range in plan]
+
+    def _due_tiers(self, now: float) -> list[str]:
+        """Return the tiers whose interval has elapsed.
+
+        Half a coordinator tick of slack keeps scheduling jitter from pushing
+        a tier to the following tick. On-demand tiers are only read once.
+        """
+        slack = self.poll_interval.total_seconds() / 2
+        due: list[str] = []
+        for tier in self._tier_plans:
+            last_read = self._tier_last_read.get(tier)
+            if last_read is None:
+                due.append(tier)
+            elif tier != POLL_TIER_ON_DEMAND and (
+                now - last_read >= self._tier_intervals[tier] - slack
+            ):
+                due.append(tier)
+        return due
+
+    def _adapt_interval(
+        self, tiers: list[str], raw: RegisterSnapshot, previous_raw: Mapping[int, int]
+    ) -> None:
+        """Adjust polling to the heat pump state after the status was read.
+
+        A status transition or an active state (DHW charging, defrost,
+        compressor start-up) drops to the minimum interval. While the pump is
+        idle or nothing changed, the interval doubles up to the maximum;
+        steady operation returns to the configured scan interval. Every tier
+        is scaled by the same factor and kept within the user bounds, unless
+        its configured interval is already outside them.
+        """
+        if not self._adaptive_scan or POLL_TIER_NORMAL not in tiers:
+            return
+        status = raw.get(REG_STATUS_CODE)
+        previous_status = previous_raw.get(REG_STATUS_CODE)
+        if (
+            previous_status is not None and status != previous_status
+        ) or status in self._codec.active_status_codes:
+            interval = self._min_scan_interval
+        elif status in self._codec.idle_status_codes or not self.changed_registers:
+            interval = min(self._adaptive_interval * 2, self._max_scan_interval)
+        else:
+            interval = self._scan_interval
+        if interval == self._adaptive_interval:
+            return
+        LOGGER.debug(
+            "Adaptive scan interval %ss -> %ss (status %s)",
+            self._adaptive_interval,
+            interval,
+            status,
+        )
+        self._adaptive_interval = interval
+        factor = interval / self._scan_interval
+        for tier, base in self._base_intervals.items():
+            self._tier_intervals[tier] = min(
+                max(base, self._max_scan_interval),
+                max(min(base, self._min_scan_interval), base * factor),
+            )
+        if self.update_interval is not None:
+            self.update_interval = self.poll_interval
+
+    def invalidate_registers(self, registers: Iterable[int]) -> None:
+        """Make the tiers holding these registers due on the next refresh."""
+        addresses = set(registers)
+        for register in self._registers:
+            if register.address in addresses:
+                self._tier_last_read.pop(register.tier, None)
+
+    @property
+    def register_layout(self) -> dict[str, Any]:
+        """Return the learned register bank per range for diagnostics."""
+        return {
+            "banks": dict(self._register_layout),
+            "failures": dict(self._layout_failures),
+            "probed_at": self._layout_probed_at,
+        }
+
+    async def async_load_register_layout(self) -> None:
+        """Restore the learned register layout from storage."""
+        if self._layout_store is None:
+            return
+        stored = await self._layout_store.async_load()
+        if not stored:
+            return
+        # Drop ranges that are no longer part of the read plan.
+        planned = {_range_key(item.start, item.count) for item in self.read_plan}
+        self._register_layout = {
+            key: bank for key, bank in stored.get("banks", {}).items() if key in planned
+        }
+        self._layout_probed_at = stored.get("probed_at")
+        LOGGER.debug("Restored register layout %s", self._register_layout)
+
+    def _layout_data(self) -> dict[str, Any]:
+        return {"banks": self._register_layout, "probed_at": self._layout_probed_at}
+
+    def _save_register_layout(self) -> None:
+        if self._layout_store is not None:
+            self._layout_store.async_delay_save(self._layout_data, 10)
+
+    @property
+    def stale(self) -> bool:
+        """Return True while the data is a snapshot restored from storage."""
+        return bool(self.data and self.data["meta"].get("stale"))
+
+    async def async_restore_snapshot(self) -> bool:
+        """Seed the coordinator with the last good snapshot from storage.
+
+        The restored data is marked stale until the first poll replaces it.
+        Returns False if there was nothing to restore.
+        """
+        if self._snapshot_store is None:
+            return False
+        stored = await self._snapshot_store.async_load()
+        if not stored or not stored.get("blocks"):
+            return False
+        snapshot = RegisterSnapshot(
+            {
+                int(start): array("H", block)
+                for start, block in stored["blocks"].items()
+            }
+        )
+        data = self._build_data(snapshot, [], 0.0)
+        data["meta"]["stale"] = True
+        data["meta"]["last_update"] = stored.get("last_update")
+        self.data = data
+        LOGGER.debug(
+            "Restored %s registers from %s", len(snapshot), stored.get("last_update")
+        )
+        return True
+
+    def _snapshot_data(self) -> dict[str, Any]:
+        data = self.data or {}
+        raw = data.get("raw", RegisterSnapshot())
+        return {
+            "blocks": {str(start): block.tolist() for start, block in raw.blocks.items()},
+            "last_update": data.get("meta", {}).get("last_update"),
+        }
+
+    def _save_snapshot(self) -> None:
+        """Schedule a snapshot write unless one is already pending.
+
+        Store.async_delay_save restarts its timer on every call, so calling
+        it on each poll would postpone the write until shutdown.
+        """
+        if self._snapshot_store is None:
+            return
+        now = time.monotonic()
+        if (
+            self._snapshot_scheduled is not None
+            and now - self._snapshot_scheduled < SNAPSHOT_SAVE_DELAY
+        ):
+            return
+        self._snapshot_scheduled = now
+        self._snapshot_store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
 
     async def _async_update_data(self) -> dict[str, Any]:
         """Fetch data from Modbus and return structured payload."""
+        return await self.async_poll()
+
+    async def async_poll(self, last_update: str | None = None) -> dict[str, Any]:
+        """Read the due tiers and return the new snapshot.
+
+        ``last_update`` stamps the snapshot, so a cascade can give all its
+        units the time of the cycle. Failures raise ``UpdateFailed``.
+        """
+        started = time.monotonic()
+        generation = self._write_generation
+        if (
+            self._rejected_at is not None
+            and started - self._rejected_at > REGISTER_LAYOUT_REPROBE_INTERVAL
+        ):
+            LOGGER.debug("Retrying rejected registers %s", sorted(self._rejected_addresses))
+            self._rejected_addresses.clear()
+            self._rejected_at = None
+            self._update_bad_addresses()
+        tiers = self._due_tiers(started)
+        plan = [read_range for tier in tiers for read_range in self._tier_plans[tier]]
+        budget = self._cycle_budget or self.poll_interval.total_seconds()
+        deadline = asyncio.get_running_loop().time() + budget
         try:
-            raw = await self._read_registers()
+            values = await self._read_registers(plan, deadline)
         except Exception as err:
             self._consecutive_failures += 1
+            self._publish_failure()
             raise UpdateFailed(f"Error communicating with Modbus device: {err}") from err
-        self._consecutive_failures = 0
-
-        derived: dict[str, Any] = {}
-        if REG_OUTDOOR_TEMPERATURE in raw:
-            derived["outdoor_temperature"] = _decode_temperature(
-                raw[REG_OUTDOOR_TEMPERATURE]
-            )
-        if REG_RETURN_TEMPERATURE in raw:
-            derived["return_temperature"] = _decode_temperature(raw[REG_RETURN_TEMPERATURE])
-        if REG_RETURN_SETPOINT_TEMPERATURE in raw:
-            derived["return_setpoint_temperature"] = _decode_temperature(
-                raw[REG_RETURN_SETPOINT_TEMPERATURE]
-            )
-        if REG_FLOW_TEMPERATURE in raw:
-            derived["flow_temperature"] = _decode_temperature(raw[REG_FLOW_TEMPERATURE])
-        if REG_DHW_TEMPERATURE in raw:
-            derived["dhw_temperature"] = _decode_temperature(raw[REG_DHW_TEMPERATURE])
 
-        status_map = STATUS_MAP_BY_VERSION.get(
-            self._software_version, STATUS_MAP_BY_VERSION["H"]
+        late = (
+            [
+                read_range
+                for read_range in plan
+                if not values.covers(read_range.start, read_range.count)
+            ]
+            if _expired(deadline)
+            else []
         )
-        lock_map = LOCK_MAP_BY_VERSION.get(
-            self._software_version, LOCK_MAP_BY_VERSION["H"]
+        if late:
+            self.overrun_cycles += 1
+            LOGGER.debug(
+                "Poll overran its %ss budget, %s of %s ranges carried forward",
+                budget,
+                len(late),
+                len(plan),
+            )
+            if len(late) == len(plan):
+                self._consecutive_failures += 1
+                self._publish_failure()
+                raise UpdateFailed(f"No registers were read within the {budget}s budget")
+        self._consecutive_failures = 0
+        self.stale_registers = frozenset(
+            (self.stale_registers - set(values))
+            | {
+                address
+                for read_range in late
+                for address in range(read_range.start, read_range.end + 1)
+            }
         )
-        fault_map = FAULT_MAP_BY_VERSION.get(
-            self._software_version, FAULT_MAP_BY_VERSION["H"]
+        self.stale_keys = self._register_keys(self.stale_registers)
+        for tier in tiers:
+            # A tier with late ranges stays due for the next cycle.
+            if not any(read_range in late for read_range in self._tier_plans[tier]):
+                self._tier_last_read[tier] = started
+        data = self._build_data(
+            values,
+            tiers,
+            time.monotonic() - started,
+            last_update=last_update,
+            generation=generation,
         )
-        sensor_error_map = SENSOR_ERROR_MAP_BY_VERSION.get(
-            self._software_version, SENSOR_ERROR_MAP_BY_VERSION["H"]
+        self._save_snapshot()
+        if self._sample_log is not None:
+            self._sample_log.record(data["raw"])
+        return data
+
+    async def async_refresh_registers(self, registers: Iterable[int]) -> RegisterSnapshot:
+        """Re-read only the ranges holding these registers and notify listeners.
+
+        The values are merged into the current snapshot outside the regular
+        schedule; entities that do not depend on them skip their state write.
+        """
+        addresses = set(registers)
+        plan = [
+            read_range
+            for read_range in self.read_plan
+            if any(read_range.start <= address <= read_range.end for address in addresses)
+        ]
+        if not plan:
+            return RegisterSnapshot()
+        started = time.monotonic()
+        generation = self._write_generation
+        values = await self._read_registers(plan)
+        stale = self.stale
+        data = self._build_data(
+            values, [], time.monotonic() - started, generation=generation
         )
+        data["meta"]["stale"] = stale
+        self.data = data
+        self.async_update_listeners()
+        return values
+
+    async def async_write_register(self, address: int, value: int) -> None:
+        """Write a holding register and confirm the value by reading it back.
 
-        if REG_STATUS_CODE in raw:
-            derived["status_text"] = _map_code(raw[REG_STATUS_CODE], status_map)
-        if REG_SENSOR_ERROR_CODE in raw:
-            derived["sensor_error_text"] = _map_code(
-                raw[REG_SENSOR_ERROR_CODE],
-                sensor_error_map,
+        A write merged with a later one is confirmed against the value that
+        was actually written.
+        """
+        written = await self._client.write_register(address, value)
+        # Reads that started before the write completed may hold the old value.
+        self._write_generation += 1
+        self._register_generations[address] = self._write_generation
+        values = await self.async_refresh_registers((address,))
+        if address in values and values[address] != written:
+            raise ModbusError(
+                f"Register {address} reads back {values[address]} after writing {written}"
             )
-        if REG_SG_READY_MODE in raw:
-            derived["sg_ready_text"] = _map_code(raw[REG_SG_READY_MODE], SG_READY_MAP)
-        if REG_LOCK_CODE in raw:
-            derived["lock_text"] = _map_code(raw[REG_LOCK_CODE], lock_map)
-            derived["lock_active"] = raw[REG_LOCK_CODE] != 0
-        if REG_FAULT_CODE in raw:
-            derived["fault_text"] = _map_code(raw[REG_FAULT_CODE], fault_map)
-            derived["fault_active"] = raw[REG_FAULT_CODE] != 0
+        LOGGER.debug("Register %s confirmed at %s", address, written)
+
+    def _register_keys(self, addresses: Iterable[int]) -> frozenset[str]:
+        """Return the derived keys decoded from these registers."""
+        addresses = frozenset(addresses)
+        return frozenset(
+            [register.key for register in self._registers if register.address in addresses]
+            + [
+                key
+                for field in self._codec.fields
+                if field.register in addresses
+                for key in (field.key, field.flag)
+                if key is not None
+            ]
+        )
+
+    def _drop_overwritten(self, values: RegisterSnapshot, generation: int) -> RegisterSnapshot:
+        """Replace values of registers written after the read started.
+
+        A read in flight when a write lands may return the old value, which
+        must not override the confirmed read-back in the snapshot. Blocks
+        with such a register get its current value, or are left out if there
+        is none yet.
+        """
+        written = [
+            address
+            for address, written_in in self._register_generations.items()
+            if written_in > generation
+        ]
+        blocks = dict(values.blocks)
+        for start, block in values.blocks.items():
+            overwritten = [address for address in written if start <= address < start + len(block)]
+            if not overwritten:
+                continue
+            if any(address not in self._raw for address in overwritten):
+                del blocks[start]
+                continue
+            block = array("H", block)
+            for address in overwritten:
+                block[address - start] = self._raw[address]
+            blocks[start] = block
+            LOGGER.debug("Keeping registers %s written during the read", overwritten)
+        return RegisterSnapshot(blocks)
+
+    def _build_data(
+        self,
+        values: RegisterSnapshot,
+        tiers: list[str],
+        cycle_time: float,
+        *,
+        last_update: str | None = None,
+        generation: int | None = None,
+    ) -> dict[str, Any]:
+        """Merge freshly read registers into the snapshot and decode it.
+
+        ``generation`` is the write generation the read started in; registers
+        written since then keep their current value.
+        """
+        if generation is not None and generation < self._write_generation:
+            values = self._drop_overwritten(values, generation)
+        self._raw.merge(values)
+        raw = self._raw.copy()
+
+        decode_started = time.monotonic()
+        layout = raw.layout
+        if layout != self._decoder_layout:
+            self._decoders = build_decoders(self._registers, layout)
+            self._decoder_layout = layout
+        derived: dict[str, Any] = decode_blocks(raw, self._decoders)
+        self._codec.decode(raw, derived)
+        if self._derived_metrics is not None:
+            # Only polls add samples, and only of registers they read;
+            # partial refreshes and restored snapshots carry the latest
+            # results forward.
+            if tiers:
+                self._derived_metrics.update(
+                    decode_started, derived, fresh=self._register_keys(values)
+                )
+            else:
+                derived.update(self._derived_metrics.values)
+
+        metrics = self._client.metrics
+        if metrics is not None:
+            metrics.decode_time.record(time.monotonic() - decode_started)
+            derived.update(metrics.summary())
+
+        previous = self.data or {}
+        self.changed_registers = raw.changed(previous.get("raw"))
+        self.changed_keys = _changed(previous.get("derived", {}), derived)
+        self._adapt_interval(tiers, raw, previous.get("raw", {}))
 
         meta = {
-            "last_update": dt_util.utcnow().isoformat(),
+            "last_update": last_update or dt_util.utcnow().isoformat(),
             "update_success": True,
             "consecutive_failures": self._consecutive_failures,
+            "stale": False,
+            "cycle_time": round(cycle_time, 3),
+            "scan_interval": self._tier_intervals[POLL_TIER_NORMAL],
+            "max_in_flight": self._client.max_in_flight,
+            "connection": self._client.connection_state,
+            "tiers_read": tiers,
+            "registers_read": len(values),
+            "rejected_registers": sorted(self._rejected_addresses),
+            "overrun_cycles": self.overrun_cycles,
+            "stale_registers": sorted(self.stale_registers),
+            "entity_writes": dict(self.entity_writes),
             **self._connection_info,
         }
 
         return {"raw": raw, "derived": derived, "meta": meta}
 
-    async def _read_registers(self) -> dict[int, int]:
-        """Read registers according to configured strategy."""
-        # Minimal set of contiguous ranges to reduce calls.
-        ranges = [
-            (REG_OUTDOOR_TEMPERATURE, 6),  # 1-6 includes temperatures
-            (REG_RETURN_SETPOINT_TEMPERATURE, 1),
-            (REG_STATUS_CODE, 4),  # 103-106 codes
-            (REG_SG_READY_MODE, 1),
+    def _publish_failure(self) -> None:
+        """Record a failed poll in the meta data of the last good snapshot.
+
+        The coordinator only notifies listeners on the first of several
+        failed refreshes, so later ones are pushed here to keep the failure
+        count and circuit breaker state on the controller info current.
+        """
+        if not self.data:
+            return
+        self.data = {
+            **self.data,
+            "meta": {
+                **self.data["meta"],
+                "update_success": False,
+                "consecutive_failures": self._consecutive_failures,
+                "connection": self._client.connection_state,
+            },
+        }
+        if not self.last_update_success:
+            self.async_update_listeners()
+
+    async def _read_registers(
+        self, plan: list[ReadRange], deadline: float | None = None
+    ) -> RegisterSnapshot:
+        """Read the planned ranges, grouped per register bank, by the deadline."""
+        requests = self._coalesce_ranges(plan)
+        ranges_by_bank: dict[str, list[tuple[int, int]]] = {}
+        for request in requests:
+            ranges_by_bank.setdefault(request.bank, []).append((request.start, request.count))
+
+        read = RegisterSnapshot()
+        results = await asyncio.gather(
+            *(
+                self._read_bank_ranges(bank, ranges, deadline)
+                for bank, ranges in ranges_by_bank.items()
+            )
+        )
+        for values in results:
+            read.merge(values)
+        # Keep one block per planned range, as the snapshot is laid out by plan.
+        blocks: dict[int, array] = {}
+        for request, covered in requests.items():
+            block = read.blocks.get(request.start)
+            if block is None or len(block) < request.count:
+                continue
+            for read_range in covered:
+                offset = read_range.start - request.start
+                blocks[read_range.start] = (
+                    block
+                    if read_range is request
+                    else block[offset : offset + read_range.count]
+                )
+        raw = RegisterSnapshot(blocks)
+        failed = [
+            read_range for read_range in plan if not raw.covers(read_range.start, read_range.count)
         ]
+        if failed and not _expired(deadline):
+            try:
+                async with asyncio.timeout_at(deadline):
+                    raw.merge(await self._isolate_failed_ranges(failed))
+            except TimeoutError:
+                LOGGER.debug("Isolating rejected ranges missed the deadline, retrying next poll")
+        return raw
+
+    def _coalesce_ranges(self, plan: list[ReadRange]) -> dict[ReadRange, list[ReadRange]]:
+        """Merge neighbouring ranges of different tiers into shared requests.
 
-        strategy = "holding" if self._register_strategy == "holding" else "input"
+        Tiers are planned on their own, so ranges next to each other in tiers
+        that are due together would otherwise cost a request each. Returns
+        every request with the planned ranges it covers. ``auto`` ranges are
+        merged only once they share a learned bank.
+        """
+        requests: dict[ReadRange, list[ReadRange]] = {}
+        ranges_by_bank: dict[str, list[ReadRange]] = {}
+        for read_range in plan:
+            bank = read_range.bank
+            if bank == REGISTER_STRATEGY_AUTO:
+                if self._register_strategy == REGISTER_STRATEGY_HOLDING:
+                    bank = REGISTER_STRATEGY_HOLDING
+                elif self._register_strategy != REGISTER_STRATEGY_AUTO:
+                    bank = REGISTER_STRATEGY_INPUT
+                else:
+                    bank = self._register_layout.get(
+                        _range_key(read_range.start, read_range.count), bank
+                    )
+            if bank == REGISTER_STRATEGY_AUTO:
+                requests[read_range] = [read_range]
+            else:
+                ranges_by_bank.setdefault(bank, []).append(read_range)
 
-        if self._register_strategy == "auto":
-            # Try input registers first, fall back to holding on failure.
+        for bank, ranges in ranges_by_bank.items():
+            ranges.sort(key=lambda read_range: read_range.start)
+            groups = [[ranges[0]]]
+            for read_range in ranges[1:]:
+                group = groups[-1]
+                end = max(item.end for item in group)
+                if (
+                    read_range.start <= end + 1 + DEFAULT_READ_GAP
+                    and max(end, read_range.end) - group[0].start + 1 <= MAX_REGISTERS_PER_READ
+                    and not any(
+                        address in self._bad_addresses
+                        for address in range(end + 1, read_range.start)
+                    )
+                ):
+                    group.append(read_range)
+                else:
+                    groups.append([read_range])
+            for group in groups:
+                if len(group) == 1:
+                    requests[group[0]] = group
+                    continue
+                start = group[0].start
+                end = max(item.end for item in group)
+                requests[ReadRange(bank, start, end - start + 1)] = group
+        return requests
+
+    async def _isolate_failed_ranges(self, failed: list[ReadRange]) -> RegisterSnapshot:
+        """Bisect rejected ranges and plan the next reads around what fails.
+
+        One unsupported address must not blank out the rest of its range:
+        the readable part is returned for this cycle, in blocks matching the
+        new plan, and the failing addresses are left out from now on.
+        """
+        found = RegisterSnapshot()
+        rejected: set[int] = set()
+        for read_range in failed:
             try:
-                raw = await self._client.read_ranges(ranges, "input")
-                if raw:
-                    return raw
-            except Exception as err:
-                LOGGER.debug("Input register read failed (%s), retrying as holding", err)
-            return await self._client.read_ranges(ranges, "holding")
+                values, missing = await self._isolate_range(read_range)
+            except ModbusError as err:
+                LOGGER.debug(
+                    "Could not isolate the failure of range %s: %s",
+                    _range_key(read_range.start, read_range.count),
+                    err,
+                )
+                continue
+            found.merge(values)
+            rejected.update(missing)
 
-        return await self._client.read_ranges(ranges, strategy)
+        for address in rejected:
+            self._register_errors[address] = self._register_errors.get(address, 0) + 1
+        if rejected - self._rejected_addresses:
+            LOGGER.warning(
+                "Device rejects registers %s, reading around them",
+                sorted(rejected - self._rejected_addresses),
+            )
+            self._rejected_addresses |= rejected
+            self._rejected_at = time.monotonic()
+            self._update_bad_addresses()
 
-    @property
-    def write_sg_ready(self) -> Callable[[int, int], Any]:
-        """Return helper for writing SG Ready values."""
-        return self._client.write_register
+        blocks: dict[int, array] = {}
+        for read_range in self.read_plan:
+            addresses = range(read_range.start, read_range.end + 1)
+            if all(address in found for address in addresses):
+                blocks[read_range.start] = array("H", (found[address] for address in addresses))
+        return RegisterSnapshot(blocks)
+
+    async def _isolate_range(self, read_range: ReadRange) -> tuple[RegisterSnapshot, list[int]]:
+        """Bisect a range in its bank; ``auto`` ranges fall back to the other bank."""
+        if read_range.bank != REGISTER_STRATEGY_AUTO:
+            banks: tuple[str, ...] = (read_range.bank,)
+        elif self._register_strategy == REGISTER_STRATEGY_HOLDING:
+            banks = (REGISTER_STRATEGY_HOLDING,)
+        elif self._register_strategy != REGISTER_STRATEGY_AUTO:
+            banks = (REGISTER_STRATEGY_INPUT,)
+        elif (
+            self._register_layout.get(_range_key(read_range.start, read_range.count))
+            == REGISTER_STRATEGY_HOLDING
+        ):
+            banks = (REGISTER_STRATEGY_HOLDING, REGISTER_STRATEGY_INPUT)
+        else:
+            banks = (REGISTER_STRATEGY_INPUT, REGISTER_STRATEGY_HOLDING)
+
+        for bank in banks:
+            values, missing = await isolate_range(
+                self._client, bank, read_range.start, read_range.count
+            )
+            if values.blocks or bank == banks[-1]:
+                LOGGER.debug(
+                    "Isolated range %s in %s registers: rejected %s",
+                    _range_key(read_range.start, read_range.count),
+                    bank,
+                    missing,
+                )
+                return values, missing
+        return RegisterSnapshot(), []
+
+    async def _read_bank_ranges(
+        self, bank: str, ranges: list[tuple[int, int]], deadline: float | None = None
+    ) -> RegisterSnapshot:
+        """Read ranges from a fixed bank or according to the configured strategy."""
+        if bank != REGISTER_STRATEGY_AUTO:
+            return await self._client.read_ranges(ranges, bank, deadline=deadline)
+
+        if self._register_strategy != REGISTER_STRATEGY_AUTO:
+            strategy = (
+                REGISTER_STRATEGY_HOLDING
+                if self._register_strategy == REGISTER_STRATEGY_HOLDING
+                else REGISTER_STRATEGY_INPUT
+            )
+            return await self._client.read_ranges(ranges, strategy, deadline=deadline)
+
+        return await self._read_learned_ranges(ranges, deadline)
+
+    async def _read_learned_ranges(
+        self, ranges: list[tuple[int, int]], deadline: float | None = None
+    ) -> RegisterSnapshot:
+        """Read ranges from their learned bank, probing only unknown ones."""
+        now = dt_util.utcnow().timestamp()
+        if (
+            self._register_layout
+            and self._layout_probed_at is not None
+            and now - self._layout_probed_at > REGISTER_LAYOUT_REPROBE_INTERVAL
+        ):
+            LOGGER.debug("Register layout expired, re-probing all ranges")
+            self._register_layout.clear()
+            self._layout_failures.clear()
+
+        by_bank: dict[str, list[tuple[int, int]]] = {}
+        unknown: list[tuple[int, int]] = []
+        for start, count in ranges:
+            bank = self._register_layout.get(_range_key(start, count))
+            if bank is None:
+                unknown.append((start, count))
+            else:
+                by_bank.setdefault(bank, []).append((start, count))
+
+        raw = RegisterSnapshot()
+        layout_changed = False
+        for bank, bank_ranges in by_bank.items():
+            values = await self._client.read_ranges(bank_ranges, bank, deadline=deadline)
+            raw.merge(values)
+            for start, count in bank_ranges:
+                key = _range_key(start, count)
+                if values.covers(start, count):
+                    self._layout_failures.pop(key, None)
+                    continue
+                if _expired(deadline):
+                    # Cut short by the deadline, not a failure of the bank.
+                    continue
+                self._layout_failures[key] = self._layout_failures.get(key, 0) + 1
+                if self._layout_failures[key] >= REGISTER_LAYOUT_FAILURE_THRESHOLD:
+                    LOGGER.debug("Range %s failed repeatedly, re-probing its bank", key)
+                    del self._register_layout[key]
+                    self._layout_failures.pop(key)
+                    layout_changed = True
+
+        for start, count in unknown:
+            values, bank = await self._probe_range(start, count, deadline)
+            raw.merge(values)
+            if bank is not None:
+                self._register_layout[_range_key(start, count)] = bank
+                self._layout_probed_at = now
+                layout_changed = True
+
+        if layout_changed:
+            self._save_register_layout()
+        return raw
+
+    async def _probe_range(
+        self, start: int, count: int, deadline: float | None = None
+    ) -> tuple[RegisterSnapshot, str | None]:
+        """Try input registers first, then holding, and report the bank that worked."""
+        values = RegisterSnapshot()
+        for bank in (REGISTER_STRATEGY_INPUT, REGISTER_STRATEGY_HOLDING):
+            try:
+                values = await self._client.read_ranges(
+                    [(start, count)], bank, deadline=deadline
+                )
+            except Exception as err:
+                if bank == REGISTER_STRATEGY_HOLDING:
+                    raise
+                LOGGER.debug("Input register read failed (%s), retrying as holding", err)
+                continue
+            if values.covers(start, count):
+                LOGGER.debug("Learned %s registers for range %s", bank, _range_key(start, count))
+                return values, bank
+        return values, None
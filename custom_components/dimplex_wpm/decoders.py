@@ -0,0 +1,164 @@
+"""Firmware specific decoding of the status, lock, fault and error codes.
+
+A software version is described by a :class:`FirmwareProfile` holding its
+code maps. Supporting a new version means adding its maps to the
+``*_BY_VERSION`` tables in ``const.py`` or calling :func:`register_firmware`.
+Each profile is compiled once into a :class:`FirmwareCodec` with dense lookup
+tables, shared by every coordinator using that version.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from .const import (
+    ACTIVE_STATUS_CODES_BY_VERSION,
+    DEFAULT_SOFTWARE_VERSION,
+    FAULT_MAP_BY_VERSION,
+    HEAT_DEMAND_STATUS_CODES_BY_VERSION,
+    IDLE_STATUS_CODES_BY_VERSION,
+    LOCK_MAP_BY_VERSION,
+    REG_FAULT_CODE,
+    REG_LOCK_CODE,
+    REG_SENSOR_ERROR_CODE,
+    REG_SG_READY_MODE,
+    REG_STATUS_CODE,
+    RUNNING_STATUS_CODES_BY_VERSION,
+    SENSOR_ERROR_MAP_BY_VERSION,
+    SG_READY_MAP,
+    SOFTWARE_VERSIONS,
+    STATUS_MAP_BY_VERSION,
+)
+
+
+@dataclass(frozen=True)
+class FirmwareProfile:
+    """Code maps, adaptive polling and cascade states of one software version."""
+
+    status: Mapping[int, str]
+    lock: Mapping[int, str]
+    fault: Mapping[int, str]
+    sensor_error: Mapping[int, str]
+    active_status_codes: frozenset[int]
+    idle_status_codes: frozenset[int]
+    running_status_codes: frozenset[int] = frozenset()
+    heat_demand_status_codes: frozenset[int] = frozenset()
+
+
+FIRMWARE_PROFILES: dict[str, FirmwareProfile] = {
+    version: FirmwareProfile(
+        status=STATUS_MAP_BY_VERSION[version],
+        lock=LOCK_MAP_BY_VERSION[version],
+        fault=FAULT_MAP_BY_VERSION[version],
+        sensor_error=SENSOR_ERROR_MAP_BY_VERSION[version],
+        active_status_codes=ACTIVE_STATUS_CODES_BY_VERSION[version],
+        idle_status_codes=IDLE_STATUS_CODES_BY_VERSION[version],
+        running_status_codes=RUNNING_STATUS_CODES_BY_VERSION[version],
+        heat_demand_status_codes=HEAT_DEMAND_STATUS_CODES_BY_VERSION[version],
+    )
+    for version in SOFTWARE_VERSIONS
+}
+
+
+class CodeTable:
+    """Dense code to text lookup compiled from a sparse map.
+
+    Texts are interned, so repeated entries such as "Reserved" share one
+    string. Codes missing from the map get an "Unknown (n)" text, built once.
+    """
+
+    __slots__ = ("_texts", "_unknown")
+
+    def __init__(self, mapping: Mapping[int, str]) -> None:
+        texts: list[str | None] = [None] * (max(mapping, default=-1) + 1)
+        for code, text in mapping.items():
+            texts[code] = sys.intern(text)
+        self._texts: tuple[str | None, ...] = tuple(texts)
+        self._unknown: dict[int, str] = {}
+
+    def text(self, code: int) -> str:
+        """Return the text for a code."""
+        if code < len(self._texts):
+            text = self._texts[code]
+            if text is not None:
+                return text
+        text = self._unknown.get(code)
+        if text is None:
+            text = self._unknown[code] = f"Unknown ({code})"
+        return text
+
+
+@dataclass(frozen=True)
+class CodeField:
+    """A code register decoded into a derived text and optional active flag."""
+
+    register: int
+    key: str
+    table: CodeTable
+    flag: str | None = None
+
+
+_SG_READY_TABLE = CodeTable(SG_READY_MAP)
+
+
+class FirmwareCodec:
+    """Decode every code register of one software version in a single pass."""
+
+    __slots__ = (
+        "fields",
+        "active_status_codes",
+        "idle_status_codes",
+        "running_status_codes",
+        "heat_demand_status_codes",
+    )
+
+    def __init__(self, profile: FirmwareProfile) -> None:
+        self.fields: tuple[CodeField, ...] = (
+            CodeField(REG_STATUS_CODE, "status_text", CodeTable(profile.status)),
+            CodeField(REG_LOCK_CODE, "lock_text", CodeTable(profile.lock), "lock_active"),
+            CodeField(REG_FAULT_CODE, "fault_text", CodeTable(profile.fault), "fault_active"),
+            CodeField(
+                REG_SENSOR_ERROR_CODE, "sensor_error_text", CodeTable(profile.sensor_error)
+            ),
+            CodeField(REG_SG_READY_MODE, "sg_ready_text", _SG_READY_TABLE),
+        )
+        self.active_status_codes = profile.active_status_codes
+        self.idle_status_codes = profile.idle_status_codes
+        self.running_status_codes = profile.running_status_codes
+        self.heat_demand_status_codes = profile.heat_demand_status_codes
+
+    def decode(self, raw: Mapping[int, int], derived: dict[str, Any]) -> None:
+        """Add the texts and flags of the code registers present in ``raw``."""
+        status = raw.get(REG_STATUS_CODE)
+        if status is not None:
+            derived["running"] = status in self.running_status_codes
+            derived["heat_demand"] = status in self.heat_demand_status_codes
+        for field in self.fields:
+            value = raw.get(field.register)
+            if value is None:
+                continue
+            derived[field.key] = field.table.text(value)
+            if field.flag is not None:
+                derived[field.flag] = value != 0
+
+
+_CODECS: dict[str, FirmwareCodec] = {}
+
+
+def register_firmware(version: str, profile: FirmwareProfile) -> None:
+    """Add or replace the profile of a software version."""
+    FIRMWARE_PROFILES[version] = profile
+    _CODECS.pop(version, None)
+
+
+def get_codec(version: str | None) -> FirmwareCodec:
+    """Return the compiled codec of a version, falling back to the default."""
+    if version not in FIRMWARE_PROFILES:
+        version = DEFAULT_SOFTWARE_VERSION
+    codec = _CODECS.get(version)
+    if codec is None:
+        codec = _CODECS[version] = FirmwareCodec(FIRMWARE_PROFILES[version])
+    return codec
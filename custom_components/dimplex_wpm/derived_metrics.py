@@ -0,0 +1,244 @@
+"""Incremental metrics derived from the polled temperatures and status.
+
+Each sample updates every metric in constant time. Rolling windows are split
+into a fixed number of time buckets holding running sums, so memory does not
+grow with the poll rate: a 60 minute window costs the same at 1 s polling as
+at 5 minute polling.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Collection, Iterable
+from typing import Any
+
+from .const import (
+    DERIVED_METRIC_BUCKETS,
+    DERIVED_METRIC_SOURCES,
+    DERIVED_METRIC_WINDOWS,
+    HEATING_RATE_WINDOW,
+)
+
+ROLLING_STATS = ("min", "max", "mean")
+
+# Sources computed here count as read when their inputs were.
+_SOURCE_INPUTS = {"flow_return_spread": ("flow_temperature", "return_temperature")}
+
+
+def rolling_key(source: str, stat: str, minutes: int) -> str:
+    """Return the derived key of a rolling statistic."""
+    return f"{source}_{stat}_{minutes}m"
+
+
+class _Bucket:
+    """Running sums of the samples falling into one time slot."""
+
+    __slots__ = ("count", "sum", "sum_t", "sum_tt", "sum_tv", "min", "max")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.count = 0
+        self.sum = self.sum_t = self.sum_tt = self.sum_tv = 0.0
+        self.min = self.max = 0.0
+
+    def add(self, t: float, value: float) -> None:
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if self.count == 0 or value > self.max:
+            self.max = value
+        self.count += 1
+        self.sum += value
+        self.sum_t += t
+        self.sum_tt += t * t
+        self.sum_tv += t * value
+
+
+class RollingWindow:
+    """Count, mean, min, max and least-squares slope over a sliding window.
+
+    The window is a ring of ``buckets`` time slots; a slot is cleared when
+    time moves past it, so the statistics cover between ``buckets - 1`` and
+    ``buckets`` slot widths. The sums are recomputed from the slots whenever
+    one expires, which keeps them from drifting; min and max are taken over
+    the slots when read.
+    """
+
+    __slots__ = ("_width", "_slots", "_head", "_total")
+
+    def __init__(self, seconds: float, buckets: int = DERIVED_METRIC_BUCKETS) -> None:
+        self._width = seconds / buckets
+        self._slots = tuple(_Bucket() for _ in range(buckets))
+        self._head: int | None = None
+        self._total = _Bucket()
+
+    def add(self, t: float, value: float) -> None:
+        """Add a sample taken at ``t`` seconds."""
+        index = int(t // self._width)
+        if self._head is None or index > self._head:
+            self._advance(index)
+        elif index <= self._head - len(self._slots):
+            return
+        self._slots[index % len(self._slots)].add(t, value)
+        self._total.add(t, value)
+
+    def _advance(self, index: int) -> None:
+        """Clear the slots that fall out of the window when ``index`` starts."""
+        size = len(self._slots)
+        if self._head is None or index - self._head >= size:
+            for slot in self._slots:
+                slot.reset()
+            self._total.reset()
+        else:
+            expired = False
+            for position in range(self._head + 1, index + 1):
+                slot = self._slots[position % size]
+                if slot.count:
+                    slot.reset()
+                    expired = True
+            if expired:
+                self._recompute()
+        self._head = index
+
+    def _recompute(self) -> None:
+        total = self._total
+        total.reset()
+        for slot in self._slots:
+            if slot.count:
+                total.count += slot.count
+                total.sum += slot.sum
+                total.sum_t += slot.sum_t
+                total.sum_tt += slot.sum_tt
+                total.sum_tv += slot.sum_tv
+
+    @property
+    def count(self) -> int:
+        return self._total.count
+
+    @property
+    def mean(self) -> float | None:
+        total = self._total
+        return total.sum / total.count if total.count else None
+
+    @property
+    def min(self) -> float | None:
+        return min((slot.min for slot in self._slots if slot.count), default=None)
+
+    @property
+    def max(self) -> float | None:
+        return max((slot.max for slot in self._slots if slot.count), default=None)
+
+    @property
+    def slope(self) -> float | None:
+        """Return the change per second fitted through the samples."""
+        total = self._total
+        count = total.count
+        if count < 2:
+            return None
+        denominator = count * total.sum_tt - total.sum_t * total.sum_t
+        if denominator <= 0:
+            return None
+        return (count * total.sum_tv - total.sum_t * total.sum) / denominator
+
+
+class StateTimer:
+    """Accumulate the time spent in each state and since the last change."""
+
+    __slots__ = ("state", "since", "_last", "totals")
+
+    def __init__(self) -> None:
+        self.state: str | None = None
+        self.since: float | None = None
+        self._last: float | None = None
+        self.totals: dict[str, float] = {}
+
+    def update(self, t: float, state: str | None) -> None:
+        """Credit the time since the previous sample to the previous state."""
+        if self.state is not None and self._last is not None:
+            self.totals[self.state] = self.totals.get(self.state, 0.0) + t - self._last
+        self._last = t
+        if state != self.state:
+            self.state = state
+            self.since = t
+
+    def duration(self, t: float) -> float | None:
+        """Return the time spent in the current state."""
+        if self.state is None or self.since is None:
+            return None
+        return t - self.since
+
+
+class DerivedMetrics:
+    """Flow/return spread, heating rate, rolling statistics and time in state.
+
+    ``update`` is called once per fresh poll with the decoded values and
+    adds its results to them. Only the keys read in that poll are sampled;
+    values carried forward from tiers that were not due, or from late
+    ranges, would count the same reading twice. ``values`` keeps the latest
+    results, so a snapshot rebuilt without a new sample (a partial refresh)
+    still carries them.
+    """
+
+    def __init__(
+        self,
+        sources: Iterable[str] = DERIVED_METRIC_SOURCES,
+        windows: Iterable[int] = DERIVED_METRIC_WINDOWS,
+    ) -> None:
+        self._windows: dict[str, dict[int, RollingWindow]] = {
+            source: {minutes: RollingWindow(minutes * 60) for minutes in windows}
+            for source in sources
+        }
+        self._heating_rate = RollingWindow(HEATING_RATE_WINDOW * 60)
+        self._status = StateTimer()
+        self._origin: float | None = None
+        self.values: dict[str, Any] = {}
+
+    def update(
+        self, now: float, derived: dict[str, Any], *, fresh: Collection[str] | None = None
+    ) -> None:
+        """Add a sample taken at monotonic time ``now`` and publish the results.
+
+        ``fresh`` holds the keys read for this sample; None takes all of them.
+        """
+        if self._origin is None:
+            self._origin = now
+        # Relative times keep the regression sums small.
+        t = now - self._origin
+        values = self.values
+
+        def is_fresh(*keys: str) -> bool:
+            return fresh is None or any(key in fresh for key in keys)
+
+        flow = derived.get("flow_temperature")
+        return_temperature = derived.get("return_temperature")
+        if flow is not None and return_temperature is not None:
+            values["flow_return_spread"] = round(flow - return_temperature, 2)
+            derived["flow_return_spread"] = values["flow_return_spread"]
+
+        if flow is not None and is_fresh("flow_temperature"):
+            self._heating_rate.add(t, flow)
+            slope = self._heating_rate.slope
+            values["heating_rate"] = None if slope is None else round(slope * 60, 3)
+
+        for source, windows in self._windows.items():
+            value = derived.get(source)
+            sampled = is_fresh(*_SOURCE_INPUTS.get(source, (source,)))
+            for minutes, window in windows.items():
+                if value is not None and sampled:
+                    window.add(t, value)
+                for stat in ROLLING_STATS:
+                    result = getattr(window, stat)
+                    values[rolling_key(source, stat, minutes)] = (
+                        None if result is None else round(result, 2)
+                    )
+
+        status = self._status
+        if is_fresh("status_text"):
+            status.update(t, derived.get("status_text"))
+        duration = status.duration(t)
+        values["status_duration"] = None if duration is None else round(duration)
+        values["time_in_state"] = {
+            state: round(seconds) for state, seconds in status.totals.items()
+        }
+
+        derived.update(values)
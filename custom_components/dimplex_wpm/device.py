@@ -6,7 +6,7 @@ from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 
-from .const import DEVICE_MANUFACTURER, DOMAIN, MODULE_NAME_MAP, MODULE_ROOT
+from .const import DEVICE_MANUFACTURER, DEVICE_NAME, DOMAIN, MODULE_NAME_MAP, MODULE_ROOT
 
 
 def build_device_info(
@@ -38,3 +38,12 @@ def build_device_info(
         device_info["via_device"] = base_identifier
 
     return device_info
+
+
+def build_cascade_device_info(name: str) -> dict[str, Any]:
+    """Return device info for the aggregates of a cascade."""
+    return {
+        "identifiers": {(DOMAIN, f"cascade_{name}")},
+        "manufacturer": DEVICE_MANUFACTURER,
+        "name": f"{DEVICE_NAME} cascade {name}",
+    }
@@ -0,0 +1,53 @@
+"""Diagnostics support for Dimplex WPM."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {CONF_HOST, "host"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data["coordinator"]
+    snapshot = coordinator.data or {}
+    metrics = data["client"].metrics
+
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "meta": async_redact_data(snapshot.get("meta", {}), TO_REDACT),
+        "raw": dict(snapshot.get("raw", {})),
+        "read_plan": [asdict(read_range) for read_range in coordinator.read_plan],
+        "register_layout": coordinator.register_layout,
+        "bad_addresses": coordinator.bad_addresses,
+        "register_errors": coordinator.register_errors,
+        "metrics": metrics.as_dict() if metrics is not None else None,
+        "connection": data["client"].connection_state,
+        "connection_settings": data["client"].connection.settings,
+        "cascade": (
+            {
+                "name": data["cascade"].cascade_name,
+                "meta": (data["cascade"].data or {}).get("meta"),
+                "aggregate": (data["cascade"].data or {}).get("aggregate"),
+            }
+            if data["cascade"] is not None
+            else None
+        ),
+        "sample_log": (
+            data["sample_log"].as_dict() if data["sample_log"] is not None else None
+        ),
+    }
@@ -0,0 +1,290 @@
+"""Discovery of the register addresses a controller implements.
+
+A scan reads an address span in blocks of up to 125 registers. A block
+answered with an illegal address (or value) exception holds at least one
+address the firmware does not implement, so it is split in half and each
+half read again, down to single registers. Valid stretches are confirmed
+with one request each: k unimplemented addresses cost O(k log n) requests
+instead of one request per register.
+
+Results are kept per software version and register bank in a shared store.
+The coordinator leaves addresses a scan found missing out of its read plan.
+It also bisects ranges rejected during a poll, to keep reading the rest of
+the range and route around the failing addresses.
+"""
+
+from __future__ import annotations
+
+import logging
+from array import array
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    DATA_REGISTER_MAP,
+    DOMAIN,
+    MAX_REGISTERS_PER_READ,
+    REGISTER_MAP_STORAGE_KEY,
+    SCAN_BISECT_EXCEPTION_CODES,
+    STORAGE_VERSION,
+)
+from .exceptions import ModbusExceptionResponse
+from .registers import RegisterSnapshot
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .modbus_client import DimplexModbusClient
+
+LOGGER = logging.getLogger(__name__)
+
+# Inclusive (first, last) address pairs.
+Interval = tuple[int, int]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> list[Interval]:
+    """Return sorted intervals with overlapping and adjacent ones joined."""
+    merged: list[Interval] = []
+    for first, last in sorted(intervals):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+def subtract_interval(intervals: Iterable[Interval], removed: Interval) -> list[Interval]:
+    """Return the parts of ``intervals`` outside ``removed``."""
+    result: list[Interval] = []
+    for first, last in intervals:
+        if last < removed[0] or first > removed[1]:
+            result.append((first, last))
+            continue
+        if first < removed[0]:
+            result.append((first, removed[0] - 1))
+        if last > removed[1]:
+            result.append((removed[1] + 1, last))
+    return result
+
+
+def _contains(intervals: Iterable[Interval], address: int) -> bool:
+    return any(first <= address <= last for first, last in intervals)
+
+
+@dataclass
+class ScanResult:
+    """Valid addresses found in one bank, and how much of the span was covered."""
+
+    bank: str
+    start: int
+    end: int
+    valid: list[Interval] = field(default_factory=list)
+    requests: int = 0
+    # Last address whose validity is known; short of ``end`` if the request
+    # budget ran out.
+    scanned_to: int = -1
+
+    @property
+    def complete(self) -> bool:
+        return self.scanned_to >= self.end
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "bank": self.bank,
+            "start": self.start,
+            "end": self.end,
+            "scanned_to": self.scanned_to,
+            "complete": self.complete,
+            "requests": self.requests,
+            "valid": [list(interval) for interval in self.valid],
+        }
+
+
+class _BudgetExhausted(Exception):
+    """Raised inside a bisection once the request budget is used up."""
+
+
+class _Bisection:
+    """Read a range, splitting it in half wherever the device rejects it."""
+
+    def __init__(
+        self, client: DimplexModbusClient, bank: str, max_requests: int | None = None
+    ) -> None:
+        self._client = client
+        self._bank = bank
+        self._max_requests = max_requests
+        self.requests = 0
+        self.blocks: dict[int, array] = {}
+        self.missing: list[int] = []
+        # Every address up to here has been read or found missing.
+        self.resolved_to = -1
+
+    async def visit(self, first: int, count: int) -> None:
+        if self._max_requests is not None and self.requests >= self._max_requests:
+            raise _BudgetExhausted
+        self.requests += 1
+        try:
+            block = await self._client.probe_range(first, count, self._bank)
+        except ModbusExceptionResponse as err:
+            if err.exception_code not in SCAN_BISECT_EXCEPTION_CODES:
+                raise
+            if count > 1:
+                half = count // 2
+                await self.visit(first, half)
+                await self.visit(first + half, count - half)
+                return
+            self.missing.append(first)
+        else:
+            if block is not None:
+                self.blocks[first] = block
+        self.resolved_to = first + count - 1
+
+
+async def isolate_range(
+    client: DimplexModbusClient, bank: str, start: int, count: int
+) -> tuple[RegisterSnapshot, list[int]]:
+    """Read what can be read of a rejected range and find the failing addresses.
+
+    Returns the readable blocks and the addresses the device rejects.
+    Exception responses other than illegal address or value are raised.
+    """
+    bisection = _Bisection(client, bank)
+    await bisection.visit(start, count)
+    return RegisterSnapshot(bisection.blocks), bisection.missing
+
+
+async def scan_registers(
+    client: DimplexModbusClient,
+    bank: str,
+    start: int,
+    end: int,
+    *,
+    block_size: int = MAX_REGISTERS_PER_READ,
+    max_requests: int | None = None,
+) -> ScanResult:
+    """Find the valid addresses of ``bank`` between ``start`` and ``end``.
+
+    Exception responses other than illegal address or value, and connection
+    errors, are raised. When ``max_requests`` is reached the result covers
+    the addresses resolved so far.
+    """
+    bisection = _Bisection(client, bank, max_requests)
+    bisection.resolved_to = start - 1
+    try:
+        for first in range(start, end + 1, block_size):
+            await bisection.visit(first, min(block_size, end - first + 1))
+    except _BudgetExhausted:
+        LOGGER.warning(
+            "Register scan of %s stopped after %s requests at address %s",
+            bank,
+            bisection.requests,
+            bisection.resolved_to,
+        )
+    result = ScanResult(
+        bank,
+        start,
+        end,
+        valid=merge_intervals(
+            (first, first + len(block) - 1) for first, block in bisection.blocks.items()
+        ),
+        requests=bisection.requests,
+        scanned_to=bisection.resolved_to,
+    )
+    LOGGER.debug(
+        "Scanned %s registers %s-%s in %s requests: %s",
+        bank,
+        start,
+        result.scanned_to,
+        result.requests,
+        result.valid,
+    )
+    return result
+
+
+@dataclass
+class BankMap:
+    """Scanned spans of a register bank and the valid addresses found in them."""
+
+    spans: list[Interval] = field(default_factory=list)
+    valid: list[Interval] = field(default_factory=list)
+
+    def merge(self, result: ScanResult) -> None:
+        """Replace what is known about the span a scan covered."""
+        if result.scanned_to < result.start:
+            return
+        span = (result.start, result.scanned_to)
+        self.valid = merge_intervals([*subtract_interval(self.valid, span), *result.valid])
+        self.spans = merge_intervals([*self.spans, span])
+
+    def missing(self, address: int) -> bool:
+        """Return True if a scan found the address not implemented."""
+        return _contains(self.spans, address) and not _contains(self.valid, address)
+
+    def covers(self, address: int) -> bool:
+        """Return True if a scan found the address implemented."""
+        return _contains(self.valid, address)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "spans": [list(interval) for interval in self.spans],
+            "valid": [list(interval) for interval in self.valid],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> BankMap:
+        return cls(
+            spans=[tuple(interval) for interval in data.get("spans", [])],
+            valid=[tuple(interval) for interval in data.get("valid", [])],
+        )
+
+
+class RegisterMap:
+    """Scan results per software version, shared by all config entries."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store = Store(hass, STORAGE_VERSION, REGISTER_MAP_STORAGE_KEY)
+        self._versions: dict[str, dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if stored:
+            self._versions = stored.get("versions", {})
+
+    def banks(self, software_version: str) -> dict[str, BankMap]:
+        """Return the bank maps known for a software version."""
+        version = self._versions.get(software_version, {})
+        return {
+            bank: BankMap.from_dict(data)
+            for bank, data in version.get("banks", {}).items()
+        }
+
+    def update(self, software_version: str, results: Iterable[ScanResult]) -> None:
+        """Merge scan results into the map of a software version and save it."""
+        banks = self.banks(software_version)
+        for result in results:
+            banks.setdefault(result.bank, BankMap()).merge(result)
+        self._versions[software_version] = {
+            "banks": {bank: bank_map.as_dict() for bank, bank_map in banks.items()},
+            "scanned_at": dt_util.utcnow().isoformat(),
+        }
+        self._store.async_delay_save(self._data, 1)
+
+    def _data(self) -> dict[str, Any]:
+        return {"versions": self._versions}
+
+    def as_dict(self) -> dict[str, Any]:
+        return self._versions
+
+
+async def async_get_register_map(hass: HomeAssistant) -> RegisterMap:
+    """Return the shared register map, loading it on first use."""
+    register_map: RegisterMap | None = hass.data[DOMAIN].get(DATA_REGISTER_MAP)
+    if register_map is None:
+        register_map = RegisterMap(hass)
+        await register_map.async_load()
+        register_map = hass.data[DOMAIN].setdefault(DATA_REGISTER_MAP, register_map)
+    return register_map
@@ -0,0 +1,73 @@
+"""Base entity for Dimplex WPM."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import ATTR_STALE
+from .coordinator import DimplexDataUpdateCoordinator
+
+
+class DimplexEntity(CoordinatorEntity[DimplexDataUpdateCoordinator]):
+    """Coordinator entity that only writes state when its sources changed.
+
+    Subclasses declare the raw registers and derived keys their state is
+    built from; a coordinator update that touches none of them (and does not
+    change availability or staleness) skips ``async_write_ha_state``. While
+    the coordinator holds a snapshot restored from storage, or the last read
+    of a source register missed the poll deadline, entities carry a ``stale``
+    attribute.
+    """
+
+    _source_registers: frozenset[int] = frozenset()
+    _source_keys: frozenset[str] = frozenset()
+    _always_write = False
+
+    def __init__(self, coordinator: DimplexDataUpdateCoordinator) -> None:
+        super().__init__(coordinator)
+        self._written_available: bool | None = None
+        self._written_stale: bool | None = None
+
+    @property
+    def stale(self) -> bool:
+        """Return True while the state is carried forward from an earlier read."""
+        return self.coordinator.stale or bool(
+            self._source_registers & self.coordinator.stale_registers
+            or self._source_keys & self.coordinator.stale_keys
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if self.stale:
+            return {ATTR_STALE: True}
+        return None
+
+    def _sources_changed(self) -> bool:
+        """Return True if any register or derived key of this entity changed."""
+        return bool(
+            self._source_registers & self.coordinator.changed_registers
+            or self._source_keys & self.coordinator.changed_keys
+        )
+
+    def _should_write(self) -> bool:
+        """Return True if the state can differ from what was written last."""
+        return (
+            self._always_write
+            or self.available != self._written_available
+            or self.stale != self._written_stale
+            or self._sources_changed()
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when it can differ from what was written last."""
+        if not self._should_write():
+            self.coordinator.entity_writes["suppressed"] += 1
+            return
+        self._written_available = self.available
+        self._written_stale = self.stale
+        self.coordinator.entity_writes["written"] += 1
+        self.async_write_ha_state()
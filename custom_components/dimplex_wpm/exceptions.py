@@ -0,0 +1,36 @@
+"""Exceptions raised by the Modbus client.
+
+They do not derive from pymodbus exceptions, so the integration can be
+loaded, and a config flow form shown, without importing pymodbus.
+"""
+
+from __future__ import annotations
+
+
+class ModbusError(Exception):
+    """Base class for Modbus communication errors."""
+
+
+class ModbusTimeoutError(ModbusError, TimeoutError):
+    """Raised when the device did not answer in time."""
+
+
+class ModbusExceptionResponse(ModbusError):
+    """Raised when the device answers with a Modbus exception code."""
+
+    def __init__(self, function_code: int, exception_code: int) -> None:
+        super().__init__(
+            f"Exception response 0x{exception_code:02x} for function 0x{function_code:02x}"
+        )
+        self.function_code = function_code
+        self.exception_code = exception_code
+
+
+class ModbusCircuitOpen(ModbusError):
+    """Raised without touching the network while the circuit breaker is open."""
+
+    def __init__(self, key: str, retry_in: float) -> None:
+        super().__init__(
+            f"Modbus host {key} is unreachable, next attempt in {retry_in:.0f}s"
+        )
+        self.retry_in = retry_in
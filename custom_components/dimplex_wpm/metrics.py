@@ -0,0 +1,209 @@
+"""Request metrics for the Modbus connection."""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds of the latency histogram buckets, in milliseconds.
+LATENCY_BUCKETS_MS: tuple[float, ...] = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+_LATENCY_BUCKETS_S = tuple(bound / 1000 for bound in LATENCY_BUCKETS_MS)
+# Ranges with a histogram of their own; a poll plan needs a handful, a
+# register scan requests thousands of distinct ranges.
+MAX_LATENCY_RANGES = 64
+
+# Modbus TCP frame sizes: 7-byte MBAP header plus the PDU. Read and write
+# single register requests are both 12 bytes.
+_REQUEST_BYTES = 12
+_READ_RESPONSE_BYTES = 9  # plus two bytes per register
+_WRITE_RESPONSE_BYTES = 12
+_EXCEPTION_RESPONSE_BYTES = 9
+
+
+class LatencyHistogram:
+    """Count durations into fixed buckets, keeping the total and maximum."""
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(_LATENCY_BUCKETS_S) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add one duration."""
+        self.buckets[bisect_left(_LATENCY_BUCKETS_S, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean_ms(self) -> float | None:
+        """Return the mean duration in milliseconds."""
+        if not self.count:
+            return None
+        return round(self.total / self.count * 1000, 2)
+
+    def percentile_ms(self, fraction: float) -> float | None:
+        """Return the bucket bound below which ``fraction`` of samples fall.
+
+        The bound is capped at the largest sample seen.
+        """
+        if not self.count:
+            return None
+        max_ms = round(self.max * 1000, 2)
+        threshold = fraction * self.count
+        seen = 0
+        for bound, bucket in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += bucket
+            if seen >= threshold:
+                return min(bound, max_ms)
+        return max_ms
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram for diagnostics."""
+        labels = [f"<={bound:g}ms" for bound in LATENCY_BUCKETS_MS]
+        labels.append(f">{LATENCY_BUCKETS_MS[-1]:g}ms")
+        return {
+            "count": self.count,
+            "mean_ms": self.mean_ms,
+            "p95_ms": self.percentile_ms(0.95),
+            "max_ms": round(self.max * 1000, 2),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class ModbusMetrics:
+    """Latency, error and traffic counters of one gateway connection.
+
+    Latency is kept per function code and per requested range, up to
+    ``MAX_LATENCY_RANGES`` ranges; requests for further ranges share one
+    overflow histogram. Lock wait
+    time, connect time and decode time get their own histograms, so a slow
+    poll can be attributed to connecting, queueing, the network or
+    decoding. Byte counts are derived from the Modbus TCP frame layout.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.exception_responses: dict[int, int] = {}
+        self.connects = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = LatencyHistogram()
+        self.latency_by_function: dict[int, LatencyHistogram] = {}
+        self.latency_by_range: dict[tuple[int, int, int], LatencyHistogram] = {}
+        self.latency_other_ranges = LatencyHistogram()
+        self.lock_wait = LatencyHistogram()
+        self.connect_time = LatencyHistogram()
+        self.decode_time = LatencyHistogram()
+        # Reads answered without a request of their own.
+        self.cache_hits = 0
+        self.coalesced_reads = 0
+
+    @property
+    def reconnects(self) -> int:
+        """Return how often the connection had to be opened again."""
+        return max(0, self.connects - 1)
+
+    def record_connect(self, seconds: float) -> None:
+        """Record a successful connect."""
+        self.connects += 1
+        self.connect_time.record(seconds)
+
+    def record_request(
+        self, function_code: int, address: int, count: int, seconds: float
+    ) -> None:
+        """Record a request that got a normal response."""
+        self.requests += 1
+        self.latency.record(seconds)
+        histogram = self.latency_by_function.get(function_code)
+        if histogram is None:
+            histogram = self.latency_by_function[function_code] = LatencyHistogram()
+        histogram.record(seconds)
+        key = (function_code, address, count)
+        histogram = self.latency_by_range.get(key)
+        if histogram is None:
+            if len(self.latency_by_range) < MAX_LATENCY_RANGES:
+                histogram = self.latency_by_range[key] = LatencyHistogram()
+            else:
+                histogram = self.latency_other_ranges
+        histogram.record(seconds)
+        self.bytes_sent += _REQUEST_BYTES
+        if function_code in (0x03, 0x04):
+            self.bytes_received += _READ_RESPONSE_BYTES + 2 * count
+        else:
+            self.bytes_received += _WRITE_RESPONSE_BYTES
+
+    def record_exception_response(self, exception_code: int) -> None:
+        """Record a Modbus exception answer from the device."""
+        self.requests += 1
+        self.exception_responses[exception_code] = (
+            self.exception_responses.get(exception_code, 0) + 1
+        )
+        self.bytes_sent += _REQUEST_BYTES
+        self.bytes_received += _EXCEPTION_RESPONSE_BYTES
+
+    def record_failure(self, err: BaseException) -> None:
+        """Record a request that failed without a response."""
+        self.requests += 1
+        self.errors += 1
+        if is_timeout(err):
+            self.timeouts += 1
+        self.bytes_sent += _REQUEST_BYTES
+
+    def summary(self) -> dict[str, Any]:
+        """Return the headline numbers exposed as diagnostic sensors."""
+        return {
+            "modbus_requests": self.requests,
+            "modbus_errors": self.errors,
+            "modbus_timeouts": self.timeouts,
+            "modbus_exception_responses": sum(self.exception_responses.values()),
+            "modbus_reconnects": self.reconnects,
+            "modbus_bytes_sent": self.bytes_sent,
+            "modbus_bytes_received": self.bytes_received,
+            "modbus_latency_p95": self.latency.percentile_ms(0.95),
+            "modbus_lock_wait": self.lock_wait.mean_ms,
+        }
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return every metric for the diagnostics download."""
+        return {
+            "started": self.started,
+            **self.summary(),
+            "exception_responses_by_code": {
+                f"0x{code:02x}": count for code, count in self.exception_responses.items()
+            },
+            "latency": self.latency.as_dict(),
+            "latency_by_function": {
+                f"0x{code:02x}": histogram.as_dict()
+                for code, histogram in self.latency_by_function.items()
+            },
+            "latency_by_range": {
+                f"0x{code:02x}:{address}:{count}": histogram.as_dict()
+                for (code, address, count), histogram in self.latency_by_range.items()
+            },
+            "latency_other_ranges": self.latency_other_ranges.as_dict(),
+            "lock_wait": self.lock_wait.as_dict(),
+            "connect_time": self.connect_time.as_dict(),
+            "decode_time": self.decode_time.as_dict(),
+            "cache_hits": self.cache_hits,
+            "coalesced_reads": self.coalesced_reads,
+        }
+
+
+def is_timeout(err: BaseException) -> bool:
+    """Return True if the error means the device did not answer in time."""
+    # ModbusTimeoutError is a TimeoutError; other errors may chain one.
+    cause: BaseException | None = err
+    while cause is not None:
+        if isinstance(cause, TimeoutError):
+            return True
+        cause = cause.__cause__
+    return False
@@ -3,41 +3,521 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import heapq
+import importlib
 import inspect
+import itertools
 import logging
-from typing import Any, Callable, Iterable, Optional
+import random
+import struct
+import time
+from array import array
+from dataclasses import dataclass
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Iterable, Optional
 
-from pymodbus.client import AsyncModbusTcpClient
-from pymodbus.exceptions import ModbusException
+from .const import (
+    BREAKER_FAILURE_THRESHOLD,
+    BREAKER_INITIAL_BACKOFF,
+    BREAKER_JITTER,
+    BREAKER_MAX_BACKOFF,
+    CONNECTION_STATE_CLOSED,
+    CONNECTION_STATE_HALF_OPEN,
+    CONNECTION_STATE_OPEN,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_WRITE_DEBOUNCE,
+    DEFAULT_WRITE_MIN_INTERVAL,
+    PIPELINE_FAILURE_THRESHOLD,
+    PIPELINE_RETRY_INTERVAL,
+    READ_CACHE_TTL,
+    REGISTER_OFFSET,
+)
+from .exceptions import (
+    ModbusCircuitOpen,
+    ModbusError,
+    ModbusExceptionResponse,
+    ModbusTimeoutError,
+)
+from .metrics import ModbusMetrics
+from .registers import RegisterSnapshot, registers_to_block
 
-from .const import REGISTER_OFFSET
+if TYPE_CHECKING:
+    from pymodbus.client import AsyncModbusTcpClient
 
 LOGGER = logging.getLogger(__name__)
 
+FUNCTION_CODE_READ_HOLDING = 0x03
+FUNCTION_CODE_READ_INPUT = 0x04
+FUNCTION_CODE_WRITE_REGISTER = 0x06
 
-class DimplexModbusClient:
-    """Provide async access to a Modbus TCP device."""
+_READ_FUNCTION_CODES = {
+    "read_holding_registers": FUNCTION_CODE_READ_HOLDING,
+    "read_input_registers": FUNCTION_CODE_READ_INPUT,
+}
+
+_READ_METHODS = {code: method for method, code in _READ_FUNCTION_CODES.items()}
+
+# Scheduler priorities, lowest first: writes go ahead of queued reads.
+PRIORITY_WRITE = 0
+PRIORITY_READ = 1
+
+_MBAP_HEADER = struct.Struct(">HHHB")
+
+_pymodbus_client: ModuleType | None = None
+
+
+async def _async_import_pymodbus() -> ModuleType:
+    """Import pymodbus.client in an executor, so its import cost stays off the loop."""
+    global _pymodbus_client
+    if _pymodbus_client is None:
+        _pymodbus_client = await asyncio.get_running_loop().run_in_executor(
+            None, importlib.import_module, "pymodbus.client"
+        )
+    return _pymodbus_client
+
+
+class CircuitBreaker:
+    """Fail fast while a gateway is unreachable and probe it with backoff.
+
+    ``closed`` lets every request through. After ``threshold`` consecutive
+    failures the breaker opens and rejects requests until the backoff has
+    elapsed; it then turns ``half_open`` and admits a single probe while
+    other requests wait for its outcome. A successful probe closes it, a
+    failed one reopens it with twice the backoff (up to ``max_backoff``,
+    with random jitter). Outcomes are reported with the flag returned by
+    ``before_request``, so requests that were already in flight cannot end
+    the probe.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        *,
+        threshold: int = BREAKER_FAILURE_THRESHOLD,
+        initial_backoff: float = BREAKER_INITIAL_BACKOFF,
+        max_backoff: float = BREAKER_MAX_BACKOFF,
+        jitter: float = BREAKER_JITTER,
+    ) -> None:
+        self._key = key
+        self._threshold = max(1, threshold)
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._jitter = jitter
+        self.state = CONNECTION_STATE_CLOSED
+        self.failures = 0
+        self._opened = 0
+        self._retry_at = 0.0
+        self._probing = False
+        self._probe_done = asyncio.Event()
+
+    @property
+    def retry_in(self) -> float | None:
+        """Return the seconds until the next probe is allowed while open."""
+        if self.state != CONNECTION_STATE_OPEN:
+            return None
+        return max(0.0, self._retry_at - time.monotonic())
+
+    async def before_request(self) -> bool:
+        """Wait until a request may go out, or raise ModbusCircuitOpen.
+
+        Returns True if the request is the half-open probe.
+        """
+        while True:
+            if self.state == CONNECTION_STATE_CLOSED:
+                return False
+            if self.state == CONNECTION_STATE_OPEN:
+                retry_in = self._retry_at - time.monotonic()
+                if retry_in > 0:
+                    raise ModbusCircuitOpen(self._key, retry_in)
+                LOGGER.debug("Probing Modbus host %s", self._key)
+                self.state = CONNECTION_STATE_HALF_OPEN
+                self._probing = False
+            if not self._probing:
+                self._probing = True
+                self._probe_done.clear()
+                return True
+            await self._probe_done.wait()
+
+    def check_open(self) -> None:
+        """Raise ModbusCircuitOpen if the breaker opened since before_request."""
+        if self.state == CONNECTION_STATE_OPEN:
+            raise ModbusCircuitOpen(self._key, self.retry_in or 0)
+
+    def release(self, probe: bool) -> None:
+        """Give up a request without an outcome, e.g. when cancelled."""
+        if probe:
+            self._end_probe()
+
+    def _end_probe(self) -> None:
+        self._probing = False
+        self._probe_done.set()
+
+    def record_success(self, probe: bool = False) -> None:
+        """Close the breaker after a request got an answer."""
+        if self.state != CONNECTION_STATE_CLOSED:
+            LOGGER.info(
+                "Modbus host %s is reachable again after %s failed requests",
+                self._key,
+                self.failures,
+            )
+        self.state = CONNECTION_STATE_CLOSED
+        self.failures = 0
+        self._opened = 0
+        if probe:
+            self._probing = False
+        # Requests waiting for the probe go ahead now that it is closed.
+        self._probe_done.set()
+
+    def record_failure(self, probe: bool = False) -> None:
+        """Count a failed request and open the breaker when needed."""
+        self.failures += 1
+        # Requests that were already in flight when the breaker opened do
+        # not extend the backoff; only the probe decides a half-open state.
+        if (self.state == CONNECTION_STATE_HALF_OPEN and probe) or (
+            self.state == CONNECTION_STATE_CLOSED and self.failures >= self._threshold
+        ):
+            self._open()
+        if probe:
+            self._end_probe()
+        elif self.state == CONNECTION_STATE_OPEN:
+            self._probe_done.set()
+
+    def _open(self) -> None:
+        backoff = min(self._max_backoff, self._initial_backoff * 2**self._opened)
+        backoff *= 1 + random.uniform(-self._jitter, self._jitter)
+        self._opened += 1
+        self._retry_at = time.monotonic() + backoff
+        level = logging.WARNING if self.state == CONNECTION_STATE_CLOSED else logging.DEBUG
+        LOGGER.log(
+            level,
+            "Modbus host %s is unreachable after %s failed requests, retrying in %.0fs",
+            self._key,
+            self.failures,
+            backoff,
+        )
+        self.state = CONNECTION_STATE_OPEN
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the breaker state for diagnostics and sensor attributes."""
+        retry_in = self.retry_in
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": round(retry_in, 1) if retry_in is not None else None,
+        }
+
+
+class RequestScheduler:
+    """Admit up to ``limit`` requests at a time, highest priority first.
+
+    Unlike a lock or semaphore, waiters are not served in arrival order: a
+    free slot goes to the waiter with the lowest priority value, and to the
+    earliest of those.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._limit = max(1, limit)
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def limit(self) -> int:
+        """Return the number of requests admitted at the same time."""
+        return self._limit
+
+    @limit.setter
+    def limit(self, limit: int) -> None:
+        # Lowering the limit lets the active requests finish first.
+        self._limit = max(1, limit)
+        self._wake()
+
+    @property
+    def queued(self) -> int:
+        """Return the number of waiting requests."""
+        return sum(1 for _p, _s, future in self._waiters if not future.done())
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        """Hold a request slot for the duration of the block."""
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        if self._active < self._limit and not self._waiters:
+            self._active += 1
+            return
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # A slot handed over just before the cancellation is passed on;
+            # a cancelled waiter is skipped by _wake.
+            if future.done() and not future.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self._active < self._limit:
+            _priority, _sequence, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._active += 1
+            future.set_result(None)
+
+
+class PipelinedModbusTransport:
+    """Minimal Modbus TCP framer keeping several transactions in flight.
+
+    pymodbus serializes requests on a client, so pipelined reads use their own
+    socket handling: every request gets a transaction ID and responses are
+    matched back to the waiting caller, whatever order they arrive in.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        self._host = host
+        self._port = port
+        self._timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._pending: dict[int, asyncio.Future[bytes]] = {}
+        self._next_tid = 0
+
+    @property
+    def connected(self) -> bool:
+        """Return True while the socket and response reader are alive."""
+        return (
+            self._writer is not None
+            and not self._writer.is_closing()
+            and self._reader_task is not None
+            and not self._reader_task.done()
+        )
+
+    async def connect(self) -> bool:
+        """Open the TCP connection and start the response reader."""
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self._host, self._port), self._timeout
+            )
+        except (OSError, asyncio.TimeoutError) as err:
+            LOGGER.debug("Pipelined connect to %s:%s failed: %s", self._host, self._port, err)
+            return False
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_loop())
+        return True
+
+    async def close(self) -> None:
+        """Close the connection and fail outstanding transactions."""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+            self._writer = None
+        self._reader = None
+        self._fail_pending(ConnectionError("Modbus connection closed"))
+
+    async def execute(self, unit_id: int, function_code: int, payload: bytes) -> bytes:
+        """Send one request PDU and wait for the matching response PDU."""
+        if not self.connected:
+            raise ModbusError("Pipelined transport is not connected")
+        assert self._writer is not None
+        tid = self._allocate_tid()
+        future: asyncio.Future[bytes] = asyncio.get_running_loop().create_future()
+        self._pending[tid] = future
+        frame = _MBAP_HEADER.pack(tid, 0, len(payload) + 2, unit_id)
+        self._writer.write(frame + bytes((function_code,)) + payload)
+        try:
+            await self._writer.drain()
+            pdu = await asyncio.wait_for(future, self._timeout)
+        except asyncio.TimeoutError as err:
+            raise ModbusTimeoutError(
+                f"No response for transaction {tid} within {self._timeout}s"
+            ) from err
+        except (OSError, ConnectionError) as err:
+            raise ModbusError(f"Connection lost: {err}") from err
+        finally:
+            self._pending.pop(tid, None)
+        if pdu[0] & 0x80:
+            raise ModbusExceptionResponse(function_code, pdu[1] if len(pdu) > 1 else 0)
+        return pdu
+
+    def _allocate_tid(self) -> int:
+        """Return the next free transaction ID (1-65535)."""
+        while True:
+            self._next_tid = self._next_tid % 0xFFFF + 1
+            if self._next_tid not in self._pending:
+                return self._next_tid
+
+    async def _read_loop(self) -> None:
+        """Dispatch incoming frames to the waiting transactions."""
+        assert self._reader is not None
+        try:
+            while True:
+                header = await self._reader.readexactly(_MBAP_HEADER.size)
+                tid, _protocol, length, _unit = _MBAP_HEADER.unpack(header)
+                pdu = await self._reader.readexactly(length - 1)
+                future = self._pending.get(tid)
+                if future is None or future.done():
+                    LOGGER.debug("Dropping response for unknown transaction %s", tid)
+                    continue
+                future.set_result(pdu)
+        except asyncio.CancelledError:
+            raise
+        except (asyncio.IncompleteReadError, OSError, ConnectionError) as err:
+            LOGGER.debug("Pipelined connection to %s:%s lost: %s", self._host, self._port, err)
+            if self._writer is not None:
+                self._writer.close()
+            self._fail_pending(ConnectionError(f"Modbus connection lost: {err}"))
+
+    def _fail_pending(self, err: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(err)
+        self._pending.clear()
+
+
+@dataclass
+class _SharedRead:
+    """A read in flight that callers wanting the same registers can join."""
+
+    address: int
+    count: int
+    task: asyncio.Task[array | None]
+    waiters: int = 0
+    # Set when a write overlaps the read, so the response is not cached.
+    invalidated: bool = False
+
+    def covers(self, address: int, count: int) -> bool:
+        return self.address <= address and address + count <= self.address + self.count
+
+
+class DimplexModbusConnection:
+    """Share one Modbus TCP connection between all units behind a gateway.
+
+    Requests for every unit ID go through one scheduler admitting a single
+    request (serial mode) or up to the in-flight limit (pipelined mode), so
+    the gateway sees a single client. Writes are admitted ahead of queued
+    reads. A circuit breaker stops requests from waiting out connect timeouts
+    while the gateway is unreachable.
+
+    Reads are single-flight: a read of registers already being read joins
+    that request, and registers read within the cache TTL are answered from
+    the previous response. A write drops both for the register it changes.
+    """
 
     def __init__(
         self,
         host: str,
         port: int,
-        unit_id: int,
         timeout: int,
+        *,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        cache_ttl: float = READ_CACHE_TTL,
     ) -> None:
         self._host = host
         self._port = port
-        self._unit_id = unit_id
         self._timeout = timeout
         self._client: Optional[AsyncModbusTcpClient] = None
+        self._pipeline: PipelinedModbusTransport | None = None
         self._lock = asyncio.Lock()
+        self._max_in_flight = max(1, max_in_flight)
+        self._pipeline_limit = self._max_in_flight
+        self._pipeline_failures = 0
+        self._serial_until = 0.0
+        self._scheduler = RequestScheduler(self._max_in_flight)
+        # None while metrics are off, so requests skip all bookkeeping.
+        self.metrics: ModbusMetrics | None = None
+        self.breaker = CircuitBreaker(self.key)
+        # Reads in flight and recent responses per (unit ID, function code);
+        # cached blocks are kept by start address with their expiry time.
+        self._cache_ttl = cache_ttl
+        self._shared_reads: dict[tuple[int, int], list[_SharedRead]] = {}
+        self._read_cache: dict[tuple[int, int], dict[int, tuple[float, array]]] = {}
+
+    @property
+    def key(self) -> str:
+        """Return the host:port key identifying the gateway."""
+        return f"{self._host}:{self._port}"
+
+    @property
+    def pipelined(self) -> bool:
+        """Return True when requests go through the pipelined transport."""
+        return self._max_in_flight > 1 or self._pipeline is not None
+
+    @property
+    def max_in_flight(self) -> int:
+        """Return the current in-flight request limit."""
+        return self._max_in_flight
+
+    @property
+    def settings(self) -> dict[str, Any]:
+        """Return the settings in effect, which all entries sharing it use."""
+        return {
+            "timeout": self._timeout,
+            "max_in_flight": self._pipeline_limit,
+            "current_max_in_flight": self._max_in_flight,
+        }
+
+    def limit_in_flight(self, max_in_flight: int) -> None:
+        """Lower the in-flight limit to what another entry asked for."""
+        limit = max(1, max_in_flight)
+        if limit >= self._pipeline_limit:
+            return
+        self._pipeline_limit = limit
+        self._max_in_flight = min(self._max_in_flight, limit)
+        self._scheduler.limit = self._max_in_flight
+
+    @property
+    def connected(self) -> bool:
+        """Return True if the active transport is connected."""
+        if self._pipeline is not None:
+            return self._pipeline.connected
+        return self._client is not None and self._client.connected
+
+    def enable_metrics(self) -> ModbusMetrics:
+        """Start collecting request metrics and return the collector."""
+        if self.metrics is None:
+            self.metrics = ModbusMetrics()
+        return self.metrics
 
     async def connect(self) -> None:
         """Open the Modbus connection."""
-        if self._client and self._client.connected:
+        if self.connected:
             return
 
-        self._client = AsyncModbusTcpClient(
+        started = time.monotonic()
+        if self.pipelined:
+            self._pipeline = PipelinedModbusTransport(self._host, self._port, self._timeout)
+            if not await self._pipeline.connect():
+                raise ConnectionError("Unable to open Modbus connection")
+            LOGGER.debug(
+                "Connected to Modbus host %s:%s (pipelined, %s in flight)",
+                self._host,
+                self._port,
+                self._max_in_flight,
+            )
+            self._record_connect(started)
+            return
+
+        # pymodbus is only needed for serial requests and costs noticeable
+        # import time, so it is loaded in an executor with the first serial
+        # connection.
+        pymodbus_client = await _async_import_pymodbus()
+        self._client = pymodbus_client.AsyncModbusTcpClient(
             host=self._host,
             port=self._port,
             timeout=self._timeout,
@@ -45,101 +525,716 @@ class DimplexModbusClient:
         if not await self._client.connect():
             raise ConnectionError("Unable to open Modbus connection")
         LOGGER.debug("Connected to Modbus host %s:%s", self._host, self._port)
+        self._record_connect(started)
+
+    def _record_connect(self, started: float) -> None:
+        if self.metrics is not None:
+            self.metrics.record_connect(time.monotonic() - started)
 
     async def close(self) -> None:
         """Close the Modbus connection."""
+        if self._pipeline:
+            await self._pipeline.close()
+            LOGGER.debug("Closed pipelined Modbus connection")
         if self._client:
-            await self._client.close()
+            result = self._client.close()
+            if inspect.isawaitable(result):
+                await result
             LOGGER.debug("Closed Modbus connection")
         self._client = None
 
     async def _ensure_connected(self) -> None:
         """Ensure that the connection is open."""
-        if self._client is None or not self._client.connected:
+        if not self.connected:
             await self.connect()
 
+    def record_pipelining_failure(self) -> None:
+        """Count a cycle whose concurrent requests failed but serial ones did not.
+
+        Only repeated failures drop the connection to serial requests, and
+        only until the retry interval has passed.
+        """
+        self._pipeline_failures += 1
+        if self._pipeline_failures < PIPELINE_FAILURE_THRESHOLD or self._max_in_flight == 1:
+            return
+        LOGGER.warning(
+            "Modbus host %s:%s rejected concurrent requests, falling back to serial reads"
+            " for %s s",
+            self._host,
+            self._port,
+            PIPELINE_RETRY_INTERVAL,
+        )
+        self._serial_until = time.monotonic() + PIPELINE_RETRY_INTERVAL
+        self._max_in_flight = 1
+        self._scheduler.limit = 1
+
+    def record_pipelining_success(self) -> None:
+        """Reset the failure count after a cycle of concurrent requests went fine."""
+        self._pipeline_failures = 0
+
+    def resume_pipelining(self) -> None:
+        """Restore the configured in-flight limit once the serial period is over."""
+        if self._max_in_flight == self._pipeline_limit or time.monotonic() < self._serial_until:
+            return
+        LOGGER.debug(
+            "Trying %s requests in flight to Modbus host %s:%s again",
+            self._pipeline_limit,
+            self._host,
+            self._port,
+        )
+        self._pipeline_failures = 0
+        self._max_in_flight = self._pipeline_limit
+        self._scheduler.limit = self._pipeline_limit
+
+    async def write_register(self, unit_id: int, address: int, value: int) -> None:
+        """Write a single holding register on the given unit."""
+        # Reads issued before the write completes must not be served after it.
+        self._invalidate_reads(unit_id, address)
+        try:
+            await self._request(unit_id, FUNCTION_CODE_WRITE_REGISTER, address, value)
+        except ModbusExceptionResponse as err:
+            raise ModbusError(f"Write error: {err}") from err
+        except ModbusError as err:
+            LOGGER.log(self._failure_log_level(err), "Modbus write failed: %s", err)
+            raise
+        finally:
+            self._invalidate_reads(unit_id, address)
+        LOGGER.debug("Wrote register %s=%s on unit %s", address, value, unit_id)
+
+    async def read(
+        self,
+        unit_id: int,
+        method: str,
+        address: int,
+        count: int,
+        *,
+        deadline: float | None = None,
+    ) -> array | None:
+        """Read registers from the given unit using the named read method.
+
+        Returns None if the device rejected the read, or if the ``deadline``
+        (event loop time) passed before the response arrived.
+        """
+        try:
+            registers = await self._read_shared(
+                unit_id, _READ_FUNCTION_CODES[method], address, count, deadline
+            )
+        except ModbusExceptionResponse as err:
+            LOGGER.warning("Modbus read error for %s at %s: %s", method, address, err)
+            return None
+        except ModbusError as err:
+            LOGGER.log(self._failure_log_level(err), "Modbus read failed: %s", err)
+            raise
+        LOGGER.debug(
+            "Read %s registers from %s starting at %s on unit %s: %s",
+            count,
+            method,
+            address,
+            unit_id,
+            registers,
+        )
+        return registers
+
+    async def probe(
+        self, unit_id: int, method: str, address: int, count: int
+    ) -> array | None:
+        """Read registers, raising exception responses instead of logging them."""
+        return await self._request(unit_id, _READ_FUNCTION_CODES[method], address, count)
+
+    async def _read_shared(
+        self,
+        unit_id: int,
+        function_code: int,
+        address: int,
+        count: int,
+        deadline: float | None = None,
+    ) -> array | None:
+        """Answer a read from the cache, a covering read in flight or a new request.
+
+        Every caller of a shared request waits for the same response; the
+        request is only cancelled once all of them have been cancelled. A
+        caller whose deadline passes gets None and stops waiting, but leaves
+        the request in flight, so the others still get, and the cache keeps,
+        its response. Exception responses are raised to every caller and not
+        cached.
+        """
+        key = (unit_id, function_code)
+        cached = self._cached_block(key, address, count)
+        if cached is not None:
+            if self.metrics is not None:
+                self.metrics.cache_hits += 1
+            return cached
+
+        shared = next(
+            (read for read in self._shared_reads.get(key, ()) if read.covers(address, count)),
+            None,
+        )
+        if shared is None:
+            shared = _SharedRead(
+                address,
+                count,
+                asyncio.ensure_future(self._request(unit_id, function_code, address, count)),
+            )
+            self._shared_reads.setdefault(key, []).append(shared)
+            shared.task.add_done_callback(
+                lambda task, shared=shared: self._finish_shared_read(key, shared)
+            )
+        else:
+            LOGGER.debug(
+                "Joining read of %s registers at %s on unit %s",
+                shared.count,
+                shared.address,
+                unit_id,
+            )
+            if self.metrics is not None:
+                self.metrics.coalesced_reads += 1
+
+        shared.waiters += 1
+        try:
+            async with asyncio.timeout_at(deadline) as timeout:
+                block = await asyncio.shield(shared.task)
+        except TimeoutError:
+            # A request timing out on its own is still an error.
+            if not timeout.expired():
+                raise
+            LOGGER.debug(
+                "Read of %s registers at %s on unit %s missed the deadline",
+                count,
+                address,
+                unit_id,
+            )
+            return None
+        except asyncio.CancelledError:
+            current = asyncio.current_task()
+            if shared.task.cancelled() and current is not None and not current.cancelling():
+                # The request was cancelled for other callers, not this one.
+                raise ModbusTimeoutError(
+                    f"Shared read of {shared.count} registers at {shared.address} was cancelled"
+                ) from None
+            if shared.waiters == 1:
+                # Stop new reads joining before the request is cancelled.
+                self._forget_shared_read(key, shared)
+                shared.task.cancel()
+            raise
+        finally:
+            shared.waiters -= 1
+        if block is None:
+            return None
+        offset = address - shared.address
+        return block[offset : offset + count]
+
+    def _forget_shared_read(self, key: tuple[int, int], shared: _SharedRead) -> None:
+        """Stop others from joining a read."""
+        reads = self._shared_reads.get(key)
+        if reads is not None and shared in reads:
+            reads.remove(shared)
+            if not reads:
+                del self._shared_reads[key]
+
+    def _finish_shared_read(self, key: tuple[int, int], shared: _SharedRead) -> None:
+        """Stop others from joining a finished read and cache its response."""
+        self._forget_shared_read(key, shared)
+        task = shared.task
+        # Retrieve the exception even when every caller was cancelled.
+        if task.cancelled() or task.exception() is not None:
+            return
+        block = task.result()
+        if block is None or shared.invalidated or self._cache_ttl <= 0:
+            return
+        expires = time.monotonic() + self._cache_ttl
+        self._read_cache.setdefault(key, {})[shared.address] = (expires, block)
+
+    def _cached_block(self, key: tuple[int, int], address: int, count: int) -> array | None:
+        """Return the registers from an unexpired cached block covering them."""
+        blocks = self._read_cache.get(key)
+        if not blocks:
+            return None
+        now = time.monotonic()
+        for start, (expires, block) in list(blocks.items()):
+            if expires <= now:
+                del blocks[start]
+            elif start <= address and address + count <= start + len(block):
+                offset = address - start
+                return block[offset : offset + count]
+        return None
+
+    def _invalidate_reads(self, unit_id: int, address: int) -> None:
+        """Drop cached blocks and reads in flight that hold a written register."""
+        for (cached_unit, _function_code), blocks in self._read_cache.items():
+            if cached_unit != unit_id:
+                continue
+            for start in [
+                start
+                for start, (_expires, block) in blocks.items()
+                if start <= address < start + len(block)
+            ]:
+                del blocks[start]
+        for (read_unit, _function_code), reads in self._shared_reads.items():
+            if read_unit != unit_id:
+                continue
+            for shared in [read for read in reads if read.covers(address, 1)]:
+                shared.invalidated = True
+                reads.remove(shared)
+
+    def _failure_log_level(self, err: ModbusError) -> int:
+        """Log only the first failure of an outage as an error."""
+        if isinstance(err, ModbusCircuitOpen) or self.breaker.failures > 1:
+            return logging.DEBUG
+        return logging.ERROR
+
+    async def _request(
+        self, unit_id: int, function_code: int, address: int, argument: int
+    ) -> array | None:
+        """Send one request once a slot is free and record its metrics.
+
+        ``argument`` is the register count for reads and the value for writes.
+        The request holds a scheduler slot until its response arrives; the
+        lock only serializes (re)connecting.
+        """
+        metrics = self.metrics
+        breaker = self.breaker
+        probe = await breaker.before_request()
+        pipelined = self.pipelined
+        priority = (
+            PRIORITY_WRITE if function_code == FUNCTION_CODE_WRITE_REGISTER else PRIORITY_READ
+        )
+        waited = time.monotonic() if metrics is not None else 0.0
+        try:
+            async with self._scheduler.slot(priority):
+                if metrics is not None:
+                    metrics.lock_wait.record(time.monotonic() - waited)
+                # The breaker may have opened while this request was queued.
+                breaker.check_open()
+                try:
+                    async with self._lock:
+                        await self._ensure_connected()
+                    sent = time.monotonic() if metrics is not None else 0.0
+                    if pipelined:
+                        result = await self._send_pipelined(
+                            unit_id, function_code, address, argument
+                        )
+                    else:
+                        result = await self._send_serial(
+                            unit_id, function_code, address, argument
+                        )
+                except ModbusExceptionResponse as err:
+                    breaker.record_success(probe)
+                    if metrics is not None:
+                        metrics.record_exception_response(err.exception_code)
+                    raise
+                except Exception as err:
+                    breaker.record_failure(probe)
+                    if metrics is not None:
+                        metrics.record_failure(err)
+                    raise
+        except asyncio.CancelledError:
+            breaker.release(probe)
+            raise
+        breaker.record_success(probe)
+        if metrics is not None:
+            count = argument if function_code != FUNCTION_CODE_WRITE_REGISTER else 1
+            metrics.record_request(function_code, address, count, time.monotonic() - sent)
+        return result
+
+    async def _send_serial(
+        self, unit_id: int, function_code: int, address: int, argument: int
+    ) -> array | None:
+        """Send a request through the pymodbus client.
+
+        pymodbus errors are re-raised as the integration's own exceptions;
+        a missing response (ModbusIOException) becomes a ModbusTimeoutError.
+        """
+        # Loaded along with pymodbus.client, so this is a sys.modules lookup.
+        from pymodbus.exceptions import ModbusException, ModbusIOException
+
+        assert self._client is not None
+        try:
+            if function_code == FUNCTION_CODE_WRITE_REGISTER:
+                func = self._client.write_register
+                result = await func(address, argument, **_unit_kwargs(func, unit_id))
+            else:
+                func = getattr(self._client, _READ_METHODS[function_code])
+                result = await func(
+                    address=address, count=argument, **_unit_kwargs(func, unit_id)
+                )
+        except ModbusIOException as err:
+            raise ModbusTimeoutError(str(err)) from err
+        except ModbusException as err:
+            raise ModbusError(str(err)) from err
+        if result.isError():
+            raise ModbusExceptionResponse(
+                function_code, getattr(result, "exception_code", 0) or 0
+            )
+        if function_code == FUNCTION_CODE_WRITE_REGISTER:
+            return None
+        return array("H", result.registers)
+
+    async def _send_pipelined(
+        self, unit_id: int, function_code: int, address: int, argument: int
+    ) -> array | None:
+        """Send a request through the pipelined transport."""
+        assert self._pipeline is not None
+        pdu = await self._pipeline.execute(
+            unit_id, function_code, struct.pack(">HH", address, argument)
+        )
+        if function_code == FUNCTION_CODE_WRITE_REGISTER:
+            return None
+        return registers_to_block(pdu[2 : 2 + pdu[1]])
+
+
+class DimplexConnectionManager:
+    """Hand out one reference-counted connection per gateway host:port."""
+
+    def __init__(self) -> None:
+        self._connections: dict[str, DimplexModbusConnection] = {}
+        self._refs: dict[str, int] = {}
+
+    def acquire(
+        self,
+        host: str,
+        port: int,
+        timeout: int,
+        *,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ) -> DimplexModbusConnection:
+        """Return the shared connection for host:port, creating it if needed."""
+        key = f"{host}:{port}"
+        connection = self._connections.get(key)
+        if connection is None:
+            connection = DimplexModbusConnection(
+                host, port, timeout, max_in_flight=max_in_flight
+            )
+            self._connections[key] = connection
+        else:
+            LOGGER.debug("Reusing Modbus connection to %s", key)
+            # One connection serves every entry, so the most cautious
+            # in-flight limit wins; the first entry's timeout stays in use.
+            connection.limit_in_flight(max_in_flight)
+            settings = connection.settings
+            if timeout != settings["timeout"] or max_in_flight != settings["max_in_flight"]:
+                LOGGER.warning(
+                    "Modbus connection to %s is shared with other entries; using a"
+                    " timeout of %s s and %s requests in flight instead of %s s and %s",
+                    key,
+                    settings["timeout"],
+                    settings["max_in_flight"],
+                    timeout,
+                    max_in_flight,
+                )
+        self._refs[key] = self._refs.get(key, 0) + 1
+        return connection
+
+    def join(self, host: str, port: int) -> DimplexModbusConnection | None:
+        """Return the shared connection for host:port, if any, as it is.
+
+        Unlike ``acquire`` this does not reconcile the caller's settings with
+        the connection's, for short-lived users such as the config flow check.
+        """
+        key = f"{host}:{port}"
+        connection = self._connections.get(key)
+        if connection is not None:
+            self._refs[key] += 1
+        return connection
+
+    async def release(self, connection: DimplexModbusConnection) -> None:
+        """Drop a reference and close the connection when it was the last one."""
+        key = connection.key
+        self._refs[key] -= 1
+        if self._refs[key] > 0:
+            return
+        del self._refs[key]
+        del self._connections[key]
+        await connection.close()
+
+
+def _unit_kwargs(func: Callable[..., Any], unit_id: int) -> dict[str, int]:
+    """Return the correct unit/slave argument for the pymodbus call."""
+    params = inspect.signature(func).parameters
+    if "unit" in params:
+        return {"unit": unit_id}
+    if "slave" in params:
+        return {"slave": unit_id}
+    return {}
+
+
+@dataclass
+class _PendingWrite:
+    """A register write waiting for its debounce window or rate limit."""
+
+    value: int
+    future: asyncio.Future[int]
+
+
+class DimplexModbusClient:
+    """Provide async access to a Modbus TCP device."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        unit_id: int,
+        timeout: int,
+        *,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        connection: DimplexModbusConnection | None = None,
+        write_debounce: float = DEFAULT_WRITE_DEBOUNCE,
+        write_min_interval: float = DEFAULT_WRITE_MIN_INTERVAL,
+        cache_ttl: float = READ_CACHE_TTL,
+    ) -> None:
+        self._unit_id = unit_id
+        self._owns_connection = connection is None
+        self._connection = connection or DimplexModbusConnection(
+            host, port, timeout, max_in_flight=max_in_flight, cache_ttl=cache_ttl
+        )
+        self._last_cycle_time: float | None = None
+        self._write_debounce = write_debounce
+        self._write_min_interval = write_min_interval
+        self._pending_writes: dict[int, _PendingWrite] = {}
+        self._last_write: dict[int, float] = {}
+        self._write_locks: dict[int, asyncio.Lock] = {}
+        self._write_tasks: set[asyncio.Task] = set()
+        # (register type, start, count) of ranges answered with an exception
+        # response even on their own; not retried when pipelined reads fail.
+        self._rejected_ranges: set[tuple[str, int, int]] = set()
+
+    @property
+    def connection(self) -> DimplexModbusConnection:
+        """Return the (possibly shared) gateway connection."""
+        return self._connection
+
+    @property
+    def max_in_flight(self) -> int:
+        """Return the current in-flight request limit."""
+        return self._connection.max_in_flight
+
+    @property
+    def metrics(self) -> ModbusMetrics | None:
+        """Return the request metrics of the connection, if enabled."""
+        return self._connection.metrics
+
+    @property
+    def connection_state(self) -> dict[str, Any]:
+        """Return the circuit breaker state of the connection."""
+        return self._connection.breaker.as_dict()
+
+    @property
+    def last_cycle_time(self) -> float | None:
+        """Return the duration in seconds of the last read_ranges call."""
+        return self._last_cycle_time
+
+    async def connect(self) -> None:
+        """Open the Modbus connection."""
+        await self._connection.connect()
+
+    async def close(self) -> None:
+        """Close the Modbus connection unless it is shared with other units."""
+        for task in self._write_tasks:
+            task.cancel()
+        if self._owns_connection:
+            await self._connection.close()
+
     async def read_holding_registers(
-        self, address: int, count: int
-    ) -> list[int] | None:
+        self, address: int, count: int, *, deadline: float | None = None
+    ) -> array | None:
         """Read holding registers."""
-        return await self._read("read_holding_registers", address, count)
+        return await self._connection.read(
+            self._unit_id, "read_holding_registers", address, count, deadline=deadline
+        )
 
     async def read_input_registers(
-        self, address: int, count: int
-    ) -> list[int] | None:
+        self, address: int, count: int, *, deadline: float | None = None
+    ) -> array | None:
         """Read input registers."""
-        return await self._read("read_input_registers", address, count)
+        return await self._connection.read(
+            self._unit_id, "read_input_registers", address, count, deadline=deadline
+        )
 
-    async def write_register(self, address: int, value: int) -> None:
-        """Write a single holding register."""
-        address += REGISTER_OFFSET
-        async with self._lock:
-            await self._ensure_connected()
-            try:
-                assert self._client is not None
-                result = await self._client.write_register(
-                    address, value, **self._unit_kwargs(self._client.write_register)
-                )
-            except ModbusException as err:
-                LOGGER.error("Modbus write failed: %s", err)
-                raise
-            if result.isError():
-                raise ModbusException(f"Write error: {result}")
-            LOGGER.debug("Wrote register %s=%s", address, value)
-
-    async def _read(
-        self, method: str, address: int, count: int
-    ) -> list[int] | None:
-        """Read registers using provided client method."""
-        async with self._lock:
-            await self._ensure_connected()
-            try:
-                assert self._client is not None
-                func = getattr(self._client, method)
-                result = await func(
-                    address=address,
-                    count=count,
-                    **self._unit_kwargs(func),
-                )
-            except ModbusException as err:
-                LOGGER.error("Modbus read failed: %s", err)
-                raise
-            if result.isError():
-                LOGGER.warning("Modbus read error for %s at %s: %s", method, address, result)
-                return None
+    async def probe_range(self, start: int, count: int, register_type: str) -> array | None:
+        """Read a range for discovery; exception responses are raised.
+
+        Unlike ``read_ranges`` nothing is logged for a rejected range, which
+        is the expected outcome for most requests of a register scan.
+        """
+        method = (
+            "read_holding_registers" if register_type == "holding" else "read_input_registers"
+        )
+        return await self._connection.probe(
+            self._unit_id, method, start + REGISTER_OFFSET, count
+        )
+
+    async def write_register(self, address: int, value: int) -> int:
+        """Write a single holding register and return the value written.
+
+        A write to an idle register is sent at once. Writes arriving while an
+        earlier one is in flight, within the debounce window after it, or
+        while it waits for the per-register rate limit, are merged: all
+        callers wait for one Modbus write of the latest value.
+        """
+        pending = self._pending_writes.get(address)
+        if pending is not None:
             LOGGER.debug(
-                "Read %s registers from %s starting at %s: %s",
-                count,
-                method,
-                address,
-                result.registers,
+                "Merging write %s=%s into pending write of %s", address, value, pending.value
             )
-            return result.registers
+            pending.value = value
+        else:
+            loop = asyncio.get_running_loop()
+            pending = _PendingWrite(value, loop.create_future())
+            self._pending_writes[address] = pending
+            task = loop.create_task(self._flush_write(address, pending))
+            self._write_tasks.add(task)
+            task.add_done_callback(
+                lambda task, address=address, pending=pending: self._write_done(
+                    task, address, pending
+                )
+            )
+        return await asyncio.shield(pending.future)
+
+    def _write_done(self, task: asyncio.Task, address: int, pending: _PendingWrite) -> None:
+        """Fail the callers of a write whose flush was cancelled.
+
+        This also covers a task cancelled before it started, e.g. on unload,
+        which never runs the handlers in ``_flush_write``.
+        """
+        self._write_tasks.discard(task)
+        if pending.future.done():
+            return
+        if self._pending_writes.get(address) is pending:
+            del self._pending_writes[address]
+        pending.future.set_exception(ModbusError(f"Write of register {address} cancelled"))
+
+    async def _flush_write(self, address: int, pending: _PendingWrite) -> None:
+        """Send a pending write once the previous write to the register is done.
 
-    def _unit_kwargs(self, func: Callable[..., Any]) -> dict[str, int]:
-        """Return the correct unit/slave argument for the pymodbus call."""
-        params = inspect.signature(func).parameters
-        if "unit" in params:
-            return {"unit": self._unit_id}
-        if "slave" in params:
-            return {"slave": self._unit_id}
-        return {}
+        The debounce window and rate limit count from the previous write, so
+        a write to an idle register does not wait at all.
+        """
+        lock = self._write_locks.setdefault(address, asyncio.Lock())
+        try:
+            async with lock:
+                last_write = self._last_write.get(address)
+                if last_write is not None:
+                    wait = max(self._write_debounce, self._write_min_interval)
+                    delay = last_write + wait - time.monotonic()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                del self._pending_writes[address]
+                self._last_write[address] = time.monotonic()
+                await self._connection.write_register(
+                    self._unit_id, address + REGISTER_OFFSET, pending.value
+                )
+        except Exception as err:  # noqa: BLE001 - handed to the waiting callers
+            pending.future.set_exception(err)
+        else:
+            pending.future.set_result(pending.value)
 
     async def read_ranges(
         self,
         ranges: Iterable[tuple[int, int]],
         register_type: str,
-    ) -> dict[int, int]:
-        """Batch read multiple ranges and return register/value mapping."""
-        values: dict[int, int] = {}
-        for start, count in ranges:
-            modbus_start = start + REGISTER_OFFSET
-            if register_type == "holding":
-                data = await self.read_holding_registers(modbus_start, count)
-            else:
-                data = await self.read_input_registers(modbus_start, count)
-            if data is None:
-                continue
-            for offset, value in enumerate(data):
-                values[start + offset] = value
+        *,
+        deadline: float | None = None,
+    ) -> RegisterSnapshot:
+        """Batch read multiple ranges into a snapshot with one block per range.
+
+        With a ``deadline`` (event loop time) every request only gets the
+        time left until then; ranges not read by the deadline are left out
+        of the snapshot, like rejected ones. Their requests are not
+        cancelled: other callers may share them, and a late response still
+        fills the read cache.
+        """
+        started = time.monotonic()
+        ranges = list(ranges)
+        self._connection.resume_pipelining()
+        if self._connection.max_in_flight > 1 and len(ranges) > 1:
+            results = await self._read_ranges_pipelined(ranges, register_type, deadline)
+        else:
+            results = [
+                await self._read_range(start, count, register_type, deadline)
+                for start, count in ranges
+            ]
+
+        values = RegisterSnapshot(
+            {
+                start: data
+                for (start, _count), data in zip(ranges, results)
+                if data is not None
+            }
+        )
+        self._last_cycle_time = time.monotonic() - started
         return values
+
+    async def _read_range(
+        self, start: int, count: int, register_type: str, deadline: float | None = None
+    ) -> array | None:
+        """Read a single range from the requested register bank by the deadline."""
+        modbus_start = start + REGISTER_OFFSET
+        read = (
+            self.read_holding_registers
+            if register_type == "holding"
+            else self.read_input_registers
+        )
+        if deadline is not None and asyncio.get_running_loop().time() >= deadline:
+            return None
+        # The connection gives up waiting at the deadline without cancelling
+        # the request, which other callers may share.
+        return await read(modbus_start, count, deadline=deadline)
+
+    async def _read_ranges_pipelined(
+        self,
+        ranges: list[tuple[int, int]],
+        register_type: str,
+        deadline: float | None = None,
+    ) -> list[array | None]:
+        """Issue all ranges concurrently and retry failures one at a time.
+
+        A range that fails while others are in flight but succeeds on its own
+        suggests the device does not accept concurrent transactions; after
+        repeated such cycles the connection drops back to serial mode for a
+        while. A range the device rejects on its own as well is remembered
+        and not retried in later cycles.
+        """
+        outcomes = await asyncio.gather(
+            *(
+                self._read_range(start, count, register_type, deadline)
+                for start, count in ranges
+            ),
+            return_exceptions=True,
+        )
+        results: list[array | None] = []
+        recovered = False
+        first_error: BaseException | None = None
+        for (start, count), outcome in zip(ranges, outcomes):
+            if isinstance(outcome, BaseException) and not isinstance(outcome, Exception):
+                raise outcome
+            if outcome is not None and not isinstance(outcome, Exception):
+                results.append(outcome)
+                continue
+            key = (register_type, start, count)
+            if outcome is None and key in self._rejected_ranges:
+                results.append(None)
+                continue
+            # Requests turned away by the breaker say nothing about
+            # concurrency support.
+            rejected = isinstance(outcome, ModbusCircuitOpen)
+            try:
+                retried = await self._read_range(start, count, register_type, deadline)
+            except Exception as err:  # noqa: BLE001 - re-raised below if nothing recovers
+                first_error = first_error or err
+                results.append(None)
+                continue
+            if retried is not None:
+                self._rejected_ranges.discard(key)
+            elif deadline is None or asyncio.get_running_loop().time() < deadline:
+                # None before the deadline is an exception response; a range
+                # that only ran out of time is retried as usual next cycle.
+                self._rejected_ranges.add(key)
+            recovered = recovered or (retried is not None and not rejected)
+            results.append(retried)
+
+        if recovered:
+            self._connection.record_pipelining_failure()
+        elif any(result is not None for result in results):
+            self._connection.record_pipelining_success()
+        if first_error is not None and all(result is None for result in results):
+            raise first_error
+        return results
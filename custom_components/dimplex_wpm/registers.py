@@ -0,0 +1,400 @@
+"""Register catalog and read planner for Dimplex WPM."""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+
+from .const import (
+    DATA_TYPE_ENUM,
+    DATA_TYPE_INT16,
+    DATA_TYPE_INT32,
+    DATA_TYPE_UINT16,
+    DATA_TYPE_UINT32,
+    DATA_TYPE_WIDTH,
+    DEFAULT_READ_GAP,
+    MAX_REGISTERS_PER_READ,
+    MODULE_DHW,
+    MODULE_HC1,
+    MODULE_ROOT,
+    MODULE_SG,
+    POLL_TIER_FAST,
+    POLL_TIER_NORMAL,
+    POLL_TIER_ON_DEMAND,
+    POLL_TIER_SLOW,
+    REG_DHW_TEMPERATURE,
+    REG_FAULT_CODE,
+    REG_FLOW_TEMPERATURE,
+    REG_LOCK_CODE,
+    REG_OUTDOOR_TEMPERATURE,
+    REG_RETURN_SETPOINT_TEMPERATURE,
+    REG_RETURN_TEMPERATURE,
+    REG_SENSOR_ERROR_CODE,
+    REG_SG_READY_MODE,
+    REG_STATUS_CODE,
+    REGISTER_STRATEGY_AUTO,
+    REGISTER_STRATEGY_HOLDING,
+)
+
+
+@dataclass(frozen=True)
+class DimplexRegister:
+    """Describe a register exposed by the WPM controller."""
+
+    key: str
+    address: int
+    data_type: str = DATA_TYPE_ENUM
+    scale: float = 1.0
+    # "auto" follows the configured register strategy.
+    bank: str = REGISTER_STRATEGY_AUTO
+    module: str = MODULE_ROOT
+    tier: str = POLL_TIER_NORMAL
+
+    @property
+    def width(self) -> int:
+        """Return the number of 16-bit registers the value occupies."""
+        return DATA_TYPE_WIDTH[self.data_type]
+
+
+@dataclass(frozen=True)
+class ReadRange:
+    """A single read request planned from the catalog."""
+
+    bank: str
+    start: int
+    count: int
+
+    @property
+    def end(self) -> int:
+        """Return the last register address covered by the range."""
+        return self.start + self.count - 1
+
+
+REGISTER_CATALOG: tuple[DimplexRegister, ...] = (
+    DimplexRegister(
+        "outdoor_temperature",
+        REG_OUTDOOR_TEMPERATURE,
+        DATA_TYPE_INT16,
+        0.1,
+        tier=POLL_TIER_FAST,
+    ),
+    DimplexRegister(
+        "return_temperature",
+        REG_RETURN_TEMPERATURE,
+        DATA_TYPE_INT16,
+        0.1,
+        module=MODULE_HC1,
+        tier=POLL_TIER_FAST,
+    ),
+    DimplexRegister(
+        "dhw_temperature",
+        REG_DHW_TEMPERATURE,
+        DATA_TYPE_INT16,
+        0.1,
+        module=MODULE_DHW,
+        tier=POLL_TIER_FAST,
+    ),
+    DimplexRegister(
+        "flow_temperature",
+        REG_FLOW_TEMPERATURE,
+        DATA_TYPE_INT16,
+        0.1,
+        module=MODULE_HC1,
+        tier=POLL_TIER_FAST,
+    ),
+    DimplexRegister(
+        "return_setpoint_temperature",
+        REG_RETURN_SETPOINT_TEMPERATURE,
+        DATA_TYPE_INT16,
+        0.1,
+        module=MODULE_HC1,
+    ),
+    DimplexRegister("status_code", REG_STATUS_CODE),
+    DimplexRegister("lock_code", REG_LOCK_CODE, tier=POLL_TIER_SLOW),
+    DimplexRegister("fault_code", REG_FAULT_CODE, tier=POLL_TIER_SLOW),
+    DimplexRegister("sensor_error_code", REG_SENSOR_ERROR_CODE, tier=POLL_TIER_SLOW),
+    # Writable setting, so it always lives in the holding bank.
+    DimplexRegister(
+        "sg_ready_code",
+        REG_SG_READY_MODE,
+        bank=REGISTER_STRATEGY_HOLDING,
+        module=MODULE_SG,
+        tier=POLL_TIER_SLOW,
+    ),
+)
+
+REGISTERS_BY_ADDRESS: dict[int, DimplexRegister] = {
+    register.address: register for register in REGISTER_CATALOG
+}
+
+POLL_TIERS: tuple[str, ...] = (
+    POLL_TIER_FAST,
+    POLL_TIER_NORMAL,
+    POLL_TIER_SLOW,
+    POLL_TIER_ON_DEMAND,
+)
+
+
+def plan_reads(
+    registers: Iterable[DimplexRegister],
+    *,
+    max_gap: int = DEFAULT_READ_GAP,
+    max_count: int = MAX_REGISTERS_PER_READ,
+    bad_addresses: Iterable[int] = (),
+) -> list[ReadRange]:
+    """Coalesce registers into the fewest read requests per bank.
+
+    Neighbouring registers are merged when the padding between them is at
+    most ``max_gap`` registers, which is cheaper than another round-trip.
+    Ranges never exceed ``max_count`` registers and never cover an address in
+    ``bad_addresses``; registers at such addresses are skipped entirely.
+    """
+    bad = frozenset(bad_addresses)
+    spans_by_bank: dict[str, list[tuple[int, int]]] = {}
+    for register in registers:
+        end = register.address + register.width - 1
+        if any(address in bad for address in range(register.address, end + 1)):
+            continue
+        spans_by_bank.setdefault(register.bank, []).append((register.address, end))
+
+    plan: list[ReadRange] = []
+    for bank, spans in spans_by_bank.items():
+        spans.sort()
+        start, end = spans[0]
+        for next_start, next_end in spans[1:]:
+            merged_end = max(end, next_end)
+            if (
+                next_start <= end + 1 + max_gap
+                and merged_end - start + 1 <= max_count
+                and not any(address in bad for address in range(end + 1, next_start))
+            ):
+                end = merged_end
+                continue
+            plan.append(ReadRange(bank, start, end - start + 1))
+            start, end = next_start, next_end
+        plan.append(ReadRange(bank, start, end - start + 1))
+    return plan
+
+
+def decode_register(register: DimplexRegister, raw: Mapping[int, int]) -> float | int | None:
+    """Return the scaled value of a register, or None if it was not read."""
+    words = [raw.get(register.address + offset) for offset in range(register.width)]
+    if any(word is None for word in words):
+        return None
+    value = 0
+    for word in words:
+        value = (value << 16) | word
+    if register.data_type in (DATA_TYPE_INT16, DATA_TYPE_INT32):
+        bits = 16 * register.width
+        if value >= 1 << (bits - 1):
+            value -= 1 << bits
+    divisor = _divisor(register.scale)
+    if divisor is None:
+        return value
+    return value / divisor
+
+
+def _divisor(scale: float) -> float | None:
+    """Return the number to divide a raw value by, or None for unscaled values.
+
+    Dividing by 10 instead of multiplying by 0.1 yields the correctly rounded
+    float, so values come out as 21.4 rather than 21.400000000000002.
+    """
+    if scale == 1:
+        return None
+    inverse = 1 / scale
+    if abs(inverse - round(inverse)) < 1e-9:
+        return round(inverse)
+    return inverse
+
+
+class RegisterSnapshot(Mapping[int, int]):
+    """Raw register values kept as one ``array('H')`` block per read range.
+
+    Blocks are keyed by their start address and looked up with a bisect, so
+    reading an address works like the old ``dict[int, int]`` without keeping
+    an entry per register. Blocks are never modified once stored: merging
+    replaces them, which lets copies share the arrays of unchanged ranges.
+    """
+
+    __slots__ = ("_blocks", "_starts")
+
+    def __init__(self, blocks: Mapping[int, array] | None = None) -> None:
+        self._blocks: dict[int, array] = dict(blocks or {})
+        self._starts: tuple[int, ...] = tuple(sorted(self._blocks))
+
+    @property
+    def blocks(self) -> Mapping[int, array]:
+        """Return the register blocks keyed by start address."""
+        return self._blocks
+
+    @property
+    def layout(self) -> tuple[tuple[int, int], ...]:
+        """Return the (start, count) of every block, in address order."""
+        return tuple((start, len(self._blocks[start])) for start in self._starts)
+
+    def __getitem__(self, address: int) -> int:
+        index = bisect_right(self._starts, address) - 1
+        while index >= 0:
+            start = self._starts[index]
+            offset = address - start
+            # Blocks are at most one read long, so nothing further back can match.
+            if offset >= MAX_REGISTERS_PER_READ:
+                break
+            block = self._blocks[start]
+            if offset < len(block):
+                return block[offset]
+            index -= 1
+        raise KeyError(address)
+
+    def __iter__(self) -> Iterator[int]:
+        covered = -1
+        for start in self._starts:
+            end = start + len(self._blocks[start])
+            yield from range(max(start, covered), end)
+            covered = max(covered, end)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def covers(self, start: int, count: int) -> bool:
+        """Return True if a block holds every register of the range."""
+        block = self._blocks.get(start)
+        return block is not None and len(block) >= count
+
+    def merge(self, other: RegisterSnapshot) -> None:
+        """Take over the blocks of another snapshot, replacing equal starts."""
+        new_start = any(start not in self._blocks for start in other._blocks)
+        self._blocks.update(other._blocks)
+        if new_start:
+            self._starts = tuple(sorted(self._blocks))
+
+    def copy(self) -> RegisterSnapshot:
+        """Return a snapshot sharing this one's (immutable) blocks."""
+        snapshot = RegisterSnapshot.__new__(RegisterSnapshot)
+        snapshot._blocks = dict(self._blocks)
+        snapshot._starts = self._starts
+        return snapshot
+
+    def changed(self, previous: Mapping[int, int] | None) -> frozenset[int]:
+        """Return the addresses whose value differs from a previous snapshot.
+
+        Blocks shared with the previous snapshot, i.e. ranges that were not
+        read this cycle, are skipped without looking at their values.
+        """
+        if not isinstance(previous, RegisterSnapshot):
+            return frozenset(self) | frozenset(previous or ())
+        changed: set[int] = set()
+        for start, block in self._blocks.items():
+            old = previous._blocks.get(start)
+            if old is block or old == block:
+                continue
+            if old is None or len(old) != len(block):
+                changed.update(range(start, start + max(len(block), len(old or ()))))
+                continue
+            changed.update(
+                start + offset
+                for offset, (value, old_value) in enumerate(zip(block, old))
+                if value != old_value
+            )
+        for start, old in previous._blocks.items():
+            if start not in self._blocks:
+                changed.update(range(start, start + len(old)))
+        return frozenset(changed)
+
+
+def registers_to_block(data: bytes) -> array:
+    """Return big-endian register bytes from the wire as an ``array('H')``."""
+    block = array("H", data)
+    if sys.byteorder == "little":
+        block.byteswap()
+    return block
+
+
+def _wire_bytes(block: array) -> bytes:
+    """Return a block as big-endian bytes, the layout Modbus sends it in."""
+    if sys.byteorder == "little":
+        block = array("H", block)
+        block.byteswap()
+    return block.tobytes()
+
+
+_STRUCT_CODES = {
+    DATA_TYPE_INT16: "h",
+    DATA_TYPE_UINT16: "H",
+    DATA_TYPE_INT32: "i",
+    DATA_TYPE_UINT32: "I",
+}
+
+
+@dataclass(frozen=True)
+class BlockDecoder:
+    """Decode every numeric register of one block with a single unpack."""
+
+    start: int
+    layout: struct.Struct
+    # (key, divisor) per unpacked value; a None divisor keeps the raw integer.
+    fields: tuple[tuple[str, float | None], ...]
+
+
+def build_decoders(
+    registers: Iterable[DimplexRegister],
+    layout: Iterable[tuple[int, int]],
+) -> tuple[BlockDecoder, ...]:
+    """Build the decode plan for the numeric registers of a snapshot layout.
+
+    Each block gets a big-endian struct format that skips the padding and
+    enum registers between fields, so decoding is one ``unpack_from`` call
+    per block. Registers that overlap an earlier field get another decoder
+    for the same block.
+    """
+    numeric = sorted(
+        (register for register in registers if register.data_type in _STRUCT_CODES),
+        key=lambda register: register.address,
+    )
+    decoders: list[BlockDecoder] = []
+    for start, count in layout:
+        remaining = [
+            register
+            for register in numeric
+            if start <= register.address and register.address + register.width <= start + count
+        ]
+        while remaining:
+            fmt = [">"]
+            fields: list[tuple[str, float | None]] = []
+            overlapping: list[DimplexRegister] = []
+            cursor = start
+            for register in remaining:
+                if register.address < cursor:
+                    overlapping.append(register)
+                    continue
+                if register.address > cursor:
+                    fmt.append(f"{2 * (register.address - cursor)}x")
+                fmt.append(_STRUCT_CODES[register.data_type])
+                fields.append((register.key, _divisor(register.scale)))
+                cursor = register.address + register.width
+            decoders.append(BlockDecoder(start, struct.Struct("".join(fmt)), tuple(fields)))
+            remaining = overlapping
+    return tuple(decoders)
+
+
+def decode_blocks(
+    snapshot: RegisterSnapshot, decoders: Iterable[BlockDecoder]
+) -> dict[str, float | int]:
+    """Decode the numeric registers of a snapshot using a prebuilt plan."""
+    blocks = snapshot.blocks
+    wire: dict[int, bytes] = {}
+    decoded: dict[str, float | int] = {}
+    for decoder in decoders:
+        data = wire.get(decoder.start)
+        if data is None:
+            data = wire[decoder.start] = _wire_bytes(blocks[decoder.start])
+        for (key, divisor), value in zip(
+            decoder.fields, decoder.layout.unpack_from(data)
+        ):
+            decoded[key] = value if divisor is None else value / divisor
+    return decoded
@@ -0,0 +1,256 @@
+"""Compact binary log of the raw register stream.
+
+Every poll appends one record holding a wall clock timestamp and the
+registers whose value changed since the previous record. The first record
+of each file, the first after records were dropped, and any record whose
+set of registers differs from the previous one, is a keyframe with every
+register: a rotated file can be read on its own, and registers that left
+the snapshot (e.g. rejected by the device) do not linger in the reader.
+
+File layout (little endian)::
+
+    header   b"DWPMLOG" + version byte
+    record   kind (B, 0 = keyframe, 1 = delta), timestamp (d), count (H),
+             then count (address, value) pairs of H
+
+Records are buffered in memory and appended by an executor job, never on
+the event loop. The buffer is bounded; when the disk cannot keep up, new
+records are dropped and counted instead.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+
+from .const import (
+    SAMPLE_LOG_BACKUPS,
+    SAMPLE_LOG_BUFFER_BYTES,
+    SAMPLE_LOG_FLUSH_BYTES,
+    SAMPLE_LOG_FLUSH_INTERVAL,
+)
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from homeassistant.core import Event, HomeAssistant
+
+    from .registers import RegisterSnapshot
+
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"DWPMLOG\x01"
+RECORD_KEYFRAME = 0
+RECORD_DELTA = 1
+_RECORD = struct.Struct("<BdH")
+
+
+def encode_record(kind: int, timestamp: float, values: Mapping[int, int]) -> bytes:
+    """Encode one record from (address, value) pairs."""
+    pairs = [item for address in sorted(values) for item in (address, values[address])]
+    return _RECORD.pack(kind, timestamp, len(values)) + struct.pack(
+        f"<{len(pairs)}H", *pairs
+    )
+
+
+class SampleLogger:
+    """Append delta encoded register snapshots to a rotating file."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: Path,
+        *,
+        max_bytes: int,
+        backups: int = SAMPLE_LOG_BACKUPS,
+    ) -> None:
+        self._hass = hass
+        self._path = path
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._previous: RegisterSnapshot | None = None
+        # (rotate before writing, data) chunks waiting for the executor.
+        self._pending: list[tuple[bool, bytes]] = []
+        self._pending_bytes = 0
+        self._size = len(MAGIC)
+        self._flushed_at = time.monotonic()
+        self._flush_task: asyncio.Task[None] | None = None
+        self._unsub_final_write: Callable[[], None] | None = None
+        self.records = 0
+        self.dropped = 0
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    async def async_start(self) -> None:
+        """Pick up the size of an existing log file and flush on shutdown."""
+        from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+
+        self._size = await self._hass.async_add_executor_job(self._file_size)
+        self._unsub_final_write = self._hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write
+        )
+
+    async def _async_final_write(self, _event: Event) -> None:
+        self._unsub_final_write = None
+        await self.async_close()
+
+    def _file_size(self) -> int:
+        try:
+            return max(self._path.stat().st_size, len(MAGIC))
+        except FileNotFoundError:
+            return len(MAGIC)
+
+    def record(self, raw: RegisterSnapshot) -> None:
+        """Queue a record of the registers that changed since the last one."""
+        rotate = self._size >= self._max_bytes
+        if rotate:
+            self._size = len(MAGIC)
+            self._previous = None
+        if self._previous is None or raw.layout != self._previous.layout:
+            kind, values = RECORD_KEYFRAME, dict(raw)
+        else:
+            kind = RECORD_DELTA
+            values = {
+                address: raw[address]
+                for address in raw.changed(self._previous)
+                if address in raw
+            }
+        data = encode_record(kind, time.time(), values)
+        if self._pending_bytes + len(data) > SAMPLE_LOG_BUFFER_BYTES:
+            if not self.dropped:
+                LOGGER.warning("Sample log %s cannot keep up, dropping records", self._path)
+            self.dropped += 1
+            # The next record must not depend on the dropped one.
+            self._previous = None
+            if rotate:
+                self._size = self._max_bytes
+            return
+        self._previous = raw.copy()
+        self._pending.append((rotate, data))
+        self._pending_bytes += len(data)
+        self._size += len(data)
+        self.records += 1
+        if self._flush_task is None and (
+            self._pending_bytes >= SAMPLE_LOG_FLUSH_BYTES
+            or time.monotonic() - self._flushed_at >= SAMPLE_LOG_FLUSH_INTERVAL
+        ):
+            self._flush_task = self._hass.async_create_background_task(
+                self._async_flush(), f"dimplex_wpm sample log flush {self._path.name}"
+            )
+
+    async def _async_flush(self) -> None:
+        try:
+            while self._pending:
+                chunks, self._pending, self._pending_bytes = self._pending, [], 0
+                await self._hass.async_add_executor_job(self._write, chunks)
+        except OSError as err:
+            LOGGER.error("Could not write sample log %s: %s", self._path, err)
+            self._previous = None
+        finally:
+            self._flushed_at = time.monotonic()
+            self._flush_task = None
+
+    def _write(self, chunks: Iterable[tuple[bool, bytes]]) -> None:
+        """Append chunks to the log file, rotating where marked."""
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        handle = self._path.open("ab")
+        try:
+            for rotate, data in chunks:
+                if rotate:
+                    handle.close()
+                    self._rotate()
+                    handle = self._path.open("ab")
+                if handle.tell() == 0:
+                    handle.write(MAGIC)
+                handle.write(data)
+        finally:
+            handle.close()
+
+    def _rotate(self) -> None:
+        """Shift ``log`` to ``log.1``, ``log.1`` to ``log.2`` and so on."""
+        for index in range(self._backups - 1, 0, -1):
+            source = self._path.with_name(f"{self._path.name}.{index}")
+            if source.exists():
+                os.replace(source, self._path.with_name(f"{self._path.name}.{index + 1}"))
+        if not self._path.exists():
+            return
+        if self._backups:
+            os.replace(self._path, self._path.with_name(f"{self._path.name}.1"))
+        else:
+            self._path.unlink()
+
+    async def async_close(self) -> None:
+        """Write out the buffered records."""
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+        if self._flush_task is not None:
+            await self._flush_task
+        if self._pending:
+            await self._async_flush()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the logger state for diagnostics."""
+        return {
+            "path": str(self._path),
+            "size": self._size,
+            "records": self.records,
+            "dropped": self.dropped,
+            "pending_bytes": self._pending_bytes,
+        }
+
+
+class Sample(NamedTuple):
+    """A decoded record with its changes and the full register state."""
+
+    timestamp: float
+    keyframe: bool
+    changes: dict[int, int]
+    values: dict[int, int]
+
+
+def log_files(path: Path) -> list[Path]:
+    """Return a log file and its rotated backups, oldest first."""
+    backups = sorted(
+        (
+            candidate
+            for candidate in path.parent.glob(f"{path.name}.*")
+            if candidate.suffix[1:].isdigit()
+        ),
+        key=lambda candidate: int(candidate.suffix[1:]),
+        reverse=True,
+    )
+    return [*backups, *([path] if path.exists() else [])]
+
+
+def iter_samples(paths: Iterable[Path]) -> Iterator[Sample]:
+    """Stream the records of one or more log files in order.
+
+    The register state carries over from one file to the next; a truncated
+    record at the end of a file, e.g. after a power cut, ends that file.
+    """
+    values: dict[int, int] = {}
+    for path in paths:
+        with Path(path).open("rb") as handle:
+            if handle.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a Dimplex WPM sample log")
+            while header := handle.read(_RECORD.size):
+                if len(header) < _RECORD.size:
+                    break
+                kind, timestamp, count = _RECORD.unpack(header)
+                body = handle.read(count * 4)
+                if len(body) < count * 4:
+                    break
+                pairs = struct.unpack(f"<{count * 2}H", body)
+                changes = dict(zip(pairs[::2], pairs[1::2]))
+                if kind == RECORD_KEYFRAME:
+                    values = {}
+                values.update(changes)
+                yield Sample(timestamp, kind == RECORD_KEYFRAME, changes, dict(values))
@@ -2,14 +2,11 @@
 
 from __future__ import annotations
 
-from pymodbus.exceptions import ModbusException
-
 from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
     CONF_ENABLE_WRITE_ENTITIES,
@@ -21,6 +18,8 @@ from .const import (
     SG_READY_REVERSE,
 )
 from .device import build_device_info
+from .entity import DimplexEntity
+from .exceptions import ModbusError
 
 
 async def async_setup_entry(
@@ -39,11 +38,12 @@ async def async_setup_entry(
         )
 
 
-class DimplexSGReadySelect(CoordinatorEntity, SelectEntity):
+class DimplexSGReadySelect(DimplexEntity, SelectEntity):
     """Representation of the SG Ready mode select."""
 
     _attr_has_entity_name = True
     _attr_translation_key = "sg_ready_mode"
+    _source_keys = frozenset({"sg_ready_text"})
 
     def __init__(self, coordinator, entry: ConfigEntry, allow_write: bool) -> None:
         super().__init__(coordinator)
@@ -74,7 +74,6 @@ class DimplexSGReadySelect(CoordinatorEntity, SelectEntity):
             raise HomeAssistantError(f"Invalid option {option}")
         value = SG_READY_REVERSE[option]
         try:
-            await self.coordinator.write_sg_ready(REG_SG_READY_MODE, value)
-            await self.coordinator.async_request_refresh()
-        except ModbusException as err:
+            await self.coordinator.async_write_register(REG_SG_READY_MODE, value)
+        except (ModbusError, ConnectionError) as err:
             raise HomeAssistantError(f"Failed to write SG Ready value: {err}") from err
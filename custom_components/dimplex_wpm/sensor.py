@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, replace
 from typing import Any, Callable
 
 from homeassistant.components.sensor import (
@@ -13,16 +14,33 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import EntityCategory, UnitOfTemperature
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTemperature,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_platform
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import (
+    ATTR_STALE,
     CONF_ENABLE_BMS_TEMP,
+    CONF_ENABLE_DERIVED_METRICS,
     CONF_ENABLE_EMS,
     CONF_ENABLE_EXTERNAL_LOCK,
+    CONF_ENABLE_METRICS,
     CONF_ENABLE_WRITE_ENTITIES,
+    CONF_DEADBAND_PREFIX,
+    CONF_MAX_PUBLISH_AGE,
+    CONF_MIN_PUBLISH_INTERVAL,
+    DEFAULT_MAX_PUBLISH_AGE,
+    DEFAULT_MIN_PUBLISH_INTERVAL,
+    DEFAULT_TEMPERATURE_DEADBAND,
+    DERIVED_METRIC_SOURCES,
+    DERIVED_METRIC_WINDOWS,
     DOMAIN,
     MODULE_DHW,
     MODULE_HC1,
@@ -40,7 +58,10 @@ from .const import (
     REG_SG_READY_MODE,
     REG_STATUS_CODE,
 )
-from .device import build_device_info
+from .cascade import DimplexCascadeCoordinator
+from .derived_metrics import ROLLING_STATS, rolling_key
+from .device import build_cascade_device_info, build_device_info
+from .entity import DimplexEntity
 
 LOGGER = logging.getLogger(__name__)
 
@@ -53,6 +74,15 @@ class DimplexSensorEntityDescription(SensorEntityDescription):
     attrs_fn: Callable[[dict[str, Any], dict[str, Any]], dict[str, Any] | None] | None = None
     register: int | None = None
     module: str = MODULE_ROOT
+    # Stay available while polls fail, e.g. to report the connection state.
+    always_available: bool = False
+    # Publish filter: changes smaller than deadband, or sooner than
+    # min_publish_interval seconds, are held until max_publish_age elapses.
+    # Only sensors declaring a deadband (0 = off) are filtered; the options
+    # set the deadband of each one.
+    deadband: float | None = None
+    min_publish_interval: float | None = None
+    max_publish_age: float | None = None
 
 
 SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
@@ -60,7 +90,10 @@ SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
         key="controller_info",
         translation_key="controller_info",
         entity_category=EntityCategory.DIAGNOSTIC,
-        value_fn=lambda data: "online" if data else None,
+        always_available=True,
+        value_fn=lambda data: (
+            "online" if data.get("meta", {}).get("update_success") else "offline"
+        ),
         attrs_fn=lambda data, entry_data: {
             "host": entry_data.get("host"),
             "port": entry_data.get("port"),
@@ -70,6 +103,15 @@ SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
             "last_update": data.get("meta", {}).get("last_update"),
             "update_success": data.get("meta", {}).get("update_success"),
             "consecutive_failures": data.get("meta", {}).get("consecutive_failures"),
+            "stale": data.get("meta", {}).get("stale"),
+            "connection_state": data.get("meta", {}).get("connection", {}).get("state"),
+            "connection_retry_in": data.get("meta", {}).get("connection", {}).get("retry_in"),
+            "rejected_registers": data.get("meta", {}).get("rejected_registers"),
+            "cycle_time": data.get("meta", {}).get("cycle_time"),
+            "overrun_cycles": data.get("meta", {}).get("overrun_cycles"),
+            "scan_interval": data.get("meta", {}).get("scan_interval"),
+            "max_in_flight": data.get("meta", {}).get("max_in_flight"),
+            "entity_writes": data.get("meta", {}).get("entity_writes"),
             "capabilities": {
                 "sg_ready_write": entry_data.get("enable_write", False),
                 "ems_entities": entry_data.get("enable_ems", False),
@@ -85,6 +127,7 @@ SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         value_fn=lambda data: data["derived"].get("outdoor_temperature"),
+        deadband=DEFAULT_TEMPERATURE_DEADBAND,
     ),
     DimplexSensorEntityDescription(
         key="return_temperature",
@@ -93,6 +136,7 @@ SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         value_fn=lambda data: data["derived"].get("return_temperature"),
+        deadband=DEFAULT_TEMPERATURE_DEADBAND,
         module=MODULE_HC1,
     ),
     DimplexSensorEntityDescription(
@@ -102,6 +146,7 @@ SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         value_fn=lambda data: data["derived"].get("return_setpoint_temperature"),
+        deadband=DEFAULT_TEMPERATURE_DEADBAND,
         module=MODULE_HC1,
     ),
     DimplexSensorEntityDescription(
@@ -111,6 +156,7 @@ SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         value_fn=lambda data: data["derived"].get("flow_temperature"),
+        deadband=DEFAULT_TEMPERATURE_DEADBAND,
         module=MODULE_HC1,
     ),
     DimplexSensorEntityDescription(
@@ -120,6 +166,7 @@ SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.TEMPERATURE,
         state_class=SensorStateClass.MEASUREMENT,
         value_fn=lambda data: data["derived"].get("dhw_temperature"),
+        deadband=DEFAULT_TEMPERATURE_DEADBAND,
         module=MODULE_DHW,
     ),
     DimplexSensorEntityDescription(
@@ -192,6 +239,163 @@ SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
 )
 
 
+# Created only when Modbus request metrics are enabled in the options.
+METRIC_SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
+    DimplexSensorEntityDescription(
+        key="modbus_requests",
+        translation_key="modbus_requests",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data["derived"].get("modbus_requests"),
+    ),
+    DimplexSensorEntityDescription(
+        key="modbus_errors",
+        translation_key="modbus_errors",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data["derived"].get("modbus_errors"),
+    ),
+    DimplexSensorEntityDescription(
+        key="modbus_timeouts",
+        translation_key="modbus_timeouts",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data["derived"].get("modbus_timeouts"),
+    ),
+    DimplexSensorEntityDescription(
+        key="modbus_exception_responses",
+        translation_key="modbus_exception_responses",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data["derived"].get("modbus_exception_responses"),
+    ),
+    DimplexSensorEntityDescription(
+        key="modbus_reconnects",
+        translation_key="modbus_reconnects",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data["derived"].get("modbus_reconnects"),
+    ),
+    DimplexSensorEntityDescription(
+        key="modbus_bytes_sent",
+        translation_key="modbus_bytes_sent",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data["derived"].get("modbus_bytes_sent"),
+    ),
+    DimplexSensorEntityDescription(
+        key="modbus_bytes_received",
+        translation_key="modbus_bytes_received",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data["derived"].get("modbus_bytes_received"),
+    ),
+    DimplexSensorEntityDescription(
+        key="modbus_latency_p95",
+        translation_key="modbus_latency_p95",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["derived"].get("modbus_latency_p95"),
+    ),
+    DimplexSensorEntityDescription(
+        key="modbus_lock_wait",
+        translation_key="modbus_lock_wait",
+        entity_category=EntityCategory.DIAGNOSTIC,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["derived"].get("modbus_lock_wait"),
+    ),
+)
+
+
+def _rolling_description(
+    source: str, stat: str, minutes: int
+) -> DimplexSensorEntityDescription:
+    """Describe a rolling statistic of a derived metric source."""
+    key = rolling_key(source, stat, minutes)
+    temperature = source.endswith("_temperature")
+    return DimplexSensorEntityDescription(
+        key=key,
+        translation_key=f"{source}_{stat}",
+        translation_placeholders={"window": str(minutes)},
+        native_unit_of_measurement=(
+            UnitOfTemperature.CELSIUS if temperature else UnitOfTemperature.KELVIN
+        ),
+        device_class=SensorDeviceClass.TEMPERATURE if temperature else None,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["derived"].get(key),
+        module=MODULE_ROOT if source == "outdoor_temperature" else MODULE_HC1,
+    )
+
+
+# Created only when derived metrics are enabled in the options.
+DERIVED_METRIC_SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
+    DimplexSensorEntityDescription(
+        key="flow_return_spread",
+        translation_key="flow_return_spread",
+        native_unit_of_measurement=UnitOfTemperature.KELVIN,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["derived"].get("flow_return_spread"),
+        module=MODULE_HC1,
+    ),
+    DimplexSensorEntityDescription(
+        key="heating_rate",
+        translation_key="heating_rate",
+        native_unit_of_measurement="K/min",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["derived"].get("heating_rate"),
+        module=MODULE_HC1,
+    ),
+    DimplexSensorEntityDescription(
+        key="status_duration",
+        translation_key="status_duration",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["derived"].get("status_duration"),
+        attrs_fn=lambda data, entry_data: {
+            "time_in_state": data.get("derived", {}).get("time_in_state"),
+        },
+    ),
+    *(
+        _rolling_description(source, stat, minutes)
+        for source in DERIVED_METRIC_SOURCES
+        for minutes in DERIVED_METRIC_WINDOWS
+        for stat in ROLLING_STATS
+    ),
+)
+
+
+# Aggregates of a cascade, on the cascade device; value_fn gets the cascade data.
+CASCADE_SENSOR_DESCRIPTIONS: tuple[DimplexSensorEntityDescription, ...] = (
+    DimplexSensorEntityDescription(
+        key="units_online",
+        translation_key="units_online",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["aggregate"]["units_online"],
+    ),
+    DimplexSensorEntityDescription(
+        key="units_running",
+        translation_key="units_running",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["aggregate"]["units_running"],
+    ),
+    DimplexSensorEntityDescription(
+        key="units_heat_demand",
+        translation_key="units_heat_demand",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["aggregate"]["units_heat_demand"],
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     entry: ConfigEntry,
@@ -214,7 +418,32 @@ async def async_setup_entry(
         "enable_external_lock": data.get(CONF_ENABLE_EXTERNAL_LOCK, False),
     }
 
-    for description in SENSOR_DESCRIPTIONS:
+    publish_filter = {
+        "min_publish_interval": entry.options.get(
+            CONF_MIN_PUBLISH_INTERVAL, DEFAULT_MIN_PUBLISH_INTERVAL
+        )
+        or None,
+        "max_publish_age": entry.options.get(
+            CONF_MAX_PUBLISH_AGE, DEFAULT_MAX_PUBLISH_AGE
+        )
+        or None,
+    }
+
+    descriptions = SENSOR_DESCRIPTIONS
+    if data.get(CONF_ENABLE_METRICS):
+        descriptions += METRIC_SENSOR_DESCRIPTIONS
+    if data.get(CONF_ENABLE_DERIVED_METRICS):
+        descriptions += DERIVED_METRIC_SENSOR_DESCRIPTIONS
+
+    for description in descriptions:
+        if description.deadband is not None:
+            description = replace(
+                description,
+                deadband=entry.options.get(
+                    f"{CONF_DEADBAND_PREFIX}{description.key}", description.deadband
+                ),
+                **publish_filter,
+            )
         if description.register is not None:
             if description.register in register_usage:
                 LOGGER.warning(
@@ -229,8 +458,21 @@ async def async_setup_entry(
 
     async_add_entities(entities)
 
+    cascade: DimplexCascadeCoordinator | None = data.get("cascade")
+    if cascade is not None:
+        platform = entity_platform.async_get_current_platform()
+        await cascade.async_register_aggregate_platform(
+            entry.entry_id,
+            lambda: platform.async_add_entities(
+                [
+                    DimplexCascadeSensor(cascade, description)
+                    for description in CASCADE_SENSOR_DESCRIPTIONS
+                ]
+            ),
+        )
+
 
-class DimplexSensor(CoordinatorEntity, SensorEntity):
+class DimplexSensor(DimplexEntity, SensorEntity):
     """Representation of a Dimplex sensor."""
 
     entity_description: DimplexSensorEntityDescription
@@ -258,17 +500,97 @@ class DimplexSensor(CoordinatorEntity, SensorEntity):
             software_version=integration_flags.get("software_version"),
         )
         self._attr_unique_id = f"{entry.entry_id}_{description.module}_{description.key}"
+        self._published_value: Any = None
+        self._published_at: float | None = None
+        self._publish_filtered = bool(
+            description.deadband or description.min_publish_interval
+        )
+        if description.register is not None:
+            self._source_registers = frozenset({description.register})
+        elif description.attrs_fn is None:
+            self._source_keys = frozenset({description.key})
+        else:
+            # Attributes such as last_update change on every poll.
+            self._always_write = True
+
+    @property
+    def available(self) -> bool:
+        return self.entity_description.always_available or super().available
 
     @property
     def native_value(self):
+        if self._publish_filtered and self._published_at is not None:
+            return self._published_value
+        return self._live_value()
+
+    def _live_value(self) -> Any:
         data = self.coordinator.data
         if not data or not self.entity_description.value_fn:
             return None
         return self.entity_description.value_fn(data)
 
+    def _should_write(self) -> bool:
+        """Apply the deadband and publish interval on top of change detection."""
+        if not self._publish_filtered:
+            return super()._should_write()
+        value = self._live_value()
+        now = time.monotonic()
+        if (
+            self._published_at is not None
+            and self.available == self._written_available
+            and self.stale == self._written_stale
+        ):
+            if value == self._published_value:
+                return False
+            age = now - self._published_at
+            max_age = self.entity_description.max_publish_age
+            if not max_age or age < max_age:
+                min_interval = self.entity_description.min_publish_interval
+                if min_interval and age < min_interval:
+                    return False
+                deadband = self.entity_description.deadband
+                if (
+                    deadband
+                    and value is not None
+                    and self._published_value is not None
+                    and abs(value - self._published_value) < deadband
+                ):
+                    return False
+        self._published_value = value
+        self._published_at = now
+        return True
+
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         data = self.coordinator.data or {}
         if not self.entity_description.attrs_fn:
+            return super().extra_state_attributes
+        attributes = self.entity_description.attrs_fn(data, self._integration_flags)
+        if attributes is not None and self.stale:
+            attributes[ATTR_STALE] = True
+        return attributes
+
+
+class DimplexCascadeSensor(CoordinatorEntity[DimplexCascadeCoordinator], SensorEntity):
+    """Aggregate of the units of a cascade."""
+
+    entity_description: DimplexSensorEntityDescription
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: DimplexCascadeCoordinator,
+        description: DimplexSensorEntityDescription,
+    ) -> None:
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_translation_key = description.translation_key
+        self._attr_device_info = build_cascade_device_info(coordinator.cascade_name)
+        self._attr_unique_id = f"cascade_{coordinator.cascade_name}_{description.key}"
+
+    @property
+    def native_value(self):
+        data = self.coordinator.data
+        if not data or not self.entity_description.value_fn:
             return None
-        return self.entity_description.attrs_fn(data, self._integration_flags)
+        return self.entity_description.value_fn(data)
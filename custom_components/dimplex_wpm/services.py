@@ -0,0 +1,125 @@
+"""Services of the Dimplex WPM integration."""
+
+from __future__ import annotations
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    DEFAULT_SCAN_END,
+    DEFAULT_SCAN_MAX_REQUESTS,
+    DEFAULT_SCAN_START,
+    DOMAIN,
+    MAX_REGISTERS_PER_READ,
+    REGISTER_STRATEGY_HOLDING,
+    REGISTER_STRATEGY_INPUT,
+    SERVICE_SCAN_REGISTERS,
+)
+from .discovery import async_get_register_map, scan_registers
+from .exceptions import ModbusError
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_BANK = "bank"
+ATTR_START = "start"
+ATTR_END = "end"
+ATTR_BLOCK_SIZE = "block_size"
+ATTR_MAX_REQUESTS = "max_requests"
+
+BANK_BOTH = "both"
+
+
+def _valid_span(data: dict) -> dict:
+    if data[ATTR_START] > data[ATTR_END]:
+        raise vol.Invalid("start must not be after end")
+    return data
+
+
+SCAN_REGISTERS_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+            vol.Optional(ATTR_BANK, default=BANK_BOTH): vol.In(
+                [BANK_BOTH, REGISTER_STRATEGY_INPUT, REGISTER_STRATEGY_HOLDING]
+            ),
+            vol.Optional(ATTR_START, default=DEFAULT_SCAN_START): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=65535)
+            ),
+            vol.Optional(ATTR_END, default=DEFAULT_SCAN_END): vol.All(
+                vol.Coerce(int), vol.Range(min=0, max=65535)
+            ),
+            vol.Optional(ATTR_BLOCK_SIZE, default=MAX_REGISTERS_PER_READ): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=MAX_REGISTERS_PER_READ)
+            ),
+            vol.Optional(ATTR_MAX_REQUESTS, default=DEFAULT_SCAN_MAX_REQUESTS): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=100000)
+            ),
+        }
+    ),
+    _valid_span,
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_scan_registers(call: ServiceCall) -> ServiceResponse:
+        """Scan an address span and store the valid ranges per software version."""
+        entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+        data = hass.data.get(DOMAIN, {}).get(entry_id)
+        if data is None or "client" not in data:
+            raise ServiceValidationError(f"Config entry {entry_id} is not loaded")
+        banks = (
+            (REGISTER_STRATEGY_INPUT, REGISTER_STRATEGY_HOLDING)
+            if call.data[ATTR_BANK] == BANK_BOTH
+            else (call.data[ATTR_BANK],)
+        )
+        results = []
+        # A controller may lack a bank altogether, so a failed bank is
+        # reported next to the others instead of failing the whole scan.
+        errors: dict[str, str] = {}
+        for bank in banks:
+            try:
+                results.append(
+                    await scan_registers(
+                        data["client"],
+                        bank,
+                        call.data[ATTR_START],
+                        call.data[ATTR_END],
+                        block_size=call.data[ATTR_BLOCK_SIZE],
+                        max_requests=call.data[ATTR_MAX_REQUESTS],
+                    )
+                )
+            except (ModbusError, ConnectionError) as err:
+                if len(errors) + 1 == len(banks):
+                    raise HomeAssistantError(f"Register scan failed: {err}") from err
+                errors[bank] = str(err)
+
+        software_version = data["software_version"]
+        register_map = await async_get_register_map(hass)
+        register_map.update(software_version, results)
+        bank_maps = register_map.banks(software_version)
+        for entry_data in hass.data[DOMAIN].values():
+            if (
+                isinstance(entry_data, dict)
+                and "coordinator" in entry_data
+                and entry_data["software_version"] == software_version
+            ):
+                entry_data["coordinator"].apply_register_map(bank_maps)
+
+        return {
+            "software_version": software_version,
+            "banks": {
+                **{result.bank: result.as_dict() for result in results},
+                **{bank: {"error": error} for bank, error in errors.items()},
+            },
+        }
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SCAN_REGISTERS,
+        async_scan_registers,
+        schema=SCAN_REGISTERS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
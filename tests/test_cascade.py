@@ -0,0 +1,67 @@
+"""Tests of polling a cascade of units together."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+from tools._integration import load
+from tools.wpm_simulator import SimulatedWpm, WpmSimulator
+
+cascade = load("cascade")
+const = load("const")
+coordinator_module = load("coordinator")
+modbus_client = load("modbus_client")
+
+
+def _member(hass: HomeAssistant, simulator: WpmSimulator):
+    client = modbus_client.DimplexModbusClient(
+        simulator.host,
+        simulator.port,
+        const.DEFAULT_UNIT_ID,
+        2,
+        cache_ttl=0,
+        write_debounce=0,
+        write_min_interval=0,
+    )
+    coordinator = coordinator_module.DimplexDataUpdateCoordinator(
+        hass,
+        client,
+        register_strategy=const.REGISTER_STRATEGY_HOLDING,
+        host=simulator.host,
+        port=simulator.port,
+        unit_id=const.DEFAULT_UNIT_ID,
+        software_version=const.DEFAULT_SOFTWARE_VERSION,
+    )
+    return client, coordinator
+
+
+async def test_write_during_cascade_cycle_survives_the_slower_units(tmp_path: Path) -> None:
+    hass = HomeAssistant(str(tmp_path))
+    async with WpmSimulator(SimulatedWpm(latency=0.01)) as fast, WpmSimulator(
+        SimulatedWpm(latency=0.3)
+    ) as slow:
+        fast_client, fast_unit = _member(hass, fast)
+        slow_client, slow_unit = _member(hass, slow)
+        await fast_client.connect()
+        await slow_client.connect()
+        coordinator = cascade.DimplexCascadeCoordinator(hass, "test")
+        coordinator.add_member("fast", fast_unit)
+        coordinator.add_member("slow", slow_unit)
+
+        async def write_while_slow_unit_polls() -> None:
+            await asyncio.sleep(0.15)
+            await fast_unit.async_write_register(const.REG_SG_READY_MODE, 3)
+
+        try:
+            await asyncio.gather(coordinator.async_refresh(), write_while_slow_unit_polls())
+        finally:
+            await fast_client.close()
+            await slow_client.close()
+    await hass.async_stop(force=True)
+
+    assert coordinator.last_update_success
+    assert fast_unit.data["raw"][const.REG_SG_READY_MODE] == 3
+    assert coordinator.data["units"]["fast"]["raw"][const.REG_SG_READY_MODE] == 3
@@ -0,0 +1,111 @@
+"""Tests of the poll cycle of the coordinator against the simulator."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from tools._integration import load
+from tools.wpm_simulator import SimulatedWpm, WpmSimulator
+
+const = load("const")
+coordinator_module = load("coordinator")
+modbus_client = load("modbus_client")
+registers = load("registers")
+
+CATALOG_ADDRESSES = frozenset(registers.REGISTERS_BY_ADDRESS)
+
+
+@asynccontextmanager
+async def _coordinator(
+    config_dir: Path, device: SimulatedWpm, *, max_in_flight: int = 1, **kwargs: Any
+) -> AsyncIterator[tuple[WpmSimulator, Any]]:
+    """Yield a simulator and a connected coordinator polling it."""
+    hass = HomeAssistant(str(config_dir))
+    async with WpmSimulator(device) as simulator:
+        client = modbus_client.DimplexModbusClient(
+            simulator.host,
+            simulator.port,
+            const.DEFAULT_UNIT_ID,
+            2,
+            max_in_flight=max_in_flight,
+            cache_ttl=0,
+        )
+        coordinator = coordinator_module.DimplexDataUpdateCoordinator(
+            hass,
+            client,
+            register_strategy=const.REGISTER_STRATEGY_HOLDING,
+            host=simulator.host,
+            port=simulator.port,
+            unit_id=const.DEFAULT_UNIT_ID,
+            software_version=const.DEFAULT_SOFTWARE_VERSION,
+            **kwargs,
+        )
+        await client.connect()
+        try:
+            yield simulator, coordinator
+        finally:
+            await client.close()
+            await hass.async_stop(force=True)
+
+
+async def test_ranges_of_tiers_due_together_share_requests(tmp_path: Path) -> None:
+    async with _coordinator(tmp_path, SimulatedWpm()) as (simulator, coordinator):
+        plan = coordinator.read_plan
+        data = await coordinator.async_poll()
+
+    assert data["meta"]["tiers_read"]
+    assert simulator.stats.requests == len(coordinator._coalesce_ranges(plan)) < len(plan)
+    assert CATALOG_ADDRESSES <= set(data["raw"])
+
+
+async def test_rejected_address_is_isolated_from_its_range(tmp_path: Path) -> None:
+    device = SimulatedWpm(unsupported={const.REG_RETURN_TEMPERATURE})
+    async with _coordinator(tmp_path, device) as (simulator, coordinator):
+        data = await coordinator.async_poll()
+        plan_after_isolation = coordinator.read_plan
+        requests = simulator.stats.requests
+        coordinator.invalidate_registers(CATALOG_ADDRESSES)
+        again = await coordinator.async_poll()
+
+    assert data["meta"]["rejected_registers"] == [const.REG_RETURN_TEMPERATURE]
+    assert CATALOG_ADDRESSES - {const.REG_RETURN_TEMPERATURE} <= set(data["raw"])
+    assert const.REG_RETURN_TEMPERATURE not in data["raw"]
+    assert all(
+        not read_range.start <= const.REG_RETURN_TEMPERATURE <= read_range.end
+        for read_range in plan_after_isolation
+    )
+    # The next poll reads around the address without being rejected.
+    assert simulator.stats.requests - requests == len(
+        coordinator._coalesce_ranges(plan_after_isolation)
+    )
+    assert set(again["raw"]) == set(data["raw"])
+
+
+async def test_ranges_missing_the_deadline_are_carried_forward(tmp_path: Path) -> None:
+    # Serial requests of 0.1 s each: two of the four fit into the budget.
+    async with _coordinator(
+        tmp_path, SimulatedWpm(latency=0.1), cycle_budget=0.25
+    ) as (_simulator, coordinator):
+        data = await coordinator.async_poll()
+        late_tiers = {
+            register.tier
+            for register in registers.REGISTER_CATALOG
+            if register.address in coordinator.stale_registers
+        }
+        assert coordinator.poll_due()
+        coordinator._cycle_budget = 5
+        again = await coordinator.async_poll()
+
+    assert data["meta"]["overrun_cycles"] == 1
+    assert data["meta"]["stale_registers"]
+    assert set(data["meta"]["stale_registers"]).isdisjoint(data["raw"])
+    # Only the tiers with late ranges are read again, and nothing is stale.
+    assert set(again["meta"]["tiers_read"]) == late_tiers
+    assert again["meta"]["stale_registers"] == []
+    assert again["meta"]["overrun_cycles"] == 1
+    assert CATALOG_ADDRESSES <= set(again["raw"])
@@ -0,0 +1,186 @@
+"""Tests of the Modbus client against the simulator."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from tools._integration import load
+from tools.wpm_simulator import SimulatedWpm, WpmSimulator
+
+const = load("const")
+exceptions = load("exceptions")
+modbus_client = load("modbus_client")
+
+READ_KEY = (const.DEFAULT_UNIT_ID, 3)
+
+
+def _client(simulator: WpmSimulator, **kwargs) -> modbus_client.DimplexModbusClient:
+    kwargs.setdefault("cache_ttl", 0)
+    return modbus_client.DimplexModbusClient(
+        simulator.host, simulator.port, const.DEFAULT_UNIT_ID, 2, **kwargs
+    )
+
+
+async def test_read_joining_cancelled_shared_read_gets_its_own_request() -> None:
+    async with WpmSimulator(SimulatedWpm(latency=0.1)) as simulator:
+        client = _client(simulator, max_in_flight=1)
+        await client.connect()
+        try:
+            first = asyncio.create_task(client.read_holding_registers(1, 3))
+            await asyncio.sleep(0.02)
+            shared = client.connection._shared_reads[READ_KEY][0]
+            first.cancel()
+            await asyncio.sleep(0)
+            # The last waiter gave up: the request is being cancelled, but its
+            # done callback has not run yet.
+            assert shared.task.cancelling() or shared.task.cancelled()
+            second = await client.read_holding_registers(1, 3)
+        finally:
+            await client.close()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert second is not None and len(second) == 3
+    assert simulator.stats.requests == 2
+
+
+async def test_waiter_of_shared_read_cancelled_elsewhere_gets_timeout() -> None:
+    async with WpmSimulator(SimulatedWpm(latency=0.1)) as simulator:
+        client = _client(simulator, max_in_flight=1)
+        await client.connect()
+        try:
+            waiter = asyncio.create_task(client.read_holding_registers(1, 3))
+            await asyncio.sleep(0.02)
+            client.connection._shared_reads[READ_KEY][0].task.cancel()
+            with pytest.raises(exceptions.ModbusTimeoutError):
+                await waiter
+        finally:
+            await client.close()
+
+
+async def test_missed_deadline_leaves_shared_read_to_other_callers() -> None:
+    async with WpmSimulator(SimulatedWpm(latency=0.1)) as simulator:
+        client = _client(simulator, max_in_flight=1)
+        await client.connect()
+        try:
+            deadline = asyncio.get_running_loop().time() + 0.03
+            late, patient = await asyncio.gather(
+                client.read_ranges([(1, 3)], "holding", deadline=deadline),
+                client.read_ranges([(1, 3)], "holding"),
+            )
+        finally:
+            await client.close()
+    assert dict(late) == {}
+    assert list(patient) == [1, 2, 3]
+    assert simulator.stats.requests == 1
+
+
+def _breaker(key: str = "test", **kwargs) -> modbus_client.CircuitBreaker:
+    kwargs.setdefault("initial_backoff", 0.05)
+    return modbus_client.CircuitBreaker(key, jitter=0, **kwargs)
+
+
+async def test_breaker_opens_after_threshold_and_closes_after_probe() -> None:
+    async with WpmSimulator(SimulatedWpm()) as simulator:
+        port = simulator.port
+    client = modbus_client.DimplexModbusClient("127.0.0.1", port, const.DEFAULT_UNIT_ID, 1)
+    breaker = client.connection.breaker = _breaker(client.connection.key, threshold=2)
+    try:
+        for _ in range(2):
+            with pytest.raises((ConnectionError, exceptions.ModbusError)):
+                await client.read_holding_registers(1, 1)
+        assert breaker.state == const.CONNECTION_STATE_OPEN
+        # Rejected at once, without a connection attempt.
+        with pytest.raises(exceptions.ModbusCircuitOpen):
+            await client.read_holding_registers(1, 1)
+
+        async with WpmSimulator(SimulatedWpm(), port=port) as simulator:
+            await asyncio.sleep(0.06)
+            assert await client.read_holding_registers(1, 1) is not None
+            assert breaker.state == const.CONNECTION_STATE_CLOSED
+            assert breaker.failures == 0
+    finally:
+        await client.close()
+
+
+async def test_failed_probe_reopens_with_longer_backoff() -> None:
+    breaker = _breaker(threshold=1)
+    breaker.record_failure()
+    first_backoff = breaker.retry_in
+    await asyncio.sleep(0.06)
+    assert await breaker.before_request() is True
+    assert breaker.state == const.CONNECTION_STATE_HALF_OPEN
+    breaker.record_failure(probe=True)
+
+    assert breaker.state == const.CONNECTION_STATE_OPEN
+    assert breaker.retry_in > first_backoff
+
+
+async def test_only_the_probe_decides_a_half_open_breaker() -> None:
+    breaker = _breaker(threshold=1)
+    breaker.record_failure()
+    await asyncio.sleep(0.06)
+    probe = await breaker.before_request()
+    waiting = asyncio.create_task(breaker.before_request())
+    await asyncio.sleep(0)
+    # A request that was in flight before the breaker opened fails late.
+    breaker.record_failure()
+    await asyncio.sleep(0)
+
+    assert breaker.state == const.CONNECTION_STATE_HALF_OPEN
+    assert not waiting.done()
+    breaker.record_success(probe)
+    assert breaker.state == const.CONNECTION_STATE_CLOSED
+    assert await waiting is False
+
+
+async def test_write_to_idle_register_is_sent_at_once() -> None:
+    async with WpmSimulator(SimulatedWpm()) as simulator:
+        client = _client(simulator, write_debounce=1, write_min_interval=1)
+        await client.connect()
+        try:
+            written = await asyncio.wait_for(
+                client.write_register(const.REG_SG_READY_MODE, 2), 0.5
+            )
+        finally:
+            await client.close()
+    assert written == 2
+    assert simulator.device.value(const.REG_SG_READY_MODE) == 2
+
+
+async def test_burst_of_writes_is_merged_into_the_latest_value() -> None:
+    async with WpmSimulator(SimulatedWpm()) as simulator:
+        client = _client(simulator, write_debounce=0.2, write_min_interval=0)
+        await client.connect()
+        loop = asyncio.get_running_loop()
+        try:
+            # Writes queued before the first one goes out share it.
+            first = await asyncio.gather(
+                *(client.write_register(const.REG_SG_READY_MODE, value) for value in (1, 2))
+            )
+            # Writes within the debounce window after it wait for one write.
+            started = loop.time()
+            second = await asyncio.gather(
+                *(client.write_register(const.REG_SG_READY_MODE, value) for value in (3, 4))
+            )
+            waited = loop.time() - started
+        finally:
+            await client.close()
+    assert first == [2, 2]
+    assert second == [4, 4]
+    assert waited >= 0.15
+    assert simulator.stats.requests_by_function == {6: 2}
+    assert simulator.device.value(const.REG_SG_READY_MODE) == 4
+
+
+async def test_pending_write_fails_when_client_closes_before_sending() -> None:
+    async with WpmSimulator(SimulatedWpm()) as simulator:
+        client = _client(simulator)
+        await client.connect()
+        write = asyncio.create_task(client.write_register(const.REG_SG_READY_MODE, 2))
+        await asyncio.sleep(0)
+        await client.close()
+        with pytest.raises(exceptions.ModbusError):
+            await asyncio.wait_for(write, 1)
+    assert simulator.stats.requests_by_function.get(6) is None
@@ -0,0 +1,73 @@
+"""Tests of the register catalog and read planner."""
+
+from __future__ import annotations
+
+from tools._integration import load
+from tools.wpm_simulator import SimulatedWpm, WpmSimulator
+
+const = load("const")
+registers = load("registers")
+modbus_client = load("modbus_client")
+
+ReadRange = registers.ReadRange
+
+
+def _registers(*addresses: int, bank: str = "holding") -> list:
+    return [
+        registers.DimplexRegister(f"register_{address}", address, bank=bank)
+        for address in addresses
+    ]
+
+
+def test_plan_merges_across_small_gaps_only() -> None:
+    plan = registers.plan_reads(_registers(1, 2, 5, 20), max_gap=2)
+
+    assert plan == [ReadRange("holding", 1, 5), ReadRange("holding", 20, 1)]
+
+
+def test_plan_never_exceeds_max_count() -> None:
+    plan = registers.plan_reads(_registers(*range(1, 11)), max_count=4)
+
+    assert plan == [
+        ReadRange("holding", 1, 4),
+        ReadRange("holding", 5, 4),
+        ReadRange("holding", 9, 2),
+    ]
+
+
+def test_plan_skips_and_never_spans_bad_addresses() -> None:
+    plan = registers.plan_reads(_registers(1, 2, 3, 5), bad_addresses={2, 4})
+
+    assert plan == [
+        ReadRange("holding", 1, 1),
+        ReadRange("holding", 3, 1),
+        ReadRange("holding", 5, 1),
+    ]
+
+
+def test_plan_keeps_banks_apart() -> None:
+    plan = registers.plan_reads(_registers(1, 2) + _registers(3, bank="input"))
+
+    assert sorted(plan, key=lambda read_range: read_range.bank) == [
+        ReadRange("holding", 1, 2),
+        ReadRange("input", 3, 1),
+    ]
+
+
+async def test_planned_catalog_reads_every_register() -> None:
+    plan = registers.plan_reads(registers.REGISTER_CATALOG)
+    async with WpmSimulator(SimulatedWpm()) as simulator:
+        client = modbus_client.DimplexModbusClient(
+            simulator.host, simulator.port, const.DEFAULT_UNIT_ID, 2, cache_ttl=0
+        )
+        await client.connect()
+        try:
+            values = await client.read_ranges(
+                [(read_range.start, read_range.count) for read_range in plan],
+                const.REGISTER_STRATEGY_HOLDING,
+            )
+        finally:
+            await client.close()
+
+    assert simulator.stats.requests == len(plan) < len(registers.REGISTER_CATALOG)
+    assert {register.address for register in registers.REGISTER_CATALOG} <= set(values)
@@ -0,0 +1,92 @@
+"""Tests of the binary sample log."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from homeassistant.core import HomeAssistant
+
+from tools._integration import load
+from tools.wpm_simulator import SimulatedWpm, WpmSimulator
+
+const = load("const")
+modbus_client = load("modbus_client")
+registers = load("registers")
+sample_log = load("sample_log")
+
+PLAN = [
+    (read_range.start, read_range.count)
+    for read_range in registers.plan_reads(registers.REGISTER_CATALOG)
+]
+
+
+async def _read_snapshots(writes: list[int | None]) -> list:
+    """Read the catalog from the simulator once per entry, writing SG Ready first."""
+    snapshots = []
+    async with WpmSimulator(SimulatedWpm()) as simulator:
+        client = modbus_client.DimplexModbusClient(
+            simulator.host,
+            simulator.port,
+            const.DEFAULT_UNIT_ID,
+            2,
+            cache_ttl=0,
+            write_debounce=0,
+            write_min_interval=0,
+        )
+        await client.connect()
+        try:
+            for value in writes:
+                if value is not None:
+                    await client.write_register(const.REG_SG_READY_MODE, value)
+                snapshots.append(
+                    await client.read_ranges(PLAN, const.REGISTER_STRATEGY_HOLDING)
+                )
+        finally:
+            await client.close()
+    return snapshots
+
+
+async def test_records_read_back_as_the_logged_snapshots(tmp_path: Path) -> None:
+    first, second, third = await _read_snapshots([1, 3, None])
+    # A block dropping out of the snapshot, e.g. rejected by the device.
+    third = registers.RegisterSnapshot(
+        {
+            start: block
+            for start, block in third.blocks.items()
+            if start != const.REG_SG_READY_MODE
+        }
+    )
+    hass = HomeAssistant(str(tmp_path))
+    logger = sample_log.SampleLogger(hass, tmp_path / "samples.bin", max_bytes=1 << 20)
+    await logger.async_start()
+    for snapshot in (first, second, third):
+        logger.record(snapshot)
+    await logger.async_close()
+    await hass.async_stop(force=True)
+
+    samples = list(sample_log.iter_samples(sample_log.log_files(logger.path)))
+
+    assert [sample.keyframe for sample in samples] == [True, False, True]
+    assert samples[1].changes[const.REG_SG_READY_MODE] == 3
+    assert [sample.values for sample in samples] == [dict(first), dict(second), dict(third)]
+
+
+async def test_rotated_files_start_with_a_keyframe(tmp_path: Path) -> None:
+    snapshots = await _read_snapshots([value % 4 for value in range(12)])
+    hass = HomeAssistant(str(tmp_path))
+    logger = sample_log.SampleLogger(
+        hass, tmp_path / "samples.bin", max_bytes=100, backups=20
+    )
+    await logger.async_start()
+    for snapshot in snapshots:
+        logger.record(snapshot)
+    await logger.async_close()
+    await hass.async_stop(force=True)
+
+    files = sample_log.log_files(logger.path)
+    assert len(files) > 1
+    for path in files:
+        assert next(sample_log.iter_samples([path])).keyframe
+    samples = list(sample_log.iter_samples(files))
+    assert len(samples) == len(snapshots)
+    assert samples[-1].values == dict(snapshots[-1])
@@ -0,0 +1 @@
+"""Development tools for the Dimplex WPM integration (simulator, benchmarks)."""
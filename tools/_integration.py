@@ -0,0 +1,25 @@
+"""Import the integration's plain-Python modules without Home Assistant."""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from pathlib import Path
+from types import ModuleType
+
+INTEGRATION_DIR = Path(__file__).resolve().parents[1] / "custom_components" / "dimplex_wpm"
+PACKAGE = "dimplex_wpm"
+
+
+def load(module: str) -> ModuleType:
+    """Return a module of the integration package, e.g. ``load("const")``.
+
+    The package ``__init__`` imports Home Assistant, so a bare package is
+    registered in its place and only the requested module (plus whatever it
+    imports relatively) is executed.
+    """
+    if PACKAGE not in sys.modules:
+        package = ModuleType(PACKAGE)
+        package.__path__ = [str(INTEGRATION_DIR)]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.{module}")
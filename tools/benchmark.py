@@ -0,0 +1,566 @@
+"""Benchmark the poll cycle and entity update path against the simulator.
+
+Starts ``tools.wpm_simulator`` in a subprocess and measures:
+
+* ``DimplexModbusClient.read_ranges`` latency and throughput, one request
+  per register vs. the planned ranges, serial vs. pipelined;
+* the full ``DimplexDataUpdateCoordinator._async_update_data`` cycle for the
+  ``auto``, ``holding`` and ``input`` register strategies, including
+  tracemalloc peak and retained memory per cycle;
+* fanning a coordinator update out to the ``DimplexSensor`` entities, with
+  every source changed and with nothing changed;
+* the import cost of the integration as Home Assistant loads it, measured
+  with ``python -X importtime`` in fresh interpreters.
+
+Reads and cycles run with the read cache off, so every iteration reaches
+the simulator. Rows marked ``cached`` repeat the pipelined case with the
+default cache TTL, where back to back iterations are mostly cache hits.
+
+Results are written as JSON so they can be compared across releases::
+
+    python -m tools.benchmark --iterations 200 --latency 0.002 --output bench.json
+
+``--import-only --max-import-ms 40`` runs just the import measurement and
+exits non-zero if the integration got slower to load or pulls in pymodbus.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from ._integration import INTEGRATION_DIR, load
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+const = load("const")
+registers = load("registers")
+modbus_client = load("modbus_client")
+
+STRATEGIES = (
+    const.REGISTER_STRATEGY_AUTO,
+    const.REGISTER_STRATEGY_HOLDING,
+    const.REGISTER_STRATEGY_INPUT,
+)
+
+
+def _summary(samples: list[float]) -> dict[str, float]:
+    """Return latency statistics in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+async def _timed(
+    func: Callable[[], Awaitable[Any]], iterations: int, warmup: int
+) -> list[float]:
+    for _ in range(warmup):
+        await func()
+    samples: list[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class SimulatorProcess:
+    """Run the WPM simulator in a subprocess so it does not skew timings."""
+
+    def __init__(self, latency: float) -> None:
+        self.port = _free_port()
+        self._latency = latency
+        self._process: asyncio.subprocess.Process | None = None
+
+    async def __aenter__(self) -> SimulatorProcess:
+        self._process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "tools.wpm_simulator",
+            "--port",
+            str(self.port),
+            "--latency",
+            str(self._latency),
+            cwd=REPO_ROOT,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for _ in range(100):
+            try:
+                _reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+            except OSError:
+                await asyncio.sleep(0.05)
+                continue
+            writer.close()
+            return self
+        self._process.kill()
+        await self._process.wait()
+        raise RuntimeError("Simulator did not start")
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        assert self._process is not None
+        self._process.terminate()
+        await self._process.wait()
+
+
+async def bench_read_ranges(
+    port: int, iterations: int, warmup: int, max_in_flight: int
+) -> list[dict[str, Any]]:
+    """Compare one read per register with the planned ranges."""
+    per_register = [(register.address, register.width) for register in registers.REGISTER_CATALOG]
+    planned = [
+        (read_range.start, read_range.count)
+        for read_range in registers.plan_reads(registers.REGISTER_CATALOG)
+    ]
+    cases = (
+        ("per_register", per_register, 1, False),
+        ("planned", planned, 1, False),
+        ("planned", planned, max_in_flight, False),
+        ("planned_cached", planned, max_in_flight, True),
+    )
+    results: list[dict[str, Any]] = []
+    for name, ranges, in_flight, cached in cases:
+        client = modbus_client.DimplexModbusClient(
+            "127.0.0.1",
+            port,
+            const.DEFAULT_UNIT_ID,
+            5,
+            max_in_flight=in_flight,
+            cache_ttl=const.READ_CACHE_TTL if cached else 0,
+        )
+        await client.connect()
+        try:
+            samples = await _timed(
+                lambda: client.read_ranges(ranges, const.REGISTER_STRATEGY_HOLDING),
+                iterations,
+                warmup,
+            )
+        finally:
+            await client.close()
+        elapsed = sum(samples)
+        results.append(
+            {
+                "case": name,
+                "max_in_flight": in_flight,
+                "cached": cached,
+                "requests_per_call": len(ranges),
+                "registers_per_call": sum(count for _start, count in ranges),
+                **_summary(samples),
+                "requests_per_s": round(len(ranges) * iterations / elapsed, 1),
+                "registers_per_s": round(
+                    sum(count for _start, count in ranges) * iterations / elapsed, 1
+                ),
+            }
+        )
+    return results
+
+
+async def _make_hass() -> Any:
+    from homeassistant.core import HomeAssistant
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+    hass.config.skip_pip = True
+    return hass
+
+
+def _make_coordinator(
+    hass: Any, port: int, strategy: str, max_in_flight: int, cache_ttl: float = 0
+) -> Any:
+    coordinator_module = load("coordinator")
+    client = modbus_client.DimplexModbusClient(
+        "127.0.0.1",
+        port,
+        const.DEFAULT_UNIT_ID,
+        5,
+        max_in_flight=max_in_flight,
+        cache_ttl=cache_ttl,
+    )
+    return coordinator_module.DimplexDataUpdateCoordinator(
+        hass,
+        client,
+        register_strategy=strategy,
+        host="127.0.0.1",
+        port=port,
+        unit_id=const.DEFAULT_UNIT_ID,
+        software_version=const.DEFAULT_SOFTWARE_VERSION,
+    )
+
+
+async def bench_coordinator(
+    hass: Any, port: int, iterations: int, warmup: int, max_in_flight: int
+) -> list[dict[str, Any]]:
+    """Time a full update cycle (every tier due) per register strategy.
+
+    Cycles read from the device; the last case per strategy keeps the read
+    cache on to show how much of a back to back cycle it answers.
+    """
+    all_registers = list(registers.REGISTERS_BY_ADDRESS)
+    cases = [(in_flight, False) for in_flight in sorted({1, max_in_flight})]
+    cases.append((max_in_flight, True))
+    results: list[dict[str, Any]] = []
+    for strategy in STRATEGIES:
+        for in_flight, cached in cases:
+            coordinator = _make_coordinator(
+                hass,
+                port,
+                strategy,
+                in_flight,
+                const.READ_CACHE_TTL if cached else 0,
+            )
+            await coordinator._client.connect()
+
+            async def cycle() -> dict[str, Any]:
+                coordinator.invalidate_registers(all_registers)
+                data = await coordinator._async_update_data()
+                coordinator.data = data
+                return data
+
+            try:
+                samples = await _timed(cycle, iterations, warmup)
+                memory = await _measure_allocations(cycle, iterations)
+            finally:
+                await coordinator._client.close()
+            results.append(
+                {
+                    "strategy": strategy,
+                    "max_in_flight": in_flight,
+                    "cached": cached,
+                    "requests_per_cycle": len(coordinator.read_plan),
+                    **_summary(samples),
+                    **memory,
+                }
+            )
+    return results
+
+
+async def _measure_allocations(
+    cycle: Callable[[], Awaitable[Any]], iterations: int
+) -> dict[str, Any]:
+    """Return the tracemalloc peak and retained memory of the update cycle.
+
+    The peak covers the whole process, including pymodbus. Retained memory
+    only counts allocations made from the integration's own files.
+    """
+    integration_files = (tracemalloc.Filter(True, str(INTEGRATION_DIR / "*")),)
+    tracemalloc.start()
+    try:
+        await cycle()
+        before = tracemalloc.take_snapshot().filter_traces(integration_files)
+        peaks: list[int] = []
+        for _ in range(iterations):
+            current, _peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            await cycle()
+            peaks.append(tracemalloc.get_traced_memory()[1] - current)
+        after = tracemalloc.take_snapshot().filter_traces(integration_files)
+    finally:
+        tracemalloc.stop()
+    retained = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return {
+        "alloc_peak_bytes_per_cycle": int(statistics.fmean(peaks)),
+        "retained_bytes_per_cycle": round(retained / iterations, 1),
+    }
+
+
+def _make_config_entry() -> Any:
+    from homeassistant.config_entries import ConfigEntry
+
+    return ConfigEntry(
+        version=1,
+        minor_version=1,
+        domain=const.DOMAIN,
+        title="Dimplex WPM benchmark",
+        data={},
+        options={},
+        source="user",
+    )
+
+
+def _make_entity_platform(hass: Any) -> Any:
+    """Return a sensor platform for entities written without the registry."""
+    import logging
+    from datetime import timedelta
+
+    from homeassistant.helpers.entity_platform import EntityPlatform
+
+    return EntityPlatform(
+        hass=hass,
+        logger=logging.getLogger(__name__),
+        domain="sensor",
+        platform_name=const.DOMAIN,
+        platform=None,
+        scan_interval=timedelta(seconds=const.DEFAULT_SCAN_INTERVAL),
+        entity_namespace=None,
+    )
+
+
+async def bench_fanout(
+    hass: Any, port: int, iterations: int, warmup: int
+) -> list[dict[str, Any]]:
+    """Time async_update_listeners over the sensor entities."""
+    sensor = load("sensor")
+    coordinator = _make_coordinator(hass, port, const.REGISTER_STRATEGY_HOLDING, 1)
+    await coordinator._client.connect()
+    try:
+        coordinator.invalidate_registers(registers.REGISTERS_BY_ADDRESS)
+        coordinator.data = await coordinator._async_update_data()
+    finally:
+        await coordinator._client.close()
+
+    entry = _make_config_entry()
+    platform = _make_entity_platform(hass)
+    entities = []
+    for index, description in enumerate(sensor.SENSOR_DESCRIPTIONS):
+        entity = sensor.DimplexSensor(coordinator, entry, description, {})
+        entity.hass = hass
+        entity.platform = platform
+        entity.entity_id = f"sensor.dimplex_benchmark_{index}"
+        coordinator.async_add_listener(entity._handle_coordinator_update)
+        entities.append(entity)
+
+    all_registers = frozenset(coordinator.data["raw"])
+    all_keys = frozenset(coordinator.data["derived"])
+    results: list[dict[str, Any]] = []
+    for case, changed_registers, changed_keys in (
+        ("all_changed", all_registers, all_keys),
+        ("nothing_changed", frozenset(), frozenset()),
+    ):
+        coordinator.changed_registers = changed_registers
+        coordinator.changed_keys = changed_keys
+
+        async def fan_out() -> None:
+            coordinator.async_update_listeners()
+
+        writes_before = dict(coordinator.entity_writes)
+        samples = await _timed(fan_out, iterations, warmup)
+        calls = iterations + warmup
+        results.append(
+            {
+                "case": case,
+                "entities": len(entities),
+                **_summary(samples),
+                "per_entity_us": round(
+                    statistics.fmean(samples) / len(entities) * 1_000_000, 3
+                ),
+                "writes_per_update": round(
+                    (coordinator.entity_writes["written"] - writes_before["written"])
+                    / calls,
+                    2,
+                ),
+            }
+        )
+    return results
+
+
+# Modules Home Assistant has already imported when it loads an integration.
+_IMPORT_PRELOAD = (
+    "homeassistant.config_entries",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.helpers.storage",
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.components.sensor",
+    "homeassistant.components.binary_sensor",
+    "homeassistant.components.select",
+    "voluptuous",
+)
+# What is imported to set up an entry and show the config flow form.
+_IMPORT_TARGETS = (
+    "custom_components.dimplex_wpm",
+    "custom_components.dimplex_wpm.config_flow",
+    "custom_components.dimplex_wpm.sensor",
+    "custom_components.dimplex_wpm.binary_sensor",
+    "custom_components.dimplex_wpm.select",
+)
+_IMPORT_MARKER = "dimplex-import-start"
+
+
+def _import_once() -> tuple[float, list[tuple[str, int, int]]]:
+    """Import the integration in a fresh interpreter and parse -X importtime.
+
+    Returns the summed self time in milliseconds of every module imported
+    after the preload, and those modules as (name, self_us, cumulative_us).
+    """
+    code = "; ".join(
+        (
+            *(f"import {module}" for module in _IMPORT_PRELOAD),
+            f"import sys; print({_IMPORT_MARKER!r}, file=sys.stderr, flush=True)",
+            *(f"import {module}" for module in _IMPORT_TARGETS),
+        )
+    )
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    modules: list[tuple[str, int, int]] = []
+    for line in stderr.split(_IMPORT_MARKER, 1)[1].splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():
+            modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return sum(self_us for _name, self_us, _cumulative in modules) / 1000, modules
+
+
+def bench_import(runs: int) -> dict[str, Any]:
+    """Measure the integration's import cost, keeping the fastest run."""
+    samples = [_import_once() for _ in range(runs)]
+    total_ms, modules = min(samples, key=lambda sample: sample[0])
+    return {
+        "runs": runs,
+        "total_ms": round(total_ms, 2),
+        "median_ms": round(statistics.median(sample[0] for sample in samples), 2),
+        "modules": len(modules),
+        "pymodbus_loaded": any(name.startswith("pymodbus") for name, _s, _c in modules),
+        "slowest": [
+            {"module": name, "self_ms": round(self_us / 1000, 2)}
+            for name, self_us, _cumulative in sorted(
+                modules, key=lambda module: module[1], reverse=True
+            )[:10]
+        ],
+    }
+
+
+def _versions() -> dict[str, str | None]:
+    versions: dict[str, str | None] = {"python": platform.python_version()}
+    for package in ("pymodbus", "homeassistant"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    try:
+        versions["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        versions["commit"] = None
+    return versions
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run every benchmark and return the JSON document."""
+    results: dict[str, Any] = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "platform": platform.platform(),
+            **_versions(),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "latency": args.latency,
+            "max_in_flight": args.max_in_flight,
+        }
+    }
+    results["import_time"] = bench_import(args.import_runs)
+    if args.import_only:
+        return results
+    async with SimulatorProcess(args.latency) as simulator:
+        results["read_ranges"] = await bench_read_ranges(
+            simulator.port, args.iterations, args.warmup, args.max_in_flight
+        )
+        hass = await _make_hass()
+        try:
+            results["coordinator_cycle"] = await bench_coordinator(
+                hass, simulator.port, args.iterations, args.warmup, args.max_in_flight
+            )
+            results["entity_fanout"] = await bench_fanout(
+                hass, simulator.port, args.iterations, args.warmup
+            )
+        finally:
+            await hass.async_stop(force=True)
+    return results
+
+
+def _print_table(results: dict[str, Any]) -> None:
+    import_time = results["import_time"]
+    print(
+        f"\nimport_time  total_ms={import_time['total_ms']}"
+        f"  modules={import_time['modules']}"
+        f"  pymodbus_loaded={import_time['pymodbus_loaded']}",
+        file=sys.stderr,
+    )
+    for section in ("read_ranges", "coordinator_cycle", "entity_fanout"):
+        if section not in results:
+            continue
+        print(f"\n{section}", file=sys.stderr)
+        for row in results[section]:
+            print("  " + "  ".join(f"{key}={value}" for key, value in row.items()), file=sys.stderr)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmarks and write the JSON results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument(
+        "--latency", type=float, default=0.002, help="simulated device delay in seconds"
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=4,
+        help="pipelining depth compared against serial reads",
+    )
+    parser.add_argument("--output", type=Path, help="write JSON here instead of stdout")
+    parser.add_argument("--import-runs", type=int, default=5)
+    parser.add_argument(
+        "--import-only", action="store_true", help="only measure the import cost"
+    )
+    parser.add_argument(
+        "--max-import-ms",
+        type=float,
+        help="fail if importing the integration takes longer or loads pymodbus",
+    )
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    _print_table(results)
+    document = json.dumps(results, indent=2)
+    if args.output is None:
+        print(document)
+    else:
+        args.output.write_text(document + "\n", encoding="utf-8")
+
+    import_time = results["import_time"]
+    if args.max_import_ms is not None and (
+        import_time["total_ms"] > args.max_import_ms or import_time["pymodbus_loaded"]
+    ):
+        sys.exit(
+            f"Integration import took {import_time['total_ms']} ms "
+            f"(limit {args.max_import_ms} ms), pymodbus loaded: "
+            f"{import_time['pymodbus_loaded']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
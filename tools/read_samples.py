@@ -0,0 +1,131 @@
+"""Stream a raw register sample log back as records or CSV.
+
+The integration writes the log to ``<config>/dimplex_wpm/samples_<entry>.bin``
+when the sample log option is on. Rotated files (``.1``, ``.2``, ...) are
+read oldest first::
+
+    python -m tools.read_samples /config/dimplex_wpm/samples_abc.bin
+    python -m tools.read_samples samples_abc.bin --csv --output samples.csv
+
+Records are printed as one JSON object per line with the changed registers.
+CSV has a column per register, holding the full state after every record;
+``--scaled`` names the catalog registers and decodes them, e.g. tenths of a
+degree to °C.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import json
+import sys
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TextIO
+
+from tools._integration import load
+
+sample_log = load("sample_log")
+registers = load("registers")
+
+
+def _files(path: Path, rotated: bool) -> list[Path]:
+    if not rotated:
+        return [path]
+    files = sample_log.log_files(path)
+    if not files:
+        raise SystemExit(f"{path}: no such sample log")
+    return files
+
+
+def _timestamp(value: float) -> str:
+    return datetime.fromtimestamp(value, timezone.utc).isoformat()
+
+
+def write_records(files: Iterable[Path], output: TextIO) -> None:
+    """Write one JSON line per record."""
+    for sample in sample_log.iter_samples(files):
+        output.write(
+            json.dumps(
+                {
+                    "timestamp": _timestamp(sample.timestamp),
+                    "keyframe": sample.keyframe,
+                    "changes": sample.changes,
+                }
+            )
+            + "\n"
+        )
+
+
+def write_csv(files: list[Path], output: TextIO, scaled: bool) -> None:
+    """Write the register state after every record, one column per register.
+
+    The files are read twice: once for the set of registers, once for rows.
+    Scaled output has a column per catalog register, decoded like the
+    integration does; other addresses stay raw.
+    """
+    addresses = sorted(
+        {address for sample in sample_log.iter_samples(files) for address in sample.changes}
+    )
+    columns: list[tuple[str, registers.DimplexRegister | int]] = []
+    if scaled:
+        catalog = [
+            register
+            for register in registers.REGISTER_CATALOG
+            if register.address in addresses
+        ]
+        covered = {
+            register.address + offset
+            for register in catalog
+            for offset in range(register.width)
+        }
+        columns += [(register.key, register) for register in catalog]
+        addresses = [address for address in addresses if address not in covered]
+    columns += [(str(address), address) for address in addresses]
+
+    writer = csv.writer(output)
+    writer.writerow(["timestamp", *(name for name, _ in columns)])
+    for sample in sample_log.iter_samples(files):
+        row: list[object] = [_timestamp(sample.timestamp)]
+        for _, source in columns:
+            if isinstance(source, int):
+                value = sample.values.get(source)
+            else:
+                value = registers.decode_register(source, sample.values)
+            row.append("" if value is None else value)
+        writer.writerow(row)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path, help="Sample log file")
+    parser.add_argument("--csv", action="store_true", help="Write CSV instead of JSON lines")
+    parser.add_argument(
+        "--scaled", action="store_true", help="Decode catalog registers in CSV output"
+    )
+    parser.add_argument(
+        "--no-rotated",
+        dest="rotated",
+        action="store_false",
+        help="Read only the given file, not its rotated predecessors",
+    )
+    parser.add_argument("--output", type=Path, help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    files = _files(args.path, args.rotated)
+    with contextlib.ExitStack() as stack:
+        output = (
+            stack.enter_context(args.output.open("w", newline=""))
+            if args.output
+            else sys.stdout
+        )
+        if args.csv:
+            write_csv(files, output, args.scaled)
+        else:
+            write_records(files, output)
+
+
+if __name__ == "__main__":
+    main()
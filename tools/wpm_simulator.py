@@ -0,0 +1,453 @@
+"""Offline Modbus TCP simulator of a Dimplex WPM controller.
+
+The simulator serves the registers the integration knows about: the
+temperatures, the status/lock/fault/sensor error codes at 103-106 for the
+chosen software version, and SG Ready at 5167. Values follow scriptable
+trajectories. Latency, unsupported register banks or addresses, and a
+connection limit can be injected. Everything runs on localhost, so the
+client and coordinator can be exercised without a heat pump.
+
+Run it from the repository root::
+
+    python -m tools.wpm_simulator --port 5020 --software-version L
+
+and point the integration at ``127.0.0.1:5020``. A scenario file overrides
+the default trajectories::
+
+    {
+      "registers": {
+        "1": {"points": [[0, -10.0], [600, 5.0], [1200, -10.0]]},
+        "103": {"points": [[0, 2], [30, 5]], "repeat": false},
+        "105": 0
+      }
+    }
+
+Temperatures are given in degrees Celsius. The scale comes from the
+integration's register catalog. Codes switch in steps, numeric values are
+interpolated linearly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import random
+import socket
+import time
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from pymodbus.datastore import ModbusServerContext
+from pymodbus.datastore.context import ModbusBaseSlaveContext
+from pymodbus.server import ModbusTcpServer
+
+from ._integration import load
+
+const = load("const")
+registers = load("registers")
+
+LOGGER = logging.getLogger(__name__)
+
+BANK_HOLDING = const.REGISTER_STRATEGY_HOLDING
+BANK_INPUT = const.REGISTER_STRATEGY_INPUT
+
+_BANK_BY_FUNCTION = {3: BANK_HOLDING, 6: BANK_HOLDING, 16: BANK_HOLDING, 4: BANK_INPUT}
+_WRITE_FUNCTIONS = {6, 16}
+
+# Seconds each status code is held while the default scenario cycles them.
+DEFAULT_STATUS_PERIOD = 60.0
+
+
+@dataclass
+class Trajectory:
+    """Value of one register over time, in engineering units."""
+
+    points: list[tuple[float, float]]
+    scale: float = 1.0
+    # Hold each point until the next one instead of interpolating.
+    step: bool = False
+    # Start over once the last point is reached.
+    repeat: bool = True
+
+    @classmethod
+    def constant(cls, value: float, scale: float = 1.0) -> Trajectory:
+        """Return a trajectory that always has the same value."""
+        return cls([(0.0, value)], scale)
+
+    @classmethod
+    def from_config(cls, config: Any, *, scale: float = 1.0, step: bool = False) -> Trajectory:
+        """Build a trajectory from a scenario entry (a number or a dict)."""
+        if isinstance(config, (int, float)):
+            return cls.constant(config, scale)
+        return cls(
+            points=sorted((float(at), float(value)) for at, value in config["points"]),
+            scale=config.get("scale", scale),
+            step=config.get("step", step),
+            repeat=config.get("repeat", True),
+        )
+
+    def value(self, elapsed: float) -> float:
+        """Return the value in engineering units after ``elapsed`` seconds."""
+        points = self.points
+        period = points[-1][0]
+        if self.repeat and period > 0:
+            elapsed %= period
+        if elapsed <= points[0][0]:
+            return points[0][1]
+        for (at, value), (next_at, next_value) in zip(points, points[1:]):
+            if elapsed < next_at:
+                if self.step:
+                    return value
+                return value + (next_value - value) * (elapsed - at) / (next_at - at)
+        return points[-1][1]
+
+    def raw(self, elapsed: float) -> int:
+        """Return the 16-bit register word after ``elapsed`` seconds."""
+        return round(self.value(elapsed) / self.scale) & 0xFFFF
+
+
+def default_trajectories(
+    software_version: str = const.DEFAULT_SOFTWARE_VERSION,
+    *,
+    status_period: float = DEFAULT_STATUS_PERIOD,
+) -> dict[int, Trajectory]:
+    """Return a plausible heating day for the given software version.
+
+    Temperatures drift slowly, the status code steps through every code the
+    version's status map knows, and lock, fault and sensor error stay at 0.
+    """
+    status_codes = sorted(const.STATUS_MAP_BY_VERSION[software_version])
+    status_points = [
+        (index * status_period, code) for index, code in enumerate(status_codes)
+    ]
+    status_points.append((len(status_codes) * status_period, status_codes[0]))
+    return {
+        const.REG_OUTDOOR_TEMPERATURE: Trajectory(
+            [(0, -5.0), (1800, 5.0), (3600, -5.0)], 0.1
+        ),
+        const.REG_RETURN_TEMPERATURE: Trajectory([(0, 30.0), (450, 35.0), (900, 30.0)], 0.1),
+        const.REG_DHW_TEMPERATURE: Trajectory([(0, 48.0), (1800, 45.0), (3600, 48.0)], 0.1),
+        const.REG_FLOW_TEMPERATURE: Trajectory([(0, 33.0), (450, 38.0), (900, 33.0)], 0.1),
+        const.REG_RETURN_SETPOINT_TEMPERATURE: Trajectory.constant(30.0, 0.1),
+        const.REG_STATUS_CODE: Trajectory(status_points, step=True),
+        const.REG_LOCK_CODE: Trajectory.constant(0),
+        const.REG_FAULT_CODE: Trajectory.constant(0),
+        const.REG_SENSOR_ERROR_CODE: Trajectory.constant(0),
+        const.REG_SG_READY_MODE: Trajectory.constant(11),
+    }
+
+
+def load_scenario(
+    path: str | Path, base: Mapping[int, Trajectory] | None = None
+) -> dict[int, Trajectory]:
+    """Return the trajectories of a JSON scenario file layered over ``base``."""
+    scenario = json.loads(Path(path).read_text(encoding="utf-8"))
+    trajectories = dict(base or {})
+    for address, config in scenario.get("registers", {}).items():
+        register = registers.REGISTERS_BY_ADDRESS.get(int(address))
+        trajectories[int(address)] = Trajectory.from_config(
+            config,
+            scale=register.scale if register else 1.0,
+            step=register is None or register.data_type == const.DATA_TYPE_ENUM,
+        )
+    return trajectories
+
+
+class SimulatedWpm(ModbusBaseSlaveContext):
+    """pymodbus datastore computing register values from trajectories.
+
+    Addresses without a trajectory read as 0, like the unused registers
+    inside a WPM block. Requests that touch a disabled bank or an address
+    in ``unsupported`` are answered with exception 0x02 (illegal data
+    address). Only ``writable`` registers accept writes; a written value
+    replaces the trajectory until :meth:`reset`.
+    """
+
+    def __init__(
+        self,
+        trajectories: Mapping[int, Trajectory] | None = None,
+        *,
+        banks: Iterable[str] = (BANK_INPUT, BANK_HOLDING),
+        unsupported: Iterable[int] = (),
+        writable: Iterable[int] = (const.REG_SG_READY_MODE,),
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.trajectories: dict[int, Trajectory] = dict(
+            default_trajectories() if trajectories is None else trajectories
+        )
+        self.banks = set(banks)
+        self.unsupported = set(unsupported)
+        self.writable = set(writable)
+        self.latency = latency
+        self.jitter = jitter
+        self._clock = clock
+        self._written: dict[int, int] = {}
+        self._started = clock()
+
+    def reset(self) -> None:
+        """Restart the trajectories and forget written values."""
+        self._written.clear()
+        self._started = self._clock()
+
+    def value(self, address: int) -> int:
+        """Return the current word of a register (documented numbering)."""
+        if address in self._written:
+            return self._written[address]
+        trajectory = self.trajectories.get(address)
+        if trajectory is None:
+            return 0
+        return trajectory.raw(self._clock() - self._started)
+
+    def validate(self, fc_as_hex: int, address: int, count: int = 1) -> bool:
+        """Return False to make pymodbus answer with an illegal address."""
+        if _BANK_BY_FUNCTION.get(fc_as_hex) not in self.banks:
+            return False
+        addresses = range(address - const.REGISTER_OFFSET, address - const.REGISTER_OFFSET + count)
+        if fc_as_hex in _WRITE_FUNCTIONS:
+            return all(register in self.writable for register in addresses)
+        return not any(register in self.unsupported for register in addresses)
+
+    def getValues(self, fc_as_hex: int, address: int, count: int = 1) -> list[int]:
+        start = address - const.REGISTER_OFFSET
+        return [self.value(register) for register in range(start, start + count)]
+
+    def setValues(self, fc_as_hex: int, address: int, values: list[int]) -> None:
+        start = address - const.REGISTER_OFFSET
+        for offset, value in enumerate(values):
+            self._written[start + offset] = value
+
+    async def async_getValues(self, fc_as_hex: int, address: int, count: int = 1) -> list[int]:
+        # pymodbus executes every request in its own task, so pipelined
+        # requests wait out their latency concurrently, as on a real gateway.
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self.getValues(fc_as_hex, address, count)
+
+
+@dataclass
+class SimulatorStats:
+    """Counters collected while the simulator runs."""
+
+    requests: int = 0
+    connections: int = 0
+    peak_connections: int = 0
+    accepted: int = 0
+    refused: int = 0
+    requests_by_function: dict[int, int] = field(default_factory=dict)
+
+
+def _free_port(host: str) -> int:
+    with socket.socket() as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class WpmSimulator:
+    """Serve a :class:`SimulatedWpm` over Modbus TCP on localhost.
+
+    pymodbus listens on an internal port. A small asyncio front end owns the
+    public port so it can enforce ``max_connections``: a client connecting
+    beyond the limit is accepted and dropped at once, as WPM gateways do.
+    """
+
+    def __init__(
+        self,
+        device: SimulatedWpm | None = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        unit_ids: Iterable[int] = (const.DEFAULT_UNIT_ID,),
+        max_connections: int | None = None,
+    ) -> None:
+        self.device = device or SimulatedWpm()
+        self.host = host
+        self.port = port
+        self.max_connections = max_connections
+        self.stats = SimulatorStats()
+        context = ModbusServerContext(
+            slaves={unit_id: self.device for unit_id in unit_ids}, single=False
+        )
+        self._backend_port = _free_port(host)
+        self._backend = ModbusTcpServer(
+            context,
+            address=(host, self._backend_port),
+            request_tracer=self._trace_request,
+        )
+        self._backend_task: asyncio.Task | None = None
+        self._frontend: asyncio.AbstractServer | None = None
+        self._pipes: set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> WpmSimulator:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """Start serving; ``port`` holds the bound port afterwards."""
+        self._backend_task = asyncio.create_task(self._backend.serve_forever())
+        for _ in range(50):
+            try:
+                _reader, writer = await asyncio.open_connection(self.host, self._backend_port)
+            except OSError:
+                await asyncio.sleep(0.02)
+                continue
+            writer.close()
+            break
+        self._frontend = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._frontend.sockets[0].getsockname()[1]
+        LOGGER.info("Simulated WPM listening on %s:%s", self.host, self.port)
+
+    async def stop(self) -> None:
+        """Drop all clients and stop serving."""
+        if self._frontend is not None:
+            self._frontend.close()
+            for task in list(self._pipes):
+                task.cancel()
+            await asyncio.gather(*self._pipes, return_exceptions=True)
+            await self._frontend.wait_closed()
+            self._frontend = None
+        await self._backend.shutdown()
+        if self._backend_task is not None:
+            self._backend_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._backend_task
+            self._backend_task = None
+
+    def _trace_request(self, request: Any, *_addr: Any) -> None:
+        self.stats.requests += 1
+        by_function = self.stats.requests_by_function
+        by_function[request.function_code] = by_function.get(request.function_code, 0) + 1
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        stats = self.stats
+        if self.max_connections is not None and stats.connections >= self.max_connections:
+            stats.refused += 1
+            LOGGER.debug("Refusing connection, %s already open", stats.connections)
+            writer.close()
+            return
+        try:
+            backend_reader, backend_writer = await asyncio.open_connection(
+                self.host, self._backend_port
+            )
+        except OSError:
+            writer.close()
+            return
+        stats.accepted += 1
+        stats.connections += 1
+        stats.peak_connections = max(stats.peak_connections, stats.connections)
+        pipes = [
+            asyncio.create_task(self._pipe(reader, backend_writer)),
+            asyncio.create_task(self._pipe(backend_reader, writer)),
+        ]
+        self._pipes.update(pipes)
+        try:
+            # Whichever side closes first ends the session.
+            await asyncio.wait(pipes, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pipes:
+                task.cancel()
+            await asyncio.gather(*pipes, return_exceptions=True)
+            self._pipes.difference_update(pipes)
+            writer.close()
+            backend_writer.close()
+            stats.connections -= 1
+
+    @staticmethod
+    async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while data := await reader.read(4096):
+            writer.write(data)
+            await writer.drain()
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5020)
+    parser.add_argument(
+        "--unit-id",
+        type=int,
+        action="append",
+        dest="unit_ids",
+        help="unit ID to answer (repeatable, default 1)",
+    )
+    parser.add_argument(
+        "--software-version",
+        choices=const.SOFTWARE_VERSIONS,
+        default=const.DEFAULT_SOFTWARE_VERSION,
+    )
+    parser.add_argument("--scenario", type=Path, help="JSON scenario file")
+    parser.add_argument(
+        "--status-period",
+        type=float,
+        default=DEFAULT_STATUS_PERIOD,
+        help="seconds per status code in the default scenario",
+    )
+    parser.add_argument(
+        "--banks",
+        nargs="+",
+        choices=(BANK_INPUT, BANK_HOLDING),
+        default=[BANK_INPUT, BANK_HOLDING],
+        help="register banks to serve; others answer with exception 0x02",
+    )
+    parser.add_argument(
+        "--unsupported",
+        type=int,
+        nargs="*",
+        default=[],
+        help="register numbers answered with exception 0x02",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="response delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random +/- delay in seconds")
+    parser.add_argument("--max-connections", type=int)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+async def _run(args: argparse.Namespace) -> None:
+    trajectories = default_trajectories(
+        args.software_version, status_period=args.status_period
+    )
+    if args.scenario is not None:
+        trajectories = load_scenario(args.scenario, trajectories)
+    device = SimulatedWpm(
+        trajectories,
+        banks=args.banks,
+        unsupported=args.unsupported,
+        latency=args.latency,
+        jitter=args.jitter,
+    )
+    simulator = WpmSimulator(
+        device,
+        host=args.host,
+        port=args.port,
+        unit_ids=args.unit_ids or (const.DEFAULT_UNIT_ID,),
+        max_connections=args.max_connections,
+    )
+    async with simulator:
+        await asyncio.Event().wait()
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the simulator until interrupted."""
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO)
+    if not args.verbose:
+        logging.getLogger("pymodbus").setLevel(logging.WARNING)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()